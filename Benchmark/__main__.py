@@ -0,0 +1,117 @@
+"""
+Замеры производительности этапов проверки на синтетических работах.
+
+    python -m Benchmark --sources 10 100 1000 10000 --repeat 3 --output bench.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+from Benchmark.generator import Generator, FORMATS
+from Domain.antistud_fun import Referat, try_build_source
+from Domain.docx_extract import iter_paragraphs
+
+STAGES = ['process', 'referat', 'try_build_source', 'find_links']
+
+
+def measure(function, repeat, setup=None):
+    """
+    :param setup: вызывается перед каждым запуском, в замер не входит
+    :return: (лучшее время из repeat запусков, результат последнего запуска)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def find_links(document, sources, check_authors=True, search_links=True):
+    document.index_authors(author for source in sources for author in source.authors)
+    for source in sources:
+        source.find_links(document, check_authors=check_authors, search_links=search_links)
+
+
+def run_case(generator: Generator, directory, repeat):
+    path = os.path.join(directory, 'bench_{}_{}_{}_{}_{}_{}.docx'.format(
+        generator.paragraphs, generator.sources, generator.citation_density,
+        generator.author_share, generator.entry_format, generator.seed))
+    if not os.path.exists(path):
+        generator.save(path)
+
+    timings = {}
+    timings['process'], paragraphs = measure(lambda: list(iter_paragraphs(path)), repeat)
+    timings['referat'], document = measure(lambda: Referat(paragraphs, declare_text=None), repeat)
+    timings['try_build_source'], sources = measure(
+        lambda: [source for source in map(try_build_source, document.sources()) if source], repeat)
+    # документ из этапа referat переиспользуется, индексы сбрасываются перед каждым запуском
+    timings['find_links'], _ = measure(lambda: find_links(document, sources), repeat, setup=document.reset_indexes)
+
+    return dict(
+        paragraphs=generator.paragraphs,
+        sources=generator.sources,
+        parsed=len(sources),
+        citation_density=generator.citation_density,
+        author_share=generator.author_share,
+        entry_format=generator.entry_format,
+        timings=timings,
+    )
+
+
+def format_row(case):
+    return '{sources:>7} {paragraphs:>8} {parsed:>7} {entry_format:>15} '.format(**case) + \
+           ' '.join('{:>16.4f}'.format(case['timings'][stage]) for stage in STAGES)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Замеры производительности проверки')
+    parser.add_argument('--sources', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help='размеры списка литературы')
+    parser.add_argument('--paragraphs-per-source', type=float, default=10,
+                        help='кол-во абзацев текста на один источник')
+    parser.add_argument('--min-paragraphs', type=int, default=200)
+    parser.add_argument('--density', type=float, default=0.3, help='доля абзацев со ссылками')
+    parser.add_argument('--author-share', type=float, default=0.2, help='доля ссылок по автору')
+    parser.add_argument('--format', dest='formats', nargs='+', default=['mixed'], choices=FORMATS + ['mixed'])
+    parser.add_argument('--repeat', type=int, default=3, help='кол-во повторов, берется лучшее время')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dir', help='каталог для сгенерированных документов (по умолчанию временный)')
+    parser.add_argument('--output', help='сохранить результаты в JSON')
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        directory = args.dir or stack.enter_context(tempfile.TemporaryDirectory())
+
+        print('{:>7} {:>8} {:>7} {:>15} '.format('sources', 'paragr', 'parsed', 'format') +
+              ' '.join('{:>16}'.format(stage) for stage in STAGES))
+        cases = []
+        for entry_format in args.formats:
+            for sources in args.sources:
+                generator = Generator(
+                    paragraphs=max(args.min_paragraphs, int(sources * args.paragraphs_per_source)),
+                    sources=sources,
+                    citation_density=args.density,
+                    author_share=args.author_share,
+                    entry_format=entry_format,
+                    seed=args.seed,
+                )
+                case = run_case(generator, directory, args.repeat)
+                cases.append(case)
+                print(format_row(case), flush=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(dict(python=sys.version, repeat=args.repeat, cases=cases), file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Генератор синтетических работ для замеров производительности.
+"""
+import random
+from typing import List
+
+from docx import Document
+
+SURNAMES = [
+    'Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Соколов', 'Михайлов',
+    'Новиков', 'Федоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семенов', 'Егоров', 'Павлов',
+    'Козлов', 'Степанов', 'Николаев', 'Орлов', 'Андреев', 'Макаров', 'Никитин', 'Захаров', 'Зайцев',
+]
+INITIALS = 'АБВГДЕИКЛМНОПРСТФЮЯ'
+WORDS = [
+    'анализ', 'система', 'метод', 'данные', 'модель', 'процесс', 'управление', 'развитие', 'исследование',
+    'структура', 'оценка', 'результат', 'подход', 'информация', 'организация', 'проектирование', 'теория',
+]
+CITIES = ['М.: Наука', 'СПб.: Питер', 'М.: Мир', 'Казань: КФУ', 'М.: Юрайт']
+
+# форматы записей списка литературы, по одному на каждый формат Domain/formats.json
+FORMATS = ['link', 'author_journal', 'author_book', 'e_resource']
+
+
+class Author:
+    def __init__(self, rnd: random.Random):
+        self.last_name = rnd.choice(SURNAMES)
+        self.first_name = rnd.choice(INITIALS)
+        self.middle_name = rnd.choice(INITIALS)
+
+    def reference(self):
+        """ Иванов И.И. """
+        return '{} {}.{}.'.format(self.last_name, self.first_name, self.middle_name)
+
+    def mention(self):
+        """ И.И. Иванов """
+        return '{}.{}. {}'.format(self.first_name, self.middle_name, self.last_name)
+
+
+class Generator:
+    """
+    :param paragraphs: кол-во абзацев основного текста
+    :param sources: кол-во источников в списке литературы
+    :param citation_density: доля абзацев со ссылками
+    :param author_share: доля ссылок, оформленных упоминанием автора, а не номером
+    :param entry_format: один из FORMATS или 'mixed'
+    :param seed: зерно генератора случайных чисел
+    """
+
+    def __init__(self, paragraphs=1000, sources=100, citation_density=0.3, author_share=0.2,
+                 entry_format='mixed', seed=0):
+        if entry_format != 'mixed' and entry_format not in FORMATS:
+            raise ValueError('Неизвестный формат {}'.format(entry_format))
+
+        self.paragraphs = paragraphs
+        self.sources = sources
+        self.citation_density = citation_density
+        self.author_share = author_share
+        self.entry_format = entry_format
+        self.seed = seed
+
+        self._random = random.Random(seed)
+        self._authors = [Author(self._random) for _ in range(sources)]
+
+    def _words(self, count):
+        return ' '.join(self._random.choice(WORDS) for _ in range(count))
+
+    def _year(self):
+        return self._random.randint(1980, 2020)
+
+    def entry(self, index: int) -> str:
+        entry_format = self.entry_format
+        if entry_format == 'mixed':
+            entry_format = FORMATS[index % len(FORMATS)]
+        author = self._authors[index - 1]
+        title = self._words(4).capitalize()
+
+        if entry_format == 'link':
+            return '{}. https://site{}.ru/{}/page{} {}'.format(index, index, self._random.choice(WORDS), index, title)
+        if entry_format == 'author_journal':
+            return '{}. {} {}, / {} // {}. – Вестник {}. – № {}. – С. {}-{}.'.format(
+                index, author.reference(), title, author.mention(), self._year(), self._words(1),
+                self._random.randint(1, 12), self._random.randint(1, 50), self._random.randint(51, 100))
+        if entry_format == 'author_book':
+            return '{}. {} {}. – {}, {}. – {} с.'.format(
+                index, author.reference(), title, self._random.choice(CITIES), self._year(),
+                self._random.randint(100, 500))
+        return '{}. {} [Электронный ресурс] Режим доступа: https://site{}.ru/{}/page{}'.format(
+            index, title, index, self._random.choice(WORDS), index)
+
+    def citation(self) -> str:
+        index = self._random.randint(1, self.sources)
+        entry_format = self.entry_format if self.entry_format != 'mixed' else FORMATS[index % len(FORMATS)]
+        if entry_format in ('author_journal', 'author_book') and self._random.random() < self.author_share:
+            author = self._authors[index - 1]
+            return author.mention() if self._random.random() < 0.5 else author.reference()
+        if self._random.random() < 0.3:
+            return '[{}, С. {}]'.format(index, self._random.randint(1, 300))
+        if self._random.random() < 0.3 and self.sources > 1:
+            return '[{}, {}]'.format(index, self._random.randint(1, self.sources))
+        return '[{}]'.format(index)
+
+    def body(self) -> List[str]:
+        paragraphs = ['Введение']
+        for _ in range(self.paragraphs):
+            text = self._words(self._random.randint(20, 60)).capitalize()
+            if self._random.random() < self.citation_density:
+                text = '{} {}. {}.'.format(text, self.citation(), self._words(10))
+            else:
+                text += '.'
+            paragraphs.append(text)
+        return paragraphs
+
+    def bibliography(self) -> List[str]:
+        return ['Список использованной литературы'] + [self.entry(index) for index in range(1, self.sources + 1)]
+
+    def paragraphs_list(self) -> List[str]:
+        return self.body() + self.bibliography()
+
+    def save(self, path):
+        doc = Document()
+        for paragraph in self.paragraphs_list():
+            doc.add_paragraph(paragraph)
+        doc.save(path)
+        return path
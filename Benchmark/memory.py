@@ -0,0 +1,62 @@
+"""
+Память, занимаемая результатами проверки: байт на один источник.
+
+    python -m Benchmark.memory --documents 50 --sources 100
+"""
+import argparse
+import gc
+import tracemalloc
+
+from Benchmark.generator import Generator
+from Domain.antistud_fun import Referat, try_build_source, _author_cases
+
+
+def measure(documents, sources, seed=0):
+    """
+    Разбирает documents синтетических работ и возвращает кол-во байт, занятых результатами
+    (списками SourceData с найденными ссылками), без учета самих работ.
+    """
+    works = [Generator(paragraphs=sources * 5, sources=sources, seed=seed + number).paragraphs_list()
+             for number in range(documents)]
+    documents_list = [Referat(paragraphs, declare_text=None) for paragraphs in works]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    results = []
+    for document in documents_list:
+        parsed = [source for source in map(try_build_source, document.sources()) if source]
+        document.index_authors(author for source in parsed for author in source.authors)
+        for source in parsed:
+            source.find_links(document)
+        paragraphs = {}
+        for source in parsed:
+            source.detach_links(paragraphs)  # как после этапа links в Analysis
+        results.append(parsed)
+
+    # индексы документов и ограниченный кэш вариантов написания авторов результатом не являются,
+    # тексты работ учтены до замера (найденные ссылки после этапа links - строки абзацев,
+    # поэтому после удаления документов в результат входят только абзацы со ссылками)
+    del documents_list
+    _author_cases.cache_clear()
+    gc.collect()
+
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    count = sum(map(len, results))
+    return used, count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Память, занимаемая результатами проверки')
+    parser.add_argument('--documents', type=int, default=50)
+    parser.add_argument('--sources', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    used, count = measure(args.documents, args.sources)
+    print('источников: {}, всего: {:.1f} КБ, на источник: {:.0f} байт'.format(count, used / 1024, used / count))
+
+
+if __name__ == '__main__':
+    main()
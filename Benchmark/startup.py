@@ -0,0 +1,139 @@
+"""
+Время запуска приложения: время импорта каждого модуля и время до появления окна.
+Каждый замер выполняется в отдельном процессе, чтобы модули не были уже загружены.
+
+    python -m Benchmark.startup --repeat 5 --top 15 --output startup.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# модуль окна приложения (run.py без запуска цикла событий)
+WINDOW_MODULE = 'GUI.MainWindow'
+
+_SHOW_WINDOW = '''
+import sys
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+from GUI.MainWindow import MainWindow
+
+app = QApplication(sys.argv)
+window = MainWindow()
+window.show()
+QTimer.singleShot(0, lambda: (print('shown', flush=True), app.quit()))
+app.exec_()
+'''
+
+_IMPORT_TIME_REGEX = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self: float  # секунд без учета вложенных импортов
+    cumulative: float  # секунд вместе с вложенными импортами
+    depth: int  # уровень вложенности импорта
+
+
+def _environment(offscreen: bool) -> Dict[str, str]:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(ROOT), env.get('PYTHONPATH')]))
+    if offscreen:
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+    return env
+
+
+def import_times(module: str = WINDOW_MODULE) -> List[ImportTime]:
+    """
+    Время импорта модулей по выводу python -X importtime.
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                             cwd=str(ROOT), env=_environment(offscreen=True),
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    result = []
+    for line in process.stderr.splitlines():
+        match = _IMPORT_TIME_REGEX.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            result.append(ImportTime(name, int(self_us) / 1e6, int(cumulative_us) / 1e6, len(indent) // 2))
+    return result
+
+
+def time_to_window(offscreen: bool = False) -> float:
+    """
+    Секунд от запуска интерпретатора до показа главного окна.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', _SHOW_WINDOW], cwd=str(ROOT), env=_environment(offscreen),
+                               stdout=subprocess.PIPE, universal_newlines=True)
+    try:
+        for line in process.stdout:
+            if line.strip() == 'shown':
+                return time.perf_counter() - start
+    finally:
+        process.wait()
+    raise RuntimeError('Окно приложения не было показано (код {})'.format(process.returncode))
+
+
+def measure(repeat: int = 5, offscreen: bool = False, module: str = WINDOW_MODULE) -> Dict[str, object]:
+    """
+    :return: медианное время до показа окна и медианное время импорта модулей по repeat запускам
+    """
+    windows = [time_to_window(offscreen) for _ in range(repeat)]
+    runs = [import_times(module) for _ in range(repeat)]
+
+    modules: Dict[str, Dict[str, List[float]]] = {}
+    for run in runs:
+        for item in run:
+            times = modules.setdefault(item.module, dict(self=[], cumulative=[], depth=item.depth))
+            times['self'].append(item.self)
+            times['cumulative'].append(item.cumulative)
+
+    return dict(
+        window=statistics.median(windows),
+        imports={name: dict(self=statistics.median(times['self']),
+                            cumulative=statistics.median(times['cumulative']),
+                            depth=times['depth'])
+                 for name, times in modules.items()},
+    )
+
+
+def slowest(imports: Dict[str, Dict[str, float]], limit: Optional[int] = None) -> List[str]:
+    """
+    Модули по убыванию времени импорта вместе с вложенными.
+    """
+    names = sorted(imports, key=lambda name: imports[name]['cumulative'], reverse=True)
+    return names[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Время запуска приложения')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='сколько самых долгих импортов показать')
+    parser.add_argument('--offscreen', action='store_true', help='не показывать окно (QT_QPA_PLATFORM=offscreen)')
+    parser.add_argument('--output', help='сохранить результаты в JSON')
+    args = parser.parse_args(argv)
+
+    result = measure(args.repeat, args.offscreen)
+    print('до показа окна: {:.3f} с'.format(result['window']))
+    print('{:>10} {:>10}  модуль'.format('всего, мс', 'свое, мс'))
+    for name in slowest(result['imports'], args.top):
+        times = result['imports'][name]
+        print('{:>10.1f} {:>10.1f}  {}{}'.format(times['cumulative'] * 1000, times['self'] * 1000,
+                                                '  ' * times['depth'], name))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,14 +2,21 @@
 
 block_cipher = None
 
+import os
 import sys
 from os import path
 site_packages = next(p for p in sys.path if 'site-packages' in p)
 
+# CHECKER_ONEDIR=1 pyinstaller Checker.spec - сборка в каталог: запускается быстрее,
+# так как файлы не распаковываются во временный каталог при каждом запуске
+onedir = os.environ.get('CHECKER_ONEDIR') == '1'
+
 a = Analysis(['run.py'],
              pathex=[],
              binaries=[],
-             datas=[(path.join(site_packages,"docx","templates"), "docx/templates")],
+             # a.datas входит и в EXE (onefile), и в COLLECT (onedir)
+             datas=[(path.join(site_packages,"docx","templates"), "docx/templates"),
+                    (path.join('Domain', 'formats.json'), 'Domain')],
              hiddenimports=[],
              hookspath=[],
              runtime_hooks=[],
@@ -20,16 +27,35 @@ a = Analysis(['run.py'],
              noarchive=False)
 pyz = PYZ(a.pure, a.zipped_data,
              cipher=block_cipher)
-exe = EXE(pyz,
-          a.scripts,
-          a.binaries,
-          a.zipfiles,
-          a.datas,
-          [],
-          name='Checker',
-          debug=False,
-          bootloader_ignore_signals=False,
-          strip=False,
-          upx=True,
-          runtime_tmpdir=None,
-          console=False)
+if onedir:
+    exe = EXE(pyz,
+              a.scripts,
+              [],
+              exclude_binaries=True,
+              name='Checker',
+              debug=False,
+              bootloader_ignore_signals=False,
+              strip=False,
+              upx=True,
+              console=False)
+    coll = COLLECT(exe,
+                   a.binaries,
+                   a.zipfiles,
+                   a.datas,
+                   strip=False,
+                   upx=True,
+                   name='Checker')
+else:
+    exe = EXE(pyz,
+              a.scripts,
+              a.binaries,
+              a.zipfiles,
+              a.datas,
+              [],
+              name='Checker',
+              debug=False,
+              bootloader_ignore_signals=False,
+              strip=False,
+              upx=True,
+              runtime_tmpdir=None,
+              console=False)
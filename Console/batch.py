@@ -0,0 +1,334 @@
+"""
+Пакетная проверка работ без графического интерфейса.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from Domain.antistud_fun import Analysis, NoSourcesException
+from Domain.cache import ResultCache, default_cache_path
+from Domain.events import EventChannel, LoggingSink, QueueSink, NULL_CHANNEL, drain
+from Domain.export import Exporter, FORMATS as EXPORT_FORMATS
+from Domain.fuzzy import DEFAULT_TOLERANCE, MAX_TOLERANCE
+from Domain.grammar import Grammar, DEFAULT_FORMATS
+from Domain.header_locator import HeaderLocator, HeaderStore, default_store_path
+from Domain.profiling import Profiler, NULL_PROFILER
+from Domain.report_writer import ReportWriter
+from Domain.year_stats import YearTable
+
+DOCX_SUFFIX = '.docx'
+
+_caches: Dict[str, ResultCache] = {}  # открытые кэши дочернего процесса
+_grammars: Dict[Tuple[str, ...], Grammar] = {}
+_locators: Dict[Tuple[Optional[str], float], HeaderLocator] = {}
+
+
+def _open_cache(path: Optional[str]) -> Optional[ResultCache]:
+    if path is None:
+        return None
+    if path not in _caches:
+        _caches[path] = ResultCache(path)
+    return _caches[path]
+
+
+def collect_files(paths: List[str]) -> Iterator[Tuple[Path, Path]]:
+    """
+    Раскрывает переданные пути в список .docx файлов.
+    :param paths: файлы и каталоги
+    :return: Iterator[(путь к файлу, путь относительно переданного каталога)]
+    """
+    for path in map(Path, paths):
+        if path.is_dir():
+            for file in sorted(path.rglob('*' + DOCX_SUFFIX)):
+                if not file.name.startswith('~$'):
+                    yield file, file.relative_to(path)
+        elif path.is_file():
+            yield path, Path(path.name)
+
+
+def load_grammar(formats: Optional[List[str]]) -> Optional[Grammar]:
+    """
+    Грамматика с дополнительными форматами из файлов formats (загружается один раз на процесс)
+    или None для форматов по умолчанию.
+    """
+    if not formats:
+        return None
+    key = tuple(formats)
+    if key not in _grammars:
+        _grammars[key] = Grammar.load(DEFAULT_FORMATS, *formats)
+    return _grammars[key]
+
+
+def _header_locator(headers: Optional[str], min_confidence: float) -> HeaderLocator:
+    key = (headers, min_confidence)
+    if key not in _locators:
+        store = HeaderStore(headers) if headers is not None else None
+        _locators[key] = HeaderLocator(store, min_confidence=min_confidence)
+    return _locators[key]
+
+
+def check_file(file_path: str, min_year: int, check_authors: bool, search_links: bool,
+               fuzzy: int = DEFAULT_TOLERANCE, cache: Optional[str] = None, profile: bool = False,
+               formats: Optional[List[str]] = None, headers: Optional[str] = None,
+               min_header_confidence: float = 0.0, events=None) -> Dict[str, Any]:
+    """
+    Проверяет один файл. Выполняется в дочернем процессе, поэтому возвращает только сериализуемые данные.
+    Заголовок списка литературы у пользователя не запрашивается: берется наиболее вероятный,
+    если уверенность в нем не ниже min_header_confidence.
+    :param events: очередь, в которую передается ход проверки (Domain.events), или None
+    """
+    result = dict(file=file_path, error=None, header=None, sources=[], missing=[], outdated=[])
+    channel = EventChannel(QueueSink(events), document=file_path) if events is not None else NULL_CHANNEL
+    start = time.perf_counter()
+    with Profiler() if profile else contextlib.nullcontext(NULL_PROFILER) as profiler:
+        try:
+            analysis = Analysis(
+                file_path,
+                grammar=load_grammar(formats),
+                cache=_open_cache(cache),
+                locator=_header_locator(headers, min_header_confidence),
+            )
+            with profiler.stage('find_missing_src'):
+                sources = analysis.run(
+                    channel,
+                    profiler=profiler,
+                    check_authors=check_authors,
+                    search_links=search_links,
+                    fuzzy=fuzzy,
+                    min_year=min_year,
+                )
+            if analysis.header is not None:
+                result['header'] = analysis.header.to_dict()
+
+            result['sources'] = [source.to_dict() for source in sources]
+            result['missing'] = [str(source) for source in sources if not source.has_links]
+            result['outdated'] = [str(source) for source in sources if source.is_modern is False]
+        except NoSourcesException as exception:
+            result['error'] = 'Раздел с источниками не обнаружен'
+            if exception.candidate is not None:
+                result['header'] = exception.candidate.to_dict()
+        except Exception as exception:
+            result['error'] = '{}: {}'.format(type(exception).__name__, exception)
+            result['traceback'] = traceback.format_exc()
+        if result['error']:
+            channel.failed(result['error'])
+    result['time'] = time.perf_counter() - start
+    if profile:
+        result['profile'] = profiler.to_dict()
+    return result
+
+
+class Summary:
+    def __init__(self, min_year: int):
+        self.min_year = min_year
+        self.years = YearTable()
+        self.documents = 0
+        self.failed = 0
+        self.sources = 0
+        self.missing = 0
+        self.outdated = 0
+        self.errors: Dict[str, str] = {}
+
+    def add(self, result: Dict[str, Any], group: str = ''):
+        """
+        :param group: группа работ (каталог относительно переданного пути), по которой считается статистика годов
+        """
+        self.documents += 1
+        if result['error']:
+            self.failed += 1
+            self.errors[result['file']] = result['error']
+            return
+        self.years.add(result['file'], result['sources'], group)
+        self.sources += len(result['sources'])
+        self.missing += len(result['missing'])
+        self.outdated += len(result['outdated'])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            documents=self.documents,
+            failed=self.failed,
+            sources=self.sources,
+            missing=self.missing,
+            outdated=self.outdated,
+            errors=self.errors,
+            years=self.years.summary(self.min_year),
+            groups=self.years.group_summary(self.min_year),
+            by_document=self.years.document_summary(self.min_year),
+        )
+
+
+def write_json(path: Path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    header = result.get('header')
+    header = ' (заголовок "{text}", уверенность {confidence:.2f})'.format(**header) if header else ''
+    if result['error']:
+        return '{file}: ошибка: {error}{header}'.format(file=result['file'], error=result['error'], header=header)
+    return '{file}: пропущено ссылок {missing} из {total}, устаревших {outdated}{header}'.format(
+        file=result['file'],
+        missing=len(result['missing']),
+        total=len(result['sources']),
+        outdated=len(result['outdated']),
+        header=header,
+    )
+
+
+def format_years(years: Dict[str, Any]) -> str:
+    if not years['dated']:
+        return 'Годы издания источников не найдены'
+    return 'Источников с годом издания: {dated}, доля устаревших: {ratio:.1%}, годы (10/50/90%): {years}'.format(
+        dated=years['dated'],
+        ratio=years['outdated_ratio'],
+        years=' / '.join('{:g}'.format(value) for value in years['percentiles'].values()),
+    )
+
+
+def format_profile(profiler: Profiler) -> str:
+    lines = ['{:<20} {:>8} {:>12} {:>14}'.format('этап', 'вызовов', 'время, с', 'пик памяти, КБ')]
+    for name, stats in sorted(profiler.stages.items(), key=lambda item: -item[1].time):
+        lines.append('{:<20} {:>8} {:>12.4f} {:>14.1f}'.format(
+            name, stats.calls, stats.time, stats.peak_memory / 1024))
+    return '\n'.join(lines)
+
+
+def _open_log(path: str) -> logging.Logger:
+    logger = logging.getLogger('source_checker.batch')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.StreamHandler(sys.stderr) if path == '-' else logging.FileHandler(path, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+
+def _tolerance(value: str) -> int:
+    tolerance = int(value)
+    if not 0 <= tolerance <= MAX_TOLERANCE:
+        raise argparse.ArgumentTypeError('допустимо от 0 до {}'.format(MAX_TOLERANCE))
+    return tolerance
+
+
+def add_fuzzy_argument(parser):
+    parser.add_argument('--fuzzy', type=_tolerance, default=DEFAULT_TOLERANCE, metavar='N',
+                        help='допустимое кол-во опечаток в фамилии автора при проверке по авторам '
+                             '(0-{}, по умолчанию {} - только точное совпадение)'.format(MAX_TOLERANCE,
+                                                                                        DEFAULT_TOLERANCE))
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser('batch', help='Проверить файлы и каталоги с работами')
+    parser.add_argument('paths', nargs='+', help='файлы .docx или каталоги с ними')
+    parser.add_argument('-o', '--output', help='каталог для результатов по каждому файлу и сводки')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='количество процессов')
+    parser.add_argument('--min-year', type=int, default=2000, help='минимальный год источника')
+    parser.add_argument('--no-authors', dest='check_authors', action='store_false',
+                        help='не проверять ссылки по авторам')
+    add_fuzzy_argument(parser)
+    parser.add_argument('--search-links', action='store_true',
+                        help='собрать списки абзацев со ссылками на каждый источник')
+    parser.add_argument('--cache', nargs='?', const=str(default_cache_path()),
+                        help='использовать кэш результатов (по умолчанию {})'.format(default_cache_path()))
+    parser.add_argument('--clear-cache', action='store_true', help='очистить кэш перед проверкой')
+    parser.add_argument('--formats', action='append', metavar='FILE',
+                        help='дополнительные форматы записей списка литературы (JSON, как Domain/formats.json)')
+    parser.add_argument('--headers', nargs='?', const=str(default_store_path()), metavar='FILE',
+                        help='учитывать заголовки списка литературы, подтвержденные в приложении '
+                             '(по умолчанию {})'.format(default_store_path()))
+    parser.add_argument('--min-header-confidence', type=float, default=0.0, metavar='0..1',
+                        help='не проверять работы, в которых заголовок списка литературы найден '
+                             'с меньшей уверенностью')
+    parser.add_argument('--export', metavar='FILE',
+                        help='выгрузить все источники в один файл .jsonl или .csv (запись на источник)')
+    parser.add_argument('--export-format', choices=EXPORT_FORMATS,
+                        help='формат выгрузки, если он не следует из расширения файла')
+    parser.add_argument('--export-append', action='store_true', help='дописать записи в существующий файл выгрузки')
+    parser.add_argument('--report', metavar='FILE',
+                        help='сохранить общий отчет .docx по всем работам (раздел на каждую работу)')
+    parser.add_argument('--log', nargs='?', const='-', metavar='FILE',
+                        help='записывать ход проверки каждого файла в журнал (без FILE - в stderr)')
+    parser.add_argument('--profile', action='store_true',
+                        help='замерить время и память по этапам проверки (замедляет проверку)')
+    parser.set_defaults(main=main)
+    return parser
+
+
+def main(args) -> int:
+    files = list(collect_files(args.paths))
+    output = Path(args.output) if args.output else None
+    settings = dict(min_year=args.min_year, check_authors=args.check_authors, search_links=args.search_links,
+                    fuzzy=args.fuzzy)
+    if args.formats:
+        Grammar.load(DEFAULT_FORMATS, *args.formats)  # ошибки в конфигурации сообщаются до запуска проверки
+
+    if args.clear_cache:
+        with ResultCache(args.cache) as cache:
+            cache.clear()
+
+    summary = Summary(args.min_year)
+    profiler = Profiler(trace_memory=False)
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        exporter = stack.enter_context(Exporter(args.export, args.export_format, args.export_append)) if args.export else None
+        report = stack.enter_context(ReportWriter(args.report)) if args.report else None
+        events, log_thread = None, None
+        if args.log:
+            # события дочерних процессов передаются через очередь и пишутся в журнал в отдельном потоке
+            events = stack.enter_context(multiprocessing.Manager()).Queue()
+            log_thread = threading.Thread(target=drain, args=(events, LoggingSink(_open_log(args.log))), daemon=True)
+            log_thread.start()
+        executor = stack.enter_context(ProcessPoolExecutor(max_workers=args.jobs))
+        futures = {
+            executor.submit(check_file, str(file), cache=args.cache, profile=args.profile, formats=args.formats,
+                            headers=args.headers, min_header_confidence=args.min_header_confidence,
+                            events=events, **settings): relative
+            for file, relative in files
+        }
+        for future in as_completed(futures):
+            # завершенные задания сразу убираются, чтобы результаты не копились в памяти
+            relative = futures.pop(future)
+            result = future.result()
+            summary.add(result, relative.parent.as_posix())
+            if 'profile' in result:
+                profiler.merge(result['profile'])
+            print(format_result(result), flush=True)
+            if exporter is not None:
+                exporter.write_document(result['file'], result['sources'])
+            if report is not None:
+                report.document(relative.as_posix(), result['missing'], result['outdated'],
+                                total=len(result['sources']), error=result['error'])
+            if output is not None:
+                write_json((output / relative).with_suffix('.json'), result)
+        if log_thread is not None:
+            events.put(None)
+            log_thread.join()
+    elapsed = time.perf_counter() - start
+
+    data = summary.to_dict()
+    data.update(settings, time=elapsed, date=datetime.now().isoformat(timespec='seconds'))
+    if args.profile:
+        data['profile'] = profiler.to_dict()
+    if output is not None:
+        write_json(output / 'summary.json', data)
+
+    print('Проверено документов: {documents} (с ошибками: {failed}), источников: {sources}, '
+          'пропущено ссылок: {missing}, устаревших: {outdated}'.format(**data))
+    print(format_years(data['years']))
+    if args.profile:
+        print(format_profile(profiler))
+    print('Время: {:.2f} с, {:.2f} док/с'.format(elapsed, summary.documents / elapsed if elapsed else 0))
+    return 1 if summary.failed else 0
@@ -0,0 +1,112 @@
+"""
+Индекс списков литературы всех проверенных работ: какие работы ссылаются на источник
+и как часто встречаются его издания.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from Console.batch import collect_files, load_grammar
+from Domain.antistud_fun import Analysis, NoSourcesException
+from Domain.corpus import CorpusIndex, default_corpus_path, DEFAULT_THRESHOLD
+
+
+def parse_file(file_path: str, formats: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Разбирает список литературы файла. Выполняется в дочернем процессе.
+    """
+    result = dict(file=file_path, error=None, sources=[])
+    try:
+        analysis = Analysis(file_path, grammar=load_grammar(formats))
+        result['sources'] = analysis.run(check_authors=False, search_links=False)
+    except NoSourcesException:
+        result['error'] = 'Раздел с источниками не обнаружен'
+    except Exception as exception:
+        result['error'] = '{}: {}'.format(type(exception).__name__, exception)
+    return result
+
+
+def add(args, corpus: CorpusIndex) -> int:
+    files = [str(file) for file, _ in collect_files(args.paths)]
+    if not args.force:
+        files = [file for file in files if not corpus.is_current(file)]
+
+    failed = entries = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [executor.submit(parse_file, file, args.formats) for file in files]
+        for future in as_completed(futures):
+            result = future.result()
+            if result['error']:
+                failed += 1
+                print('{file}: ошибка: {error}'.format(**result), flush=True)
+                continue
+            entries += corpus.add_document(result['file'], result['sources'])
+    elapsed = time.perf_counter() - start
+    print('Добавлено документов: {} (с ошибками: {}), записей: {}, всего записей в индексе: {}, время: {:.2f} с'
+          .format(len(files) - failed, failed, entries, len(corpus), elapsed))
+    return 1 if failed else 0
+
+
+def format_years(years: Dict[Optional[int], int]) -> str:
+    return ', '.join('{}: {}'.format(year if year is not None else 'без года', count)
+                     for year, count in years.items())
+
+
+def find(args, corpus: CorpusIndex) -> int:
+    clusters = corpus.find_clusters(args.text)
+    if not clusters:
+        print('Источник не найден')
+        return 1
+    for cluster_id in clusters:
+        cluster = corpus.cluster(cluster_id)
+        print('{} (записей: {}, работ: {})'.format(cluster.text, cluster.entries, cluster.documents))
+        print('  издания: {}'.format(format_years(cluster.years)))
+        for document in sorted({entry.document for entry in corpus.entries(cluster_id)}):
+            print('  ' + document)
+    return 0
+
+
+def top(args, corpus: CorpusIndex) -> int:
+    for cluster in corpus.clusters(min_size=args.min_size, limit=args.limit, before_year=args.before):
+        print('{:>6} {:>6}  {}'.format(cluster.documents, cluster.entries, cluster.text))
+        print('{:>14}  издания: {}'.format('', format_years(cluster.years)))
+    return 0
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser('corpus', help='Индекс списков литературы всех проверенных работ')
+    parser.add_argument('--db', default=str(default_corpus_path()),
+                        help='файл индекса (по умолчанию {})'.format(default_corpus_path()))
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='минимальное сходство записей одного источника (0..1)')
+    commands = parser.add_subparsers(dest='corpus_command')
+    commands.required = True
+
+    add_command = commands.add_parser('add', help='добавить работы в индекс')
+    add_command.add_argument('paths', nargs='+', help='файлы .docx или каталоги с ними')
+    add_command.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='количество процессов')
+    add_command.add_argument('--force', action='store_true', help='заново разобрать уже добавленные файлы')
+    add_command.add_argument('--formats', action='append', metavar='FILE',
+                             help='дополнительные форматы записей списка литературы')
+    add_command.set_defaults(corpus_main=add)
+
+    find_command = commands.add_parser('find', help='работы, в которых указан источник')
+    find_command.add_argument('text', help='запись списка литературы')
+    find_command.set_defaults(corpus_main=find)
+
+    top_command = commands.add_parser('top', help='самые частые источники')
+    top_command.add_argument('--min-size', type=int, default=2, help='минимальное кол-во записей источника')
+    top_command.add_argument('--limit', type=int, default=50)
+    top_command.add_argument('--before', type=int, metavar='YEAR',
+                             help='только источники, изданные раньше указанного года')
+    top_command.set_defaults(corpus_main=top)
+
+    parser.set_defaults(main=main)
+    return parser
+
+
+def main(args) -> int:
+    with CorpusIndex(args.db, threshold=args.threshold) as corpus:
+        return args.corpus_main(args, corpus)
@@ -0,0 +1,315 @@
+"""
+Локальный HTTP API для проверки работ из других систем (например, LMS).
+
+    POST   /jobs?min_year=2000&check_authors=1&search_links=0&fuzzy=1   тело запроса - содержимое .docx
+           202 {"id": ..., "status": "queued"}, заголовок Location: /jobs/<id>
+           503 и Retry-After, если очередь заполнена
+    GET    /jobs/<id>    {"id": ..., "status": "queued" | "running" | "done" | "failed", "result": {...}}
+    DELETE /jobs/<id>    удалить задание и его результат
+    GET    /health       состояние очереди
+
+Сервер работает на asyncio, проверка выполняется в пуле процессов и не блокирует цикл событий.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from Console.batch import check_file
+from Domain.cache import default_cache_path
+from Domain.fuzzy import MAX_TOLERANCE
+
+MAX_UPLOAD = 50 * 1024 * 1024  # байт
+MAX_HEADERS = 100
+KEEP_RESULTS = 1000  # завершенных заданий, результаты которых хранятся в памяти
+RETRY_AFTER = 5  # секунд
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = None, headers: Dict[str, str] = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+        self.headers = headers or {}
+
+
+class Job:
+    def __init__(self, path: str, settings: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.settings = settings
+        self.status = 'queued'
+        self.result: Optional[Dict[str, Any]] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(id=self.id, status=self.status, created=self.created, finished=self.finished)
+        if self.result is not None:
+            data['result'] = self.result
+        return data
+
+
+def _flag(value: str) -> bool:
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+class CheckServer:
+    """
+    :param jobs: количество одновременно проверяемых работ
+    :param max_queue: максимальное кол-во ожидающих и выполняемых заданий, после которого
+        новые задания отклоняются с кодом 503
+    :param executor: пул для проверки; по умолчанию ProcessPoolExecutor(jobs)
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8080, jobs: int = 2, max_queue: int = 20,
+                 max_upload: int = MAX_UPLOAD, keep_results: int = KEEP_RESULTS,
+                 settings: Optional[Dict[str, Any]] = None, executor: Optional[Executor] = None):
+        self.host = host
+        self.port = port
+        self.jobs = jobs
+        self.max_queue = max_queue
+        self.max_upload = max_upload
+        self.keep_results = keep_results
+        self.settings = dict(min_year=2000, check_authors=True, search_links=False)
+        self.settings.update(settings or {})
+
+        self._executor = executor
+        self._own_executor = executor is None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks = set()
+        self._dir = tempfile.TemporaryDirectory(prefix='source_checker_')
+        self.active: Dict[str, Job] = {}
+        self.done: 'OrderedDict[str, Job]' = OrderedDict()
+
+    async def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+        self._semaphore = asyncio.Semaphore(self.jobs)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        self._dir.cleanup()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    # задания
+
+    def _job(self, job_id: str) -> Job:
+        job = self.active.get(job_id) or self.done.get(job_id)
+        if job is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, 'Задание не найдено')
+        return job
+
+    def _settings(self, query: Dict[str, list]) -> Dict[str, Any]:
+        settings = dict(self.settings)
+        try:
+            if 'min_year' in query:
+                settings['min_year'] = int(query['min_year'][0])
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'min_year должен быть числом')
+        if 'fuzzy' in query:
+            try:
+                settings['fuzzy'] = int(query['fuzzy'][0])
+            except ValueError:
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'fuzzy должен быть числом')
+            if not 0 <= settings['fuzzy'] <= MAX_TOLERANCE:
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'fuzzy должен быть от 0 до {}'.format(MAX_TOLERANCE))
+        for key in ('check_authors', 'search_links'):
+            if key in query:
+                settings[key] = _flag(query[key][0])
+        return settings
+
+    def submit(self, body: bytes, settings: Dict[str, Any]) -> Job:
+        if len(self.active) >= self.max_queue:
+            raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE, 'Очередь заполнена',
+                            headers={'Retry-After': str(RETRY_AFTER)})
+        path = os.path.join(self._dir.name, uuid.uuid4().hex + '.docx')
+        job = Job(path, settings)
+        self.active[job.id] = job
+        task = asyncio.ensure_future(self._run(job, body))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Job, body: bytes):
+        try:
+            loop = asyncio.get_running_loop()
+            # запись файла до 50 МБ не должна задерживать другие соединения
+            await loop.run_in_executor(None, _write_file, job.path, body)
+            del body
+            async with self._semaphore:
+                job.status = 'running'
+                result = await loop.run_in_executor(self._executor, _check, job.path, job.settings)
+            result.pop('traceback', None)
+            result.pop('file', None)
+            job.result = result
+            job.status = 'failed' if result['error'] else 'done'
+        except asyncio.CancelledError:
+            job.status = 'failed'
+            job.result = dict(error='Сервер остановлен')
+            raise
+        except Exception as exception:
+            job.status = 'failed'
+            job.result = dict(error='{}: {}'.format(type(exception).__name__, exception))
+        finally:
+            job.finished = time.time()
+            self.active.pop(job.id, None)
+            self.done[job.id] = job
+            while len(self.done) > self.keep_results:
+                self.done.popitem(last=False)
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
+
+    # HTTP
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise HttpError(HTTPStatus.BAD_REQUEST)
+        method, target, _ = parts
+
+        headers = {}
+        for _ in range(MAX_HEADERS):
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+        body = b''
+        if 'content-length' in headers:
+            try:
+                length = int(headers['content-length'])
+            except ValueError:
+                raise HttpError(HTTPStatus.BAD_REQUEST)
+            if length > self.max_upload:
+                raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            body = await reader.readexactly(length)
+        elif method == 'POST':
+            raise HttpError(HTTPStatus.LENGTH_REQUIRED)
+        return method, target, headers, body
+
+    def _route(self, method: str, target: str, body: bytes) -> Tuple[HTTPStatus, Dict[str, Any], Dict[str, str]]:
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+
+        if parts == ['health'] and method == 'GET':
+            return HTTPStatus.OK, dict(
+                queued=sum(1 for job in self.active.values() if job.status == 'queued'),
+                running=sum(1 for job in self.active.values() if job.status == 'running'),
+                capacity=self.max_queue,
+                jobs=self.jobs,
+            ), {}
+
+        if parts == ['jobs']:
+            if method != 'POST':
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+            if not body:
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'Пустой файл')
+            job = self.submit(body, self._settings(parse_qs(url.query)))
+            return HTTPStatus.ACCEPTED, job.to_dict(), {'Location': '/jobs/' + job.id}
+
+        if len(parts) == 2 and parts[0] == 'jobs':
+            job = self._job(parts[1])
+            if method == 'GET':
+                return HTTPStatus.OK, job.to_dict(), {}
+            if method == 'DELETE':
+                if job.id in self.active:
+                    raise HttpError(HTTPStatus.CONFLICT, 'Задание еще выполняется')
+                del self.done[job.id]
+                return HTTPStatus.OK, dict(id=job.id, status='deleted'), {}
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+        raise HttpError(HTTPStatus.NOT_FOUND)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                method, target, headers, body = await self._read_request(reader)
+                status, data, extra_headers = self._route(method, target, body)
+            except HttpError as error:
+                status, data, extra_headers = error.status, dict(error=str(error)), error.headers
+            except asyncio.IncompleteReadError:
+                return
+            payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            head = ['HTTP/1.1 {} {}'.format(status.value, status.phrase),
+                    'Content-Type: application/json; charset=utf-8',
+                    'Content-Length: {}'.format(len(payload)),
+                    'Connection: close']
+            head.extend('{}: {}'.format(name, value) for name, value in extra_headers.items())
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def _write_file(path: str, body: bytes):
+    with open(path, 'wb') as file:
+        file.write(body)
+
+
+def _check(path: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    return check_file(path, **settings)
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser('serve', help='Запустить локальный HTTP API для проверки работ')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('-j', '--jobs', type=int, default=2, help='количество одновременно проверяемых работ')
+    parser.add_argument('--max-queue', type=int, default=20,
+                        help='максимальное кол-во заданий в очереди, после которого возвращается 503')
+    parser.add_argument('--max-upload', type=int, default=MAX_UPLOAD, help='максимальный размер файла, байт')
+    parser.add_argument('--min-year', type=int, default=2000, help='минимальный год источника по умолчанию')
+    parser.add_argument('--cache', nargs='?', const=str(default_cache_path()),
+                        help='использовать кэш результатов (по умолчанию {})'.format(default_cache_path()))
+    parser.set_defaults(main=main)
+    return parser
+
+
+def main(args) -> int:
+    async def serve():
+        server = CheckServer(args.host, args.port, jobs=args.jobs, max_queue=args.max_queue,
+                             max_upload=args.max_upload, settings=dict(min_year=args.min_year, cache=args.cache))
+        async with server:
+            print('Сервер запущен: http://{}:{}/'.format(server.host, server.port), flush=True)
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,384 @@
+"""
+Проверка работ по мере их появления в каталогах.
+Новые и измененные .docx файлы проверяются в пуле процессов, отчет сохраняется рядом с файлом
+(как при автосохранении в приложении). Обработанные файлы запоминаются, поэтому после
+перезапуска проверяются только файлы, изменившиеся за это время.
+"""
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import select
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Set, Tuple
+
+from Console.batch import DOCX_SUFFIX, add_fuzzy_argument, check_file, format_result
+from Domain.cache import default_cache_path
+from Domain.generate_file import generate, report_path, is_report
+
+DEFAULT_SETTLE = 2.0  # секунд без изменений, после которых файл считается записанным
+POLL_INTERVAL = 1.0  # секунд между просмотрами каталогов без inotify
+
+
+def default_state_path() -> Path:
+    return Path.home() / '.source_checker' / 'watch.json'
+
+
+def is_submission(path: Path) -> bool:
+    return path.suffix.lower() == DOCX_SUFFIX and not path.name.startswith('~$') and not is_report(path)
+
+
+def scan(directories: Iterable[Path]) -> Iterable[Path]:
+    for directory in directories:
+        for path in directory.rglob('*' + DOCX_SUFFIX):
+            if is_submission(path):
+                yield path
+
+
+class PollingWatcher:
+    """
+    Периодически просматривает каталоги и сообщает о файлах, у которых изменились размер или время изменения.
+    """
+
+    def __init__(self, directories: List[Path], interval: float = POLL_INTERVAL):
+        self.directories = directories
+        self.interval = interval
+        self._seen: Dict[Path, Tuple[int, int]] = {}
+        self._last = 0.0
+
+    def poll(self, timeout: float) -> Set[Path]:
+        delay = self._last + self.interval - time.monotonic()
+        if delay > 0:
+            time.sleep(min(delay, timeout))
+            if delay > timeout:
+                return set()
+        self._last = time.monotonic()
+
+        changed = set()
+        seen = {}
+        for path in scan(self.directories):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            seen[path] = (stat.st_mtime_ns, stat.st_size)
+            if self._seen.get(path) != seen[path]:
+                changed.add(path)
+        self._seen = seen
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Получает события файловой системы Linux через inotify (ctypes, без сторонних пакетов).
+    Подкаталоги, созданные во время работы, добавляются автоматически.
+    Если достигнут предел количества наблюдаемых каталогов (fs.inotify.max_user_watches),
+    устанавливается exhausted, и сервис переходит на PollingWatcher.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self, directories: List[Path]):
+        self.directories = directories
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        self._watches: Dict[int, Path] = {}
+        self.overflowed = False
+        self.exhausted = False
+        for directory in directories:
+            self._add_tree(directory)
+
+    @classmethod
+    def available(cls) -> bool:
+        if not sys.platform.startswith('linux'):
+            return False
+        library = ctypes.util.find_library('c')
+        return library is not None and hasattr(ctypes.CDLL(library), 'inotify_init1')
+
+    def _add_tree(self, directory: Path):
+        try:
+            paths = [directory, *(item for item in directory.rglob('*') if item.is_dir())]
+        except OSError:
+            return  # каталог удален сразу после создания
+        for path in paths:
+            if self.exhausted:
+                return
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(path)), self.MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOSPC:
+                    self.exhausted = True
+                else:
+                    # каталог удален или недоступен - остальные каталоги продолжают наблюдаться
+                    print('Каталог не наблюдается: {}: {}'.format(path, os.strerror(error)), file=sys.stderr)
+                continue
+            self._watches[wd] = path
+
+    def poll(self, timeout: float) -> Set[Path]:
+        changed = set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return changed
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # часть событий потеряна - каталоги нужно просмотреть заново
+                self.overflowed = True
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / name
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._add_tree(path)
+                    changed.update(scan([path]))
+            elif is_submission(path):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class State:
+    """
+    Обработанные файлы: путь -> время изменения, размер и итог проверки. Хранится в JSON.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        try:
+            with path.open(encoding='utf-8') as file:
+                files = json.load(file)
+        except FileNotFoundError:
+            return
+        except (ValueError, OSError) as exception:
+            # поврежденный или недоступный файл не должен мешать запуску: файлы будут проверены заново
+            print('Не удалось прочитать состояние {}: {}'.format(path, exception), file=sys.stderr)
+            return
+        if isinstance(files, dict):
+            self.files = files
+
+    @staticmethod
+    def signature(file: Path) -> Tuple[int, int]:
+        stat = file.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def is_processed(self, file: Path) -> bool:
+        entry = self.files.get(str(file))
+        try:
+            return entry is not None and (entry['mtime_ns'], entry['size']) == self.signature(file)
+        except OSError:
+            return True
+
+    def mark(self, file: Path, signature: Tuple[int, int], result: Dict[str, Any]):
+        self.files[str(file)] = dict(
+            mtime_ns=signature[0],
+            size=signature[1],
+            checked=datetime.now().isoformat(timespec='seconds'),
+            error=result['error'],
+            report=result.get('report'),
+        )
+        self.save()
+
+    def save(self):
+        """
+        Записывает состояние во временный файл и заменяет им прежний,
+        чтобы при остановке службы во время записи файл не остался недописанным.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        with temp_path.open('w', encoding='utf-8') as file:
+            json.dump(self.files, file, ensure_ascii=False, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(str(temp_path), str(self.path))
+
+
+def check_and_report(file_path: str, **settings) -> Dict[str, Any]:
+    """
+    Проверяет файл и сохраняет отчет рядом с ним. Выполняется в дочернем процессе.
+    """
+    result = check_file(file_path, **settings)
+    if not result['error']:
+        report = report_path(file_path)
+        try:
+            generate(result['missing'], result['outdated'], str(report))
+            result['report'] = str(report)
+        except Exception as exception:
+            result['error'] = 'Не удалось сохранить отчет: {}'.format(exception)
+    return result
+
+
+class Service:
+    """
+    :param settle: секунд без изменения размера и времени изменения, после которых файл проверяется
+    :param jobs: размер пула процессов; в очереди пула держится не больше 2 * jobs файлов
+    """
+
+    def __init__(self, directories: List[Path], state: State, settings: Dict[str, Any],
+                 jobs: int = 2, settle: float = DEFAULT_SETTLE, polling: bool = False):
+        self.directories = directories
+        self.state = state
+        self.settings = settings
+        self.jobs = jobs
+        self.settle = settle
+        if not polling and InotifyWatcher.available():
+            self.watcher = InotifyWatcher(directories)
+        else:
+            self.watcher = PollingWatcher(directories)
+
+        self._pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}  # путь -> (подпись, время последнего изменения)
+        self._ready: Deque[Path] = deque()
+        self._running: Dict[Any, Tuple[Path, Tuple[int, int]]] = {}  # Future -> (путь, подпись)
+
+    def _touch(self, paths: Iterable[Path]):
+        now = time.monotonic()
+        for path in paths:
+            try:
+                signature = State.signature(path)
+            except OSError:
+                self._pending.pop(path, None)  # файл удален или переименован
+                continue
+            previous = self._pending.get(path)
+            if previous is None or previous[0] != signature:
+                self._pending[path] = (signature, now)
+
+    def _settled(self):
+        now = time.monotonic()
+        # файлы без событий тоже перепроверяются: копирование по сети может идти без записи в каталог
+        self._touch(list(self._pending))
+        running = {path for path, _ in self._running.values()}
+        for path, (signature, changed) in list(self._pending.items()):
+            # файл, измененный во время проверки, проверяется еще раз после ее завершения
+            if now - changed < self.settle or path in running:
+                continue
+            del self._pending[path]
+            if path not in self._ready and not self.state.is_processed(path):
+                self._ready.append(path)
+
+    def _submit(self, executor):
+        while self._ready and len(self._running) < 2 * self.jobs:
+            path = self._ready.popleft()
+            try:
+                signature = State.signature(path)
+            except OSError:
+                continue
+            future = executor.submit(check_and_report, str(path), **self.settings)
+            self._running[future] = (path, signature)
+
+    def _collect(self, timeout: float):
+        if not self._running:
+            return
+        done, _ = wait(list(self._running), timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            path, signature = self._running.pop(future)
+            try:
+                result = future.result()
+            except Exception as exception:
+                result = dict(file=str(path), error='{}: {}'.format(type(exception).__name__, exception),
+                              sources=[], missing=[], outdated=[])
+            self.state.mark(path, signature, result)
+            print(format_result(result), flush=True)
+
+    def run(self, once: bool = False):
+        """
+        :param once: проверить уже лежащие в каталогах файлы и завершиться
+        """
+        self._touch(scan(self.directories))
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            try:
+                while True:
+                    if getattr(self.watcher, 'exhausted', False):
+                        print('Достигнут предел inotify, каталоги будут просматриваться периодически',
+                              file=sys.stderr, flush=True)
+                        self.watcher.close()
+                        self.watcher = PollingWatcher(self.directories)
+                    if getattr(self.watcher, 'overflowed', False):
+                        self.watcher.overflowed = False
+                        self._touch(scan(self.directories))
+                    self._settled()
+                    self._submit(executor)
+                    if once and not (self._pending or self._ready or self._running):
+                        return
+                    self._collect(timeout=0.1 if self._running else 0)
+                    if not once:
+                        self._touch(self.watcher.poll(timeout=0.5))
+                    elif self._pending and not self._running:
+                        time.sleep(0.1)
+            finally:
+                self.watcher.close()
+
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser('watch', help='Проверять работы по мере появления в каталогах')
+    parser.add_argument('directories', nargs='+', help='каталоги с работами (просматриваются с подкаталогами)')
+    parser.add_argument('-j', '--jobs', type=int, default=2, help='количество процессов')
+    parser.add_argument('--state', default=str(default_state_path()),
+                        help='файл со списком обработанных работ (по умолчанию {})'.format(default_state_path()))
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE,
+                        help='секунд без изменений, после которых файл считается записанным')
+    parser.add_argument('--polling', action='store_true', help='просматривать каталоги периодически, без inotify')
+    parser.add_argument('--once', action='store_true', help='проверить имеющиеся файлы и завершиться')
+    parser.add_argument('--min-year', type=int, default=2000, help='минимальный год источника')
+    parser.add_argument('--no-authors', dest='check_authors', action='store_false',
+                        help='не проверять ссылки по авторам')
+    add_fuzzy_argument(parser)
+    parser.add_argument('--cache', nargs='?', const=str(default_cache_path()),
+                        help='использовать кэш результатов (по умолчанию {})'.format(default_cache_path()))
+    parser.set_defaults(main=main)
+    return parser
+
+
+def main(args) -> int:
+    directories = [Path(directory).resolve() for directory in args.directories]
+    for directory in directories:
+        if not directory.is_dir():
+            print('Каталог не найден: {}'.format(directory), file=sys.stderr)
+            return 2
+
+    settings = dict(min_year=args.min_year, check_authors=args.check_authors, search_links=False, fuzzy=args.fuzzy,
+                    cache=args.cache)
+    service = Service(directories, State(Path(args.state)), settings,
+                      jobs=args.jobs, settle=args.settle, polling=args.polling)
+    print('Просмотр каталогов ({}): {}'.format(type(service.watcher).__name__, ', '.join(map(str, directories))),
+          flush=True)
+    try:
+        service.run(once=args.once)
+    except KeyboardInterrupt:
+        pass
+    return 0
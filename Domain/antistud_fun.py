@@ -3,14 +3,28 @@ TODO:
     1) Отделять нормативные документы от научных работ -> нормативные документы не считать устаревшими
     2) Проверка порядка источников
 """
-import collections
+import collections.abc
+import functools
+import operator
 import os.path
 import re
+import sys
+import threading
+import weakref
 from datetime import datetime
 from enum import Enum
-from typing import List, Iterator, Optional, Callable, Any, Dict, Sequence, Union
-
-from Domain.docx_extract import process
+from typing import List, Iterator, Optional, Callable, Any, Dict, Iterable, Sequence, Set, Tuple
+
+from Domain.author_matcher import AhoCorasick, AuthorIndex, common_positions
+from Domain.citations import CitationIndex, iter_citations
+from Domain.docx_extract import iter_paragraphs, document_template
+from Domain.events import CallbackSink, EventChannel, NULL_CHANNEL
+from Domain.fuzzy import DEFAULT_TOLERANCE, TrigramIndex, mentions
+from Domain.grammar import Grammar
+from Domain.header_locator import HeaderLocator, check_paragraph_to_source_header
+from Domain.normalize import normalize
+from Domain.paragraphs import ParagraphRefs, ParagraphStore, ParagraphView
+from Domain.profiling import NULL_PROFILER
 
 # Настройки
 MAX_ERRORS = 3  # Макс. кол-во ошибок для остановки поиска  [3]
@@ -19,48 +33,95 @@ MIN_STAGE = 2  # Кол-во заголовков списка [2, но иног
 
 
 class NoSourcesException(Exception):
-    pass
+    def __init__(self, candidate=None):
+        """
+        :param candidate: HeaderMatch - наиболее вероятный заголовок списка литературы, если он был найден
+        """
+        super().__init__()
+        self.candidate = candidate
 
 
 class NoAuthorException(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=4096)
+def _author_cases(last_name, first_name, middle_name) -> Tuple[str, ...]:
+    """
+    Шаблоны автора для поиска в канонической форме текста (Domain.normalize): по одному
+    на порядок записи, варианты пробелов и запятых сводятся к ним нормализацией.
+    Кэш ограничен, чтобы не держать шаблоны всех авторов в памяти.
+    """
+    if middle_name is None:
+        return tuple(t.format(first_name, last_name) for t in ['{0}.{1}', '{1} {0}.'])
+    return tuple(t.format(first_name, middle_name, last_name) for t in ['{0}.{1}.{2}', '{2} {0}.{1}'])
+
+
 class _Author:
-    last_name: str = None
-    first_name: str = None
-    middle_name: str = None
+    """
+    Автор источника. Экземпляры с одинаковым ФИО переиспользуются (интернируются)
+    всеми источниками и документами, пока на них есть ссылки.
+    """
+    __slots__ = ('last_name', 'first_name', 'middle_name', '__weakref__')
+
+    last_name: str
+    first_name: str
+    middle_name: Optional[str]
+
+    _interned: 'weakref.WeakValueDictionary[tuple, _Author]' = weakref.WeakValueDictionary()
+    _interned_lock = threading.Lock()
 
     _split_regex = re.compile(
         r'(?:(?P<f>[А-Я])(?:.\s?)(?:(?P<m>[А-Я])(?:.\s?))?(?P<l>[А-Я][а-я]+))'
         r'|(?:(?P<l2>[А-Я][а-я]+)(?:,?\s)(?P<f2>[А-Я])(?:.\s?)(?:(?P<m2>[А-Я])(?:.\s?))?)'
     )
 
-    def __init__(self, text: str):
-        res = self._split_regex.findall(text)
+    def __new__(cls, text: str):
+        res = cls._split_regex.findall(normalize(text))
         if len(res) == 0:
             raise NoAuthorException()
         res = res[0]
-        self.last_name = res[3] if res[0] == '' else res[2]
-        self.first_name = res[4] if res[0] == '' else res[0]
-        self.middle_name = res[1] if res[1] != '' else res[5] if res[5] != '' else None
-        pass
+        return cls._intern(
+            res[3] if res[0] == '' else res[2],
+            res[4] if res[0] == '' else res[0],
+            res[1] if res[1] != '' else res[5] if res[5] != '' else None,
+        )
 
-    def find_in_text(self, text):
+    @classmethod
+    def _intern(cls, last_name, first_name, middle_name):
+        key = (sys.intern(last_name), sys.intern(first_name), sys.intern(middle_name) if middle_name else None)
+        with cls._interned_lock:
+            author = cls._interned.get(key)
+            if author is None:
+                author = object.__new__(cls)
+                author.last_name, author.first_name, author.middle_name = key
+                cls._interned[key] = author
+        return author
+
+    def __reduce__(self):
+        return _Author._intern, self._key()
+
+    def _key(self):
+        return self.last_name, self.first_name, self.middle_name
+
+    def __eq__(self, other):
+        return isinstance(other, _Author) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def find_in_text(self, text, tolerance: int = DEFAULT_TOLERANCE):
+        """
+        :param tolerance: допустимое кол-во опечаток в фамилии (Domain.fuzzy), 0 - только точное совпадение
+        """
+        text = normalize(text)
         for case in self.cases():
             if case in text:
                 return True
-        return False
+        return bool(tolerance) and mentions(text, self.last_name, self.first_name, tolerance)
 
-    def cases(self):
-        if self.middle_name is None:
-            res = [t.format(self.first_name, self.last_name)
-                   for t in ['{0}.{1}', '{0}. {1}', '{1} {0}.', '{1}, {0}.']]
-        else:
-            res = [t.format(self.first_name, self.middle_name, self.last_name)
-                   for t in ['{0}.{1}.{2}', '{0}. {1}. {2}', '{0}.{1}. {2}',
-                             '{2} {0}.{1}.', '{2} {0}. {1}.', '{2}, {0}.{1}', '{2}, {0}. {1}.']]
-        return res
+    def cases(self) -> Tuple[str, ...]:
+        return _author_cases(self.last_name, self.first_name, self.middle_name)
 
     def __str__(self):
         res = [self.last_name]
@@ -77,18 +138,20 @@ class _Author:
         return ' '.join(res)
 
 
+_NO_AUTHORS: Tuple[_Author, ...] = ()
+
+
 class SourceData:
+    __slots__ = ('text', 'index', 'year', 'authors', 'name', 'original', 'is_modern', '_links', '_e_link')
+
     _author_regex = re.compile(
         r'(?:[A-Я][а-я^\-]+[,\.]?(?:[\s]?[А-Я]\.){1,2})|(?:(?:[А-Я]\.[\s]?){1,2}\s[A-Я][а-я^\-]+)'
     )
-    _index_regex: re.compile
-
     text: str
     index: int
-    authors: set = None
-    year: int
-    links: List[str]
-    is_modern = None
+    authors: Tuple[_Author, ...]
+    year: Optional[int]
+    is_modern: Optional[bool]
 
     def __init__(self, text, index, year: Optional[int] = None, link: Optional[str] = None,
                  authors: Optional[List[str]] = None, name: str = None, original: str = None):
@@ -97,23 +160,18 @@ class SourceData:
         self._links = None
         self.original = original
         self.name = name
+        self.is_modern = None
 
-        self.index_regex = re.compile(
-            r'(?:\[(?:[0-9]+,\s?)*' + str(self.index) + r'(?:,\s?[0-9]+)*(?:,\s[СCcс]\.\s[0-9]+)?\])'
-        )
-
-        self.authors = set()
         if authors is None:
-            authors_names = self._author_regex.findall(text)
-            if authors_names is not None and len(authors_names):
-                self.authors = set()
-                for author in authors_names:
-                    try:
-                        self.authors.add(_Author(author))
-                    except NoAuthorException:
-                        pass
+            parsed = []
+            for author in self._author_regex.findall(text):
+                try:
+                    parsed.append(_Author(author))
+                except NoAuthorException:
+                    pass
+            self.authors = tuple(dict.fromkeys(parsed)) if parsed else _NO_AUTHORS
         else:
-            self.authors = set(map(_Author, authors))
+            self.authors = tuple(dict.fromkeys(map(_Author, authors))) if authors else _NO_AUTHORS
 
         self.year = year
 
@@ -131,40 +189,70 @@ class SourceData:
             return self.text
         return self.original
 
-    def find_links(self, document: 'Referat', check_authors=True, search_links=True):
-        links = []
+    def find_links(self, document: 'Referat', check_authors=True, search_links=True,
+                   tolerance: int = DEFAULT_TOLERANCE):
+        body = document.body()
+        positions = set(document.citations.positions(self.index))
+
+        if check_authors and self.authors:
+            positions.update(document.author_links(self.authors, tolerance))
 
-        for index, paragraph in enumerate(reversed(document.body())):
-            if paragraph == self.original:
+        links = []
+        for index in sorted(positions, reverse=True):
+            if body[index] == self.original:
                 continue
-            if len(self.index_regex.findall(paragraph)):
-                links.append(paragraph)
-                if not search_links:
-                    break
-            if check_authors \
-                    and self.authors is not None \
-                    and len(self.authors) \
-                    and all(author.find_in_text(paragraph) for author in self.authors):
-                links.append(paragraph)
-                if not search_links:
-                    break
-        self._links = links
-        return links
+            links.append(index)
+            if not search_links:
+                break
+        # абзацы не копируются: хранятся номера абзацев документа
+        self._links = ParagraphRefs(body, tuple(links)) if links else ()
+        return self._links
+
+    def detach_links(self, paragraphs: Optional[Dict[int, str]] = None):
+        """
+        Заменяет ссылки на абзацы документа строками, чтобы источник не удерживал в памяти весь документ.
+        :param paragraphs: уже созданные строки абзацев (номер -> абзац), общие для источников одного документа,
+            чтобы абзац, на который ссылаются несколько источников, хранился один раз
+        """
+        links = self._links
+        if not isinstance(links, ParagraphRefs):
+            return
+        if paragraphs is None:
+            paragraphs = {}
+        self._links = tuple(
+            paragraphs[position] if position in paragraphs
+            else paragraphs.setdefault(position, links.paragraphs[position])
+            for position in links.positions
+        )
 
     @property
     def has_links(self) -> bool:
         return bool(self.links)
 
     @property
-    def links(self) -> List[str]:
+    def links(self) -> Optional[Sequence[str]]:
         return self._links
 
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            index=self.index,
+            text=self.text,
+            name=self.name,
+            original=self.original,
+            year=self.year,
+            link=self._e_link,
+            authors=sorted(map(str, self.authors)),
+            is_modern=self.is_modern,
+            has_links=self.has_links,
+            links=len(self.links or ()),
+        )
+
     def set_limit_year(self, year):
         if self.year:
             self.is_modern = self.year >= year
 
 
-class Referat(collections.Collection):
+class Referat(collections.abc.Collection):
     def __len__(self) -> int:
         return len(self._raw)
 
@@ -174,124 +262,439 @@ class Referat(collections.Collection):
     def __contains__(self, __x: object) -> bool:
         return __x in self._raw
 
-    def __init__(self, paragraphs: List[str], declare_text: Callable[[], str]):
-        self._raw = paragraphs
-
-        self._source_header_index = self._find_source_paragraph_index(check_paragraph_to_source_header)
-        if not self._source_header_index:
-            user_text = declare_text()
-            self._source_header_index = self._find_source_paragraph_index(lambda x: x == user_text)
-
-    def _find_source_paragraph_index(self, is_source_header):
-        for i, el in enumerate(reversed(self._raw)):
-            if is_source_header(el):
-                return len(self._raw) - i
-
-    def body(self) -> List[str]:
+    def __init__(self, paragraphs: Iterable[str], declare_text: Optional[Callable[[], str]],
+                 locator: Optional[HeaderLocator] = None, template: Optional[str] = None):
+        """
+        :param paragraphs: абзацы работы
+        :param declare_text: функция, запрашивающая заголовок списка литературы, если он не найден
+            или уверенность в нем ниже locator.min_confidence.
+            Если None, то в этом случае выбрасывается NoSourcesException.
+        :param locator: HeaderLocator, по умолчанию без запомненных заголовков
+        :param template: шаблон документа, для которого запоминается указанный пользователем заголовок
+        """
+        self._raw = ParagraphStore(paragraphs)
+
+        locator = locator or HeaderLocator()
+        self.header = locator.locate(self._raw, template)
+        if self.header is None or self.header.confidence < locator.min_confidence:
+            if declare_text is None:
+                raise NoSourcesException(self.header)
+            header = locator.find_exact(self._raw, declare_text())
+            if header is None:
+                raise NoSourcesException(self.header)
+            locator.remember(header.text, template)
+            self.header = header
+        self._source_header_index = self.header.sources_start
+        self.reset_indexes()
+
+    def reset_indexes(self):
+        """
+        Удаляет построенные индексы ссылок и авторов и нормализованный текст; они строятся заново при обращении.
+        """
+        self._citations = None
+        self._authors = AuthorIndex((), ())
+        self._fuzzy_authors: Dict[int, AuthorIndex] = {}  # допустимое кол-во опечаток -> индекс
+        self._trigrams: Optional[TrigramIndex] = None
+        self._matching = ParagraphStore()
+
+    def body(self) -> ParagraphView:
         return self._raw[:self._source_header_index]
 
-    def sources(self) -> List[str]:
+    def matching_body(self) -> ParagraphStore:
+        """
+        Текст работы в канонической форме для поиска ссылок (Domain.normalize).
+        Каждый абзац приводится к ней один раз, позиции совпадают с body().
+        Абзацы нормализуются по мере обращения к ним частями, растущими вдвое.
+        """
+        self._normalize_until(self._source_header_index)
+        return self._matching
+
+    def _matching_paragraph(self, position: int) -> str:
+        if position >= len(self._matching):
+            self._normalize_until(position + 1)
+        return self._matching[position]
+
+    def _normalize_until(self, end: int):
+        done = len(self._matching)
+        if end > done:
+            end = min(max(end, 2 * done), self._source_header_index)
+            self._matching.extend(map(normalize, self._raw[done:end]))
+
+    def sources(self) -> ParagraphView:
         return self._raw[self._source_header_index:]
 
+    def index_citations(self) -> CitationIndex:
+        """
+        Строит индекс скобочных ссылок по тексту работы, если он еще не построен.
+        """
+        if self._citations is None:
+            self._citations = CitationIndex(self.body())
+        return self._citations
+
+    @property
+    def citations(self) -> CitationIndex:
+        return self.index_citations()
+
+    def trigram_index(self) -> TrigramIndex:
+        """
+        Индекс слов текста работы для поиска авторов с опечатками; строится один раз.
+        """
+        if self._trigrams is None:
+            self._trigrams = TrigramIndex(self.matching_body())
+        return self._trigrams
+
+    def index_authors(self, authors: Iterable[_Author], tolerance: int = DEFAULT_TOLERANCE):
+        """
+        Добавляет авторов в индекс упоминаний. Текст работы просматривается
+        один раз для всех ещё не проиндексированных авторов.
+        :param tolerance: допустимое кол-во опечаток в фамилии (Domain.fuzzy)
+        """
+        authors = set(authors)
+        missing = {author for author in authors if author not in self._authors}
+        if missing:
+            self._authors.update(AuthorIndex(missing, self.matching_body()))
+        if not tolerance:
+            return
+
+        fuzzy = self._fuzzy_authors.setdefault(tolerance, AuthorIndex((), ()))
+        missing = {author for author in authors if author not in fuzzy}
+        if missing:
+            trigrams = self.trigram_index()
+            fuzzy.update(AuthorIndex.from_positions({
+                author: self._authors.positions(author) | trigrams.positions(
+                    author.last_name, author.first_name, tolerance)
+                for author in missing
+            }))
+
+    def coverage(self, sources: List[SourceData], check_authors=True, tolerance: int = DEFAULT_TOLERANCE) -> int:
+        """
+        Отмечает, на какие источники есть хотя бы одна ссылка, не собирая все ссылки.
+        Текст читается по порядку, пока не найдется ссылка на каждый источник;
+        источники без ссылок хранятся в битовой маске.
+        Источнику записывается первый абзац со ссылкой на него (как find_links с search_links=False).
+        :param tolerance: допустимое кол-во опечаток в фамилиях авторов (Domain.fuzzy); если после
+            точного поиска остались источники без ссылок, то они ищутся с опечатками по всему тексту
+        :return: кол-во прочитанных абзацев
+        """
+        uncited = (1 << len(sources)) - 1
+        by_number: Dict[int, int] = collections.defaultdict(int)  # номер источника -> маска источников
+        by_author: Dict[_Author, int] = collections.defaultdict(int)  # автор -> маска источников
+        for bit, source in enumerate(sources):
+            source._links = ()
+            by_number[source.index] |= 1 << bit
+            if check_authors:
+                for author in source.authors:
+                    by_author[author] |= 1 << bit
+        with_authors = functools.reduce(operator.or_, by_author.values(), 0)
+        automaton = AhoCorasick((case, author) for author in by_author for case in author.cases()) \
+            if by_author else None
+
+        body = self.body()
+        for position, paragraph in enumerate(body):
+            cited = 0
+            if '[' in paragraph:
+                for number in iter_citations(paragraph):
+                    cited |= by_number.get(number, 0)
+
+            if automaton is not None and uncited & with_authors:
+                found = automaton.find(self._matching_paragraph(position))
+                candidates = functools.reduce(operator.or_, (by_author[author] for author in found), 0)
+                for bit in _bits(candidates & uncited & ~cited):
+                    if found.issuperset(sources[bit].authors):
+                        cited |= 1 << bit
+
+            for bit in _bits(cited & uncited):
+                source = sources[bit]
+                if paragraph != source.original:
+                    source._links = ParagraphRefs(body, (position,))
+                    uncited &= ~(1 << bit)
+            if not uncited:
+                return position + 1
+
+        # упоминания с опечатками ищутся только для источников, на которые не нашлось точных ссылок
+        if tolerance and uncited & with_authors:
+            # индекс с опечатками включает и точные упоминания: источник с несколькими авторами находится,
+            # даже если один автор упомянут только точно, а другой - только с опечаткой (как в find_links)
+            remaining = [sources[bit] for bit in _bits(uncited & with_authors)]
+            self.index_authors({author for source in remaining for author in source.authors}, tolerance)
+            for source in remaining:
+                for position in sorted(self.author_links(source.authors, tolerance)):
+                    if body[position] != source.original:
+                        source._links = ParagraphRefs(body, (position,))
+                        break
+        return len(body)
+
+    def author_links(self, authors: Iterable[_Author], tolerance: int = DEFAULT_TOLERANCE) -> Set[int]:
+        """
+        :param tolerance: допустимое кол-во опечаток в фамилиях (Domain.fuzzy)
+        :return: позиции абзацев, в которых упомянуты все переданные авторы
+        """
+        authors = list(authors)
+        self.index_authors(authors, tolerance)
+        return common_positions(self._fuzzy_authors[tolerance] if tolerance else self._authors, authors)
+
+
+_YEAR_REGEX = re.compile('[1-2][0-9]{3}')
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """
+    Номера установленных битов маски по возрастанию.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
 
 def get_year(source):
     """
-    Возвращает год выхода источника
+    Возвращает год выхода источника: наибольшее из чисел 1000-2999 в тексте, не больше текущего года
     :param source: str
     :return: int or None
     """
-
-    years = [int(year) for year in re.findall('[1-2][0-9]{3}', source)]
     current_year = datetime.now().year
-    years = [x for x in years if x <= current_year]
-    if len(years) == 0:
-        return None
-    if len(years) == 1:
-        return years[0]
-    return max(years)
+    return max((year for year in map(int, _YEAR_REGEX.findall(source)) if year <= current_year), default=None)
 
 
-def check_paragraph_to_source_header(text):
+@functools.lru_cache(maxsize=None)
+def default_grammar() -> Grammar:
     """
-    Проверяет евляется ли переданный текст заголовком списка источников.
-    :param text: str
-    :return: bool
+    Форматы записей по умолчанию (Domain/formats.json). Загружаются при первой проверке,
+    а не при импорте модуля, чтобы не замедлять открытие окна.
     """
-    return bool(len(
-        re.findall(
-            r'^(?:(?:(?:[сС]писок|[иИ]спользованн)[а-я]*\s)?(?:использ[а-я]*\s)?(?:(?:[Лл]итератур|[иИ]сточник)[а-я]*\s*и?\s*)+(?:[.:])?)$',
-            text, re.I)))
-
-
-LINK = r'(https?://(?:[\w\-]*\.?)+(?:/[\w\d\-]*)+(?:.html)?)'
-NUMBER = r'^(?:(?P<index>\d+)\s*[\.\?\)]?\s*)'
-AUTHOR = r'(?P<authors>(?:\w+\,?\s+\w+\.?(?:\s*\w+\.?)?)|(?:\w\.(?:\s*\w+\.?)?\,\s*\w+))'
-
-MAP: Dict[Any, Callable[[Sequence[Union[str, bytes]], str], SourceData]] = {
-    # 1. https://address.com/path описание
-    re.compile(NUMBER + LINK + r'\s(.*\s?)+?'):
-        (lambda groups, original: SourceData(
-            groups[2],
-            int(groups[0]),
-            link=groups[1],
-            original=original,
-        )),
-
-    # 1. Фамилия И.О., работа / ФИО // год ...
-    re.compile(NUMBER + AUTHOR + r'(.*)(?:,\s/\s?.*)(?:\s//\s)(\d{4})'):
-        (lambda groups, original: SourceData(
-            ' '.join([groups[1], groups[2]]),
-            index=int(groups[0]),
-            year=int(groups[3]),
-            authors=[groups[1]],
-            original=original,
-            name=groups[1]
-        )),
-
-    re.compile(NUMBER + r'(\w+\s+\w\.(?:\w\.?)?,?)+\s((?:[\w\":\-.]*\s?)+).*(\d{4})'):
-        (lambda groups, original: SourceData(
-            ' '.join([groups[1], groups[2]]),
-            int(groups[0]),
-            int(groups[3]),
-            original=original)
-         ),
-
-    re.compile(NUMBER + r'([\w\s«»\[\]:\-]*[Ээ]лектронный ресурс[\w\s«»\[\]:\-]*)<?' + LINK):
-        (lambda groups, original: SourceData(
-            groups[1],
-            int(groups[0]),
-            link=groups[2],
-            original=original
-        ))
-}
-
-
-def try_build_source(paragraph: str):
-    for reg, builder in MAP.items():
-        res = re.match(reg, paragraph)
-        if res:
-            groups = res.groups()
-            try:
-                print(reg.pattern)
-                return builder(groups, paragraph)
-            except ValueError:
-                print(reg.pattern, paragraph)
+    return Grammar.load()
+
+
+def try_build_source(paragraph: str, profiler=NULL_PROFILER, grammar: Optional[Grammar] = None):
+    """
+    Разбирает запись списка литературы по первому подходящему формату.
+    :param grammar: форматы записей, по умолчанию default_grammar()
+    :return: SourceData или None
+    """
+    grammar = grammar or default_grammar()
+    start = 0
+    while True:
+        res = grammar.match(paragraph, start, profiler)
+        if res is None:
+            return None
+        entry_format, groups = res
+        try:
+            source = SourceData(original=paragraph, **entry_format.values(groups))
+        except ValueError:
+            profiler.count('format_errors', entry_format.name)
+            start = grammar.index(entry_format) + 1
+        else:
+            profiler.count('format_matches', entry_format.name)
+            return source
+
+
+class Analysis:
+    """
+    Проверка одного файла, разбитая на этапы. Результат каждого этапа запоминается вместе
+    с входными данными, от которых он зависит, поэтому при смене настроек повторно
+    выполняются только затронутые этапы:
+
+        extraction   - чтение файла и поиск заголовка списка литературы (файл)
+        bibliography - разбор записей списка литературы (extraction, grammar)
+        links        - поиск ссылок на источники (bibliography, check_authors, search_links, fuzzy)
+        age          - отметка устаревших источников (bibliography, min_year)
+    """
+
+    def __init__(self, file_path, declare_text: Optional[Callable[[], str]] = None,
+                 grammar: Optional[Grammar] = None, cache=None, locator: Optional[HeaderLocator] = None):
+        self.file_path = file_path
+        self.declare_text = declare_text
+        self.grammar = grammar or default_grammar()
+        self.cache = cache
+        self.locator = locator
+
+        self.document: Optional[Referat] = None
+        self.header = None  # HeaderMatch найденного заголовка списка литературы
+        self.sources: Optional[List[SourceData]] = None
+        self._keys: Dict[str, Any] = {}
+
+    def _file_key(self):
+        stat = os.stat(self.file_path)
+        return str(self.file_path), stat.st_mtime_ns, stat.st_size
+
+    def _is_actual(self, stage, key) -> bool:
+        return self._keys.get(stage) == key
+
+    def _extract(self, file_key, profiler):
+        if self._is_actual('extraction', file_key):
+            return
+        # абзацы не собираются в список: Referat читает их из генератора по одному,
+        # поэтому этап referat включает в себя extract
+        with profiler.stage('referat'):
+            self.document = Referat(self._iter_paragraphs(profiler), declare_text=self.declare_text,
+                                    locator=self.locator, template=document_template(self.file_path))
+        self.header = self.document.header
+        self._keys['extraction'] = file_key
+
+    def _iter_paragraphs(self, profiler):
+        with profiler.stage('extract'):
+            yield from iter_paragraphs(self.file_path, profiler)
+
+    def _parse(self, bibliography_key, events, profiler):
+        sources = []
+        len_body = len(self.document.sources())
+        if not len_body:
+            raise NoSourcesException()
+
+        events.stage('parse')
+        with profiler.stage('parse_entries'):
+            for index, paragraph in enumerate(self.document.sources()):
+                events.entry(index, len_body)
+                if not paragraph:
+                    continue
+
+                source = try_build_source(paragraph, profiler, self.grammar)
+                if source:
+                    sources.append(source)
+
+        self.sources = sources
+        self._keys['bibliography'] = bibliography_key
+
+    def _find_links(self, links_key, check_authors, search_links, fuzzy, profiler):
+        document = self.document
+        if not search_links:
+            # нужен только список источников без ссылок - текст читается до первой ссылки на каждый источник
+            with profiler.stage('find_links'):
+                read = document.coverage(self.sources, check_authors=check_authors, tolerance=fuzzy)
+            profiler.count('coverage', 'paragraphs_read', read)
+            profiler.count('coverage', 'paragraphs_total', len(document.body()))
+            self._detach_links()
+            self._keys['links'] = links_key
+            return
+
+        with profiler.stage('citation_index'):
+            document.index_citations()
+        if check_authors:
+            with profiler.stage('author_index'):
+                document.index_authors((author for source in self.sources for author in source.authors), fuzzy)
+        with profiler.stage('find_links'):
+            for source in self.sources:
+                source.find_links(document, check_authors=check_authors, search_links=search_links, tolerance=fuzzy)
+        self._detach_links()
+        self._keys['links'] = links_key
+
+    def _detach_links(self):
+        # результат не должен удерживать документ: ссылки превращаются в строки, общие для всех источников
+        paragraphs = {}
+        for source in self.sources:
+            source.detach_links(paragraphs)
+
+    def _set_age(self, age_key, min_year):
+        if min_year is not None:
+            for source in self.sources:
+                source.set_limit_year(min_year)
+        self._keys['age'] = age_key
+
+    def run(self, events: EventChannel = NULL_CHANNEL, profiler=NULL_PROFILER, **settings) -> List[SourceData]:
+        """
+        :param events: канал, в который передается ход проверки (Domain.events)
+        :param settings: min_year, check_authors, search_links, fuzzy (см. find_missing_src)
+        :return: List[SourceData]
+        """
+        check_authors = settings.get('check_authors', True)
+        search_links = settings.get('search_links', True)
+        fuzzy = settings.get('fuzzy', DEFAULT_TOLERANCE)
+        min_year = settings.get('min_year')
+
+        file_key = self._file_key()
+        bibliography_key = (file_key, self.grammar.fingerprint)
+        links_key = (bibliography_key, check_authors, search_links, fuzzy)
+        age_key = (bibliography_key, min_year)
+
+        cache_key = None
+        if self.cache is not None and not self._is_actual('links', links_key):
+            with profiler.stage('cache.get'):
+                cache_key = self.cache.key(self.file_path, analysis_settings(grammar=self.grammar, locator=self.locator, **settings))
+                cached = self.cache.get(cache_key)
+            profiler.count('cache', 'hit' if cached is not None else 'miss')
+            if cached is not None:
+                self.sources, self.header = cached
+                self._keys.update(bibliography=bibliography_key, links=links_key, age=age_key)
+                self._finished(events)
+                return self.sources
+
+        if not self._is_actual('bibliography', bibliography_key):
+            self._extract(file_key, profiler)
+            self._parse(bibliography_key, events, profiler)
+
+        if not self._is_actual('links', links_key):
+            events.stage('links')
+            self._extract(file_key, profiler)
+            self._find_links(links_key, check_authors, search_links, fuzzy, profiler)
+
+        if not self._is_actual('age', age_key):
+            self._set_age(age_key, min_year)
+
+        if cache_key is not None:
+            with profiler.stage('cache.put'):
+                self.cache.put(cache_key, (self.sources, self.header))
+
+        self._finished(events)
+        return self.sources
+
+    def _finished(self, events: EventChannel):
+        events.finished(
+            sources=len(self.sources),
+            missing=sum(1 for source in self.sources if not source.has_links),
+            outdated=sum(1 for source in self.sources if source.is_modern is False),
+        )
+
+
+def analysis_settings(**kwargs) -> Dict[str, Any]:
+    """
+    Настройки, от которых зависит результат проверки. Используются как часть ключа кэша.
+    """
+    return dict(
+        min_year=kwargs.get('min_year'),
+        check_authors=kwargs.get('check_authors', True),
+        search_links=kwargs.get('search_links', True),
+        fuzzy=kwargs.get('fuzzy', DEFAULT_TOLERANCE),
+        grammar=(kwargs.get('grammar') or default_grammar()).fingerprint,
+        locator=(kwargs.get('locator') or HeaderLocator()).fingerprint,
+    )
 
 
 def find_missing_src(file_path, callback=lambda x, y: None, declare_text: Callable[[], str] = None, **kwargs):
     """
     :param declare_text: функция точного поиска заголовка списка исопльзованной литературы
     :param file_path: str путь к файлу
-    :param callback: Callable[str, int[0:100]] принимает строку о текущей задаче и число с текущим процентом выполнения
+    :param callback: Callable[str, int[0:100]] принимает строку о текущей задаче и число с текущим процентом выполнения;
+        вызывается не чаще раза в events.DEFAULT_INTERVAL секунд
     :param kwargs:
         :key min_year: int
             Все источники, которые были созданы ниже указанного года, будут помечены как устревшие
 
-        :key check_author: bool
+        :key check_authors: bool
             если True, то включает проверку ссылок по авторам источников
 
         :key search_links: bool
-            если True, то включает сбор абзацев, в которых есть ссылки на каждую из ссылок
+            если True, то включает сбор абзацев, в которых есть ссылки на каждую из ссылок;
+            если False, то текст читается только до первой ссылки на каждый источник
+
+        :key fuzzy: int
+            допустимое кол-во опечаток в фамилии автора при проверке по авторам (Domain.fuzzy);
+            0 - только точное совпадение
+
+        :key cache: ResultCache
+            если передан, то результат берется из кэша, а после проверки сохраняется в него
+
+        :key grammar: Grammar
+            форматы записей списка литературы, по умолчанию default_grammar() (Domain/formats.json)
+
+        :key profiler: Profiler
+            если передан, то в него записываются замеры по этапам проверки
+
+        :key locator: HeaderLocator
+            поиск заголовка списка литературы, по умолчанию без запомненных заголовков
+
+        :key events: EventChannel
+            если передан, то ход проверки передается в него, а callback не используется
 
     :return: List[SourceData]
         возвращает список всех источников
@@ -301,26 +704,11 @@ def find_missing_src(file_path, callback=lambda x, y: None, declare_text: Callab
 
     if not os.path.isfile(file_path):
         return None, None
-    else:
-        document = Referat(
-            list(map(lambda x: x.strip(), filter(None, process(file_path).split('\n')))),
-            declare_text=declare_text,
-        )
-
-        sources = []
-        len_body = len(document.sources())
-        if not len_body:
-            raise NoSourcesException()
-
-        for index, paragraph in enumerate(document.sources()):
-            callback('Поиск источников', round(index * 100 / len_body))
-            if not paragraph:
-                continue
-
-            source = try_build_source(paragraph)
-            if source:
-                source.find_links(document)
-                sources.append(source)
 
-    callback("Завершение", 100)
+    profiler = kwargs.pop('profiler', None) or NULL_PROFILER
+    events = kwargs.pop('events', None) or EventChannel(CallbackSink(callback), document=file_path)
+    analysis = Analysis(file_path, declare_text, kwargs.pop('grammar', None), kwargs.pop('cache', None),
+                        kwargs.pop('locator', None))
+    with profiler.stage('find_missing_src'):
+        sources = analysis.run(events, profiler, **kwargs)
     return sources
@@ -0,0 +1,111 @@
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Sequence, Set, Tuple
+
+
+class AhoCorasick:
+    """
+    Автомат Ахо-Корасик: поиск всех шаблонов за один проход по тексту.
+    Каждому шаблону соответствует набор ключей, которые возвращаются при совпадении.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Hashable]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[Hashable]] = [set()]
+
+        for pattern, key in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                state = next_state
+            self._output[state].add(key)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def find(self, text: str) -> Set[Hashable]:
+        """
+        :param text: str
+        :return: ключи всех шаблонов, встретившихся в тексте
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class AuthorIndex:
+    """
+    Позиции абзацев, в которых упомянут каждый из авторов.
+    Шаблоны всех авторов ищутся одним автоматом за один проход по тексту.
+    Абзацы передаются в канонической форме (Domain.normalize).
+    """
+
+    def __init__(self, authors: Iterable, paragraphs: Sequence[str]):
+        authors = set(authors)
+        self._positions: Dict[Hashable, Set[int]] = {author: set() for author in authors}
+
+        if not authors:
+            return
+
+        automaton = AhoCorasick((case, author) for author in authors for case in author.cases())
+        for position, paragraph in enumerate(paragraphs):
+            for author in automaton.find(paragraph):
+                self._positions[author].add(position)
+
+    @classmethod
+    def from_positions(cls, positions: Dict[Hashable, Set[int]]) -> 'AuthorIndex':
+        """
+        Индекс по уже найденным позициям (например, с учетом опечаток, Domain.fuzzy).
+        """
+        index = cls((), ())
+        index._positions.update(positions)
+        return index
+
+    def __contains__(self, author) -> bool:
+        return author in self._positions
+
+    def positions(self, author) -> Set[int]:
+        return self._positions.get(author, set())
+
+    def update(self, other: 'AuthorIndex'):
+        self._positions.update(other._positions)
+
+
+def common_positions(index: AuthorIndex, authors: Iterable) -> Set[int]:
+    """
+    :return: позиции абзацев, в которых упомянуты все переданные авторы
+    """
+    positions = None
+    for author in authors:
+        author_positions = index.positions(author)
+        positions = set(author_positions) if positions is None else positions & author_positions
+        if not positions:
+            break
+    return positions or set()
+
@@ -0,0 +1,116 @@
+"""
+Кэш результатов проверки на диске (SQLite).
+Ключ - хэш содержимого файла и отпечаток настроек анализа.
+"""
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CACHE_VERSION = 4  # увеличивается при изменении формата сохраняемых данных
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024  # байт
+
+
+def default_cache_path() -> Path:
+    return Path.home() / '.source_checker' / 'cache.sqlite3'
+
+
+def file_hash(file_path) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_fingerprint(settings: Dict[str, Any]) -> str:
+    data = json.dumps(dict(settings, version=CACHE_VERSION), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Хранит сериализованные результаты проверки документов.
+    При превышении max_size байт удаляются записи, которые дольше всего не запрашивались.
+    """
+
+    def __init__(self, path=None, max_size: int = DEFAULT_MAX_SIZE):
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)'
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    @staticmethod
+    def key(file_path, settings: Dict[str, Any]) -> str:
+        return '{}:{}'.format(file_hash(file_path), settings_fingerprint(settings))
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock, self._connection:
+            row = self._connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            try:
+                value = pickle.loads(row[0])
+            except Exception:
+                self._connection.execute('DELETE FROM results WHERE key = ?', (key,))
+                return None
+            self._connection.execute('UPDATE results SET used = ? WHERE key = ?', (time.time(), key))
+            return value
+
+    def put(self, key: str, value: Any):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO results (key, value, size, used) VALUES (?, ?, ?, ?)',
+                (key, data, len(data), time.time())
+            )
+            self._evict()
+
+    def _evict(self):
+        total = 0
+        expired = []
+        for key, size in self._connection.execute('SELECT key, size FROM results ORDER BY used DESC'):
+            total += size
+            if total > self.max_size:
+                expired.append((key,))
+        self._connection.executemany('DELETE FROM results WHERE key = ?', expired)
+
+    def invalidate(self, file_path):
+        """
+        Удаляет результаты проверки файла для всех настроек.
+        """
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM results WHERE key LIKE ?', (file_hash(file_path) + ':%',))
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM results')
+        self._connection.execute('VACUUM')
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
@@ -0,0 +1,46 @@
+import re
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+# [1], [1, 2], [3,4, С. 25]
+_CITATION_REGEX = re.compile(r'\[((?:[0-9]+,\s?)*[0-9]+)(?:,\s[СCcс]\.\s[0-9]+)?\]')
+
+
+def iter_citations(paragraph: str):
+    """
+    Возвращает номера источников из всех скобочных ссылок абзаца.
+    :param paragraph: str
+    :return: Iterator[int]
+    """
+    for numbers in _CITATION_REGEX.findall(paragraph):
+        for number in numbers.split(','):
+            yield int(number)
+
+
+class CitationIndex:
+    """
+    Обратный индекс ссылок: номер источника -> позиции абзацев, в которых он упомянут.
+    Строится за один проход по тексту работы.
+    """
+
+    def __init__(self, paragraphs: Sequence[str]):
+        self._positions: Dict[int, List[int]] = defaultdict(list)
+
+        for position, paragraph in enumerate(paragraphs):
+            if '[' not in paragraph:
+                continue
+            for number in set(iter_citations(paragraph)):
+                self._positions[number].append(position)
+
+    def __contains__(self, number: int) -> bool:
+        return number in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def positions(self, number: int) -> List[int]:
+        """
+        :param number: номер источника
+        :return: позиции абзацев по возрастанию
+        """
+        return self._positions.get(number, [])
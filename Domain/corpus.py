@@ -0,0 +1,309 @@
+"""
+Индекс списков литературы множества работ (SQLite).
+Записи приводятся к нормальной форме, для каждой считается MinHash сигнатура,
+а похожие записи находятся через LSH: сигнатура делится на полосы, записи с совпавшей
+полосой попадают в одну корзину и сравниваются. Так одинаковые источники, записанные
+по-разному, объединяются в кластеры без попарного сравнения всех записей корпуса.
+"""
+import functools
+import hashlib
+import operator
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from Domain.cache import file_hash
+
+NUM_PERM = 64  # длина сигнатуры
+BANDS = 16  # NUM_PERM = BANDS * ROWS; порог срабатывания LSH ~ (1 / BANDS) ** (1 / ROWS) = 0.5
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 4  # символов
+DEFAULT_THRESHOLD = 0.6  # минимальное сходство записей одного кластера
+
+_SERVICE_REGEX = re.compile(
+    r'\[[^\]]*\]'  # [Электронный ресурс], [Текст]
+    r'|\(дата обращения[^)]*\)'
+    r'|(?:url|режим доступа)\s*:?\s*\S+'
+    r'|https?://\S+',
+    re.IGNORECASE
+)
+_NON_WORD_REGEX = re.compile(r'[\W_]+')
+
+
+def default_corpus_path() -> Path:
+    return Path.home() / '.source_checker' / 'corpus.sqlite3'
+
+
+def normalize_entry(text: str) -> str:
+    """
+    Нормальная форма записи: без служебных пометок, ссылок и знаков препинания, в нижнем регистре.
+    """
+    text = _SERVICE_REGEX.sub(' ', text.lower().replace('ё', 'е'))
+    return _NON_WORD_REGEX.sub(' ', text).strip()
+
+
+def shingles(text: str) -> Set[str]:
+    """
+    :param text: запись в нормальной форме
+    """
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _shingle_hashes(shingle: str) -> array:
+    # одно значение на каждую "перестановку"; хэш не зависит от PYTHONHASHSEED,
+    # поэтому сигнатуры можно хранить на диске
+    return array('I', hashlib.shake_128(shingle.encode('utf-8')).digest(4 * NUM_PERM))
+
+
+def signature(text: str) -> Optional[array]:
+    """
+    :return: MinHash сигнатура нормальной формы записи или None для пустой записи
+    """
+    return _signature(normalize_entry(text))
+
+
+@functools.lru_cache(maxsize=4096)
+def _signature(normal: str) -> Optional[array]:
+    rows = [_shingle_hashes(shingle) for shingle in shingles(normal)]
+    if not rows:
+        return None
+    return array('I', map(min, zip(*rows)))
+
+
+def similarity(first: array, second: array) -> float:
+    """
+    Оценка коэффициента Жаккара по сигнатурам.
+    """
+    return sum(map(operator.eq, first, second)) / NUM_PERM
+
+
+def band_keys(sign: array) -> List[int]:
+    data = sign.tobytes()
+    size = 4 * ROWS
+    return [int.from_bytes(hashlib.blake2b(data[band * size:(band + 1) * size], digest_size=8,
+                                           salt=band.to_bytes(2, 'little')).digest(), 'little', signed=True)
+            for band in range(BANDS)]
+
+
+class CorpusEntry(NamedTuple):
+    document: str
+    index: int
+    text: str
+    year: Optional[int]
+    cluster: int
+
+
+class Cluster(NamedTuple):
+    id: int
+    text: str  # самая частая запись кластера
+    entries: int
+    documents: int
+    years: Dict[Optional[int], int]  # год издания -> кол-во записей
+
+
+class CorpusIndex:
+    """
+    Хранит записи списков литературы проверенных работ и кластеры одинаковых источников.
+
+    В таблице корзин для каждого кластера хранится не больше одной записи на корзину,
+    поэтому популярные источники не замедляют поиск кандидатов.
+    """
+
+    def __init__(self, path=None, threshold: float = DEFAULT_THRESHOLD):
+        self.path = Path(path) if path is not None else default_corpus_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript('''
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, hash TEXT NOT NULL, added REAL NOT NULL);
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY, document INTEGER NOT NULL, idx INTEGER NOT NULL, text TEXT NOT NULL,
+                    normal TEXT NOT NULL, year INTEGER, signature BLOB NOT NULL, cluster INTEGER);
+                CREATE INDEX IF NOT EXISTS entries_document ON entries (document);
+                CREATE INDEX IF NOT EXISTS entries_normal ON entries (normal);
+                CREATE INDEX IF NOT EXISTS entries_cluster ON entries (cluster);
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key INTEGER NOT NULL, cluster INTEGER NOT NULL, entry INTEGER NOT NULL,
+                    PRIMARY KEY (key, cluster));
+                CREATE INDEX IF NOT EXISTS buckets_cluster ON buckets (cluster);
+                CREATE INDEX IF NOT EXISTS buckets_entry ON buckets (entry);
+            ''')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def is_current(self, file_path) -> bool:
+        """
+        :return: True, если файл уже добавлен в индекс и с тех пор не изменился
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT hash FROM documents WHERE path = ?',
+                                           (str(file_path),)).fetchone()
+        return row is not None and row[0] == file_hash(file_path)
+
+    def add_document(self, file_path, sources: Iterable) -> int:
+        """
+        Добавляет (или заменяет) список литературы работы.
+        :param sources: Iterable[SourceData]
+        :return: кол-во добавленных записей
+        """
+        digest = file_hash(file_path)
+        added = 0
+        with self._lock, self._connection:
+            self._remove(str(file_path))
+            document = self._connection.execute(
+                'INSERT INTO documents (path, hash, added) VALUES (?, ?, ?)', (str(file_path), digest, time.time())
+            ).lastrowid
+            for source in sources:
+                if self._add_entry(document, source.index, source.text, source.year):
+                    added += 1
+        return added
+
+    def _add_entry(self, document, index, text, year) -> bool:
+        normal = normalize_entry(text)
+        sign = _signature(normal)
+        if sign is None:
+            return False
+        entry = self._connection.execute(
+            'INSERT INTO entries (document, idx, text, normal, year, signature) VALUES (?, ?, ?, ?, ?, ?)',
+            (document, index, text, normal, year, sign.tobytes())
+        ).lastrowid
+
+        # чаще всего запись скопирована из другой работы без изменений
+        row = self._connection.execute('SELECT cluster FROM entries WHERE normal = ? AND id != ? LIMIT 1',
+                                       (normal, entry)).fetchone()
+        if row is not None:
+            self._connection.execute('UPDATE entries SET cluster = ? WHERE id = ?', (row[0], entry))
+            return True
+
+        keys = band_keys(sign)
+        clusters = self._matching_clusters(sign, keys)
+        cluster = min(clusters) if clusters else entry
+        for other in clusters - {cluster}:
+            self._merge(other, cluster)
+        self._connection.execute('UPDATE entries SET cluster = ? WHERE id = ?', (cluster, entry))
+        self._connection.executemany('INSERT OR IGNORE INTO buckets (key, cluster, entry) VALUES (?, ?, ?)',
+                                     [(key, cluster, entry) for key in keys])
+        return True
+
+    def _matching_clusters(self, sign: array, keys: List[int]) -> Set[int]:
+        candidates = self._connection.execute(
+            'SELECT DISTINCT b.cluster, e.signature FROM buckets b JOIN entries e ON e.id = b.entry '
+            'WHERE b.key IN ({})'.format(','.join('?' * len(keys))), keys
+        )
+        clusters = set()
+        for cluster, data in candidates:
+            if cluster not in clusters and similarity(sign, array('I', data)) >= self.threshold:
+                clusters.add(cluster)
+        return clusters
+
+    def _merge(self, source: int, target: int):
+        self._connection.execute('UPDATE entries SET cluster = ? WHERE cluster = ?', (target, source))
+        self._connection.execute('UPDATE OR IGNORE buckets SET cluster = ? WHERE cluster = ?', (target, source))
+        self._connection.execute('DELETE FROM buckets WHERE cluster = ?', (source,))
+
+    def remove_document(self, file_path):
+        with self._lock, self._connection:
+            self._remove(str(file_path))
+
+    def _remove(self, path: str):
+        row = self._connection.execute('SELECT id FROM documents WHERE path = ?', (path,)).fetchone()
+        if row is None:
+            return
+        document = row[0]
+
+        # корзины удаленной записи передаются копии той же записи из другой работы, оставшейся
+        # в кластере (сигнатура у нее та же); остальные корзины удаляются, кластер по-прежнему
+        # находится через корзины других своих записей
+        for entry, normal, cluster in self._connection.execute(
+                'SELECT id, normal, cluster FROM entries WHERE document = ?', (document,)).fetchall():
+            copy = self._connection.execute(
+                'SELECT id FROM entries WHERE normal = ? AND cluster = ? AND document != ? LIMIT 1',
+                (normal, cluster, document)).fetchone()
+            if copy is not None:
+                self._connection.execute('UPDATE buckets SET entry = ? WHERE entry = ?', (copy[0], entry))
+        self._connection.execute('DELETE FROM buckets WHERE entry IN (SELECT id FROM entries WHERE document = ?)',
+                                 (document,))
+        self._connection.execute('DELETE FROM entries WHERE document = ?', (document,))
+        self._connection.execute('DELETE FROM documents WHERE id = ?', (document,))
+
+    def find_clusters(self, text: str) -> List[int]:
+        """
+        :return: кластеры, в которые попала бы запись text
+        """
+        sign = signature(text)
+        if sign is None:
+            return []
+        with self._lock:
+            return sorted(self._matching_clusters(sign, band_keys(sign)))
+
+    def entries(self, cluster: int) -> List[CorpusEntry]:
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT d.path, e.idx, e.text, e.year, e.cluster FROM entries e '
+                'JOIN documents d ON d.id = e.document WHERE e.cluster = ? ORDER BY d.path, e.idx', (cluster,)
+            ).fetchall()
+        return [CorpusEntry(*row) for row in rows]
+
+    def find(self, text: str) -> List[CorpusEntry]:
+        """
+        :return: записи всех работ, в которых указан источник text
+        """
+        return [entry for cluster in self.find_clusters(text) for entry in self.entries(cluster)]
+
+    def citing_documents(self, text: str) -> List[str]:
+        return sorted({entry.document for entry in self.find(text)})
+
+    def cluster(self, cluster: int) -> Optional[Cluster]:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT document) FROM entries WHERE cluster = ?', (cluster,)
+            ).fetchone()
+            if not row[0]:
+                return None
+            text = self._connection.execute(
+                'SELECT text FROM entries WHERE cluster = ? GROUP BY text ORDER BY COUNT(*) DESC, MIN(id) LIMIT 1',
+                (cluster,)
+            ).fetchone()[0]
+            years = dict(self._connection.execute(
+                'SELECT year, COUNT(*) FROM entries WHERE cluster = ? GROUP BY year ORDER BY year', (cluster,)
+            ))
+        return Cluster(cluster, text, row[0], row[1], years)
+
+    def clusters(self, min_size: int = 2, limit: Optional[int] = None,
+                 before_year: Optional[int] = None) -> List[Cluster]:
+        """
+        Кластеры по убыванию кол-ва работ, в которых указан источник.
+        :param before_year: если задан, то учитываются только записи изданий, вышедших раньше этого года
+        """
+        query = 'SELECT cluster FROM entries {} GROUP BY cluster HAVING COUNT(*) >= ? ' \
+                'ORDER BY COUNT(DISTINCT document) DESC, COUNT(*) DESC, cluster'
+        query = query.format('WHERE year < ?' if before_year is not None else '')
+        params = ([before_year] if before_year is not None else []) + [min_size]
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            ids = [cluster for cluster, in self._connection.execute(query, params)]
+        return [self.cluster(cluster) for cluster in ids]
@@ -1,33 +1,78 @@
 import re
 import zipfile
+from typing import Iterator, List, Optional
 from xml.etree import ElementTree as ET
 
-from docx2txt.docx2txt import qn, xml2text
+from Domain.profiling import NULL_PROFILER
 
+NSMAP = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
 
-def xml2text_endnote(xml):
+
+def qn(tag):
     """
-    A string representing the textual content of this run, with content
-    child elements like ``<w:tab/>`` translated to their Python
-    equivalent.
-    Adapted from: https://github.com/python-openxml/python-docx/
+    Преобразует имя вида 'w:p' в полное имя с пространством имён, как его возвращает ElementTree.
     """
-    text = u''
-    root = ET.fromstring(xml)
+    prefix, tag_root = tag.split(':')
+    return '{{{}}}{}'.format(NSMAP[prefix], tag_root)
 
-    for child in root.iter():
-        if child.tag == qn('w:t'):
-            t_text = child.text
-            text += t_text if t_text is not None else ''
-        elif child.tag == qn('w:endnote') and int(child.attrib.get(qn('w:id'), 0)) > 0:
-            text += f"\n{child.attrib[qn('w:id')]}. "
-    return text
 
+_P = qn('w:p')
+_T = qn('w:t')
+_TAB = qn('w:tab')
+_BREAKS = (qn('w:br'), qn('w:cr'))
+_ENDNOTE = qn('w:endnote')
+_ID = qn('w:id')
 
-def process(docx):
-    text = u''
 
-    # unzip the docx in memory
+def _flush(line: List[str]) -> Iterator[str]:
+    text = ''.join(line).strip()
+    line.clear()
+    if text:
+        yield text
+
+
+def iter_xml_paragraphs(stream, endnotes=False) -> Iterator[str]:
+    """
+    Потоково разбирает xml часть документа и возвращает абзацы по одному.
+    Разобранные элементы сразу удаляются из дерева, поэтому в памяти находится
+    только текущий абзац.
+
+    :param stream: файловый объект с xml
+    :param endnotes: если True, то разбирается файл концевых сносок:
+        каждая сноска возвращается одной строкой вида "номер. текст"
+    :return: Iterator[str] непустые абзацы без пробелов по краям
+    """
+    line = []
+    stack = []
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            if endnotes:
+                if tag == _ENDNOTE:
+                    yield from _flush(line)
+                    if int(element.attrib.get(_ID, 0)) > 0:
+                        line.append('{}. '.format(element.attrib[_ID]))
+            elif tag == _P or tag in _BREAKS:
+                yield from _flush(line)
+            elif tag == _TAB:
+                line.append('\t')
+            stack.append(element)
+        else:
+            stack.pop()
+            if tag == _T and element.text:
+                line.append(element.text)
+            if stack:
+                stack[-1].remove(element)
+    yield from _flush(line)
+
+
+def iter_paragraphs(docx, profiler=NULL_PROFILER) -> Iterator[str]:
+    """
+    Возвращает абзацы документа по одному: колонтитулы, основной текст и концевые сноски.
+    :param docx: путь к файлу или файловый объект
+    :param profiler: Profiler, замеряет разбор каждой части документа
+    :return: Iterator[str]
+    """
     with zipfile.ZipFile(docx) as zipf:
         filelist = zipf.namelist()
 
@@ -36,21 +81,41 @@ def process(docx):
         header_xmls = 'word/header[0-9]*.xml'
         for fname in filelist:
             if re.match(header_xmls, fname):
-                text += xml2text(zipf.read(fname))
+                with profiler.stage('process.headers'), zipf.open(fname) as stream:
+                    yield from iter_xml_paragraphs(stream)
 
         # get main text
-        doc_xml = 'word/document.xml'
-        text += xml2text(zipf.read(doc_xml))
+        with profiler.stage('process.document'), zipf.open('word/document.xml') as stream:
+            yield from iter_xml_paragraphs(stream)
 
         # get footnotes
         if 'word/endnotes.xml' in filelist:
-            text += xml2text_endnote(zipf.read('word/endnotes.xml'))
+            with profiler.stage('process.endnotes'), zipf.open('word/endnotes.xml') as stream:
+                yield from iter_xml_paragraphs(stream, endnotes=True)
 
         # get footer text
         # there can be 3 footer files in the zip
         footer_xmls = 'word/footer[0-9]*.xml'
         for fname in filelist:
             if re.match(footer_xmls, fname):
-                text += xml2text(zipf.read(fname))
+                with profiler.stage('process.footers'), zipf.open(fname) as stream:
+                    yield from iter_xml_paragraphs(stream)
+
+
+_TEMPLATE = '{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}Template'
+
+
+def document_template(docx) -> Optional[str]:
+    """
+    Имя шаблона, на основе которого создан документ (docProps/app.xml), например "Курсовая.dotx".
+    """
+    with zipfile.ZipFile(docx) as zipf:
+        if 'docProps/app.xml' not in zipf.namelist():
+            return None
+        with zipf.open('docProps/app.xml') as stream:
+            element = ET.parse(stream).find(_TEMPLATE)
+    return element.text.strip() if element is not None and element.text else None
 
-    return text.strip()
+
+def process(docx):
+    return '\n'.join(iter_paragraphs(docx))
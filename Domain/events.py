@@ -0,0 +1,179 @@
+"""
+События хода проверки, общие для приложения, командной строки и журналов.
+
+Проверка сообщает о событиях через EventChannel, а он передает их получателям (sinks) -
+любым функциям от одного аргумента: сигналу Qt, queue.put, записи в журнал.
+События о разборе записей списка литературы передаются не чаще раза в interval секунд,
+поэтому их отправка не замедляет проверку, сколько бы записей ни было. Остальные события
+передаются всегда.
+
+События - NamedTuple, поэтому их можно передавать между процессами через очередь:
+
+    queue = multiprocessing.Manager().Queue()
+    # в дочернем процессе
+    analysis.run(EventChannel(QueueSink(queue), document=file_path))
+    # в основном процессе
+    drain(queue, LoggingSink())
+"""
+import logging
+import time
+from typing import Callable, NamedTuple, Optional, Tuple, Union
+
+DEFAULT_INTERVAL = 0.1  # секунд между событиями о разборе записей
+
+STAGES = {
+    'parse': 'Поиск источников',
+    'links': 'Поиск ссылок',
+}
+
+
+class StageStarted(NamedTuple):
+    document: str
+    stage: str  # ключ STAGES
+    time: float
+
+
+class EntryParsed(NamedTuple):
+    document: str
+    index: int  # номер записи списка литературы, с 0
+    total: int
+    time: float
+
+    @property
+    def percent(self) -> int:
+        return round((self.index + 1) * 100 / self.total) if self.total else 100
+
+
+class DocumentFinished(NamedTuple):
+    document: str
+    sources: int
+    missing: int
+    outdated: int
+    time: float
+
+
+class DocumentFailed(NamedTuple):
+    document: str
+    error: str
+    time: float
+
+
+Event = Union[StageStarted, EntryParsed, DocumentFinished, DocumentFailed]
+Sink = Callable[[Event], None]
+
+
+def progress(event: Event) -> Optional[Tuple[str, int]]:
+    """
+    :return: текст текущего этапа и процент выполнения для индикатора или None
+    """
+    if isinstance(event, StageStarted):
+        return STAGES.get(event.stage, event.stage), 100 if event.stage == 'links' else 0
+    if isinstance(event, EntryParsed):
+        return STAGES['parse'], event.percent
+    if isinstance(event, DocumentFinished):
+        return 'Завершение', 100
+    return None
+
+
+def describe(event: Event) -> str:
+    if isinstance(event, StageStarted):
+        return '{}: {}'.format(event.document, STAGES.get(event.stage, event.stage))
+    if isinstance(event, EntryParsed):
+        return '{}: {} {}/{}'.format(event.document, STAGES['parse'], event.index + 1, event.total)
+    if isinstance(event, DocumentFinished):
+        return '{}: пропущено ссылок {} из {}, устаревших {}'.format(
+            event.document, event.missing, event.sources, event.outdated)
+    return '{}: ошибка: {}'.format(event.document, event.error)
+
+
+class EventChannel:
+    """
+    :param sinks: получатели событий
+    :param document: файл, к которому относятся события
+    :param interval: минимальное время между событиями о разборе записей, секунд
+    Канал предназначен для одной проверки: его методы вызываются из потока, в котором она идет.
+    """
+
+    def __init__(self, *sinks: Sink, document: str = '', interval: float = DEFAULT_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.sinks = sinks
+        self.document = str(document)
+        self.interval = interval
+        self.clock = clock
+        self._last_entry = None
+
+    def emit(self, event: Event):
+        for sink in self.sinks:
+            sink(event)
+
+    def stage(self, stage: str):
+        if self.sinks:
+            self.emit(StageStarted(self.document, stage, time.time()))
+
+    def entry(self, index: int, total: int):
+        if not self.sinks:
+            return
+        now = self.clock()
+        # последняя запись сообщается всегда, чтобы индикатор дошел до конца
+        if self._last_entry is not None and now - self._last_entry < self.interval and index + 1 < total:
+            return
+        self._last_entry = now
+        self.emit(EntryParsed(self.document, index, total, time.time()))
+
+    def finished(self, sources: int, missing: int, outdated: int):
+        if self.sinks:
+            self.emit(DocumentFinished(self.document, sources, missing, outdated, time.time()))
+
+    def failed(self, error: str):
+        if self.sinks:
+            self.emit(DocumentFailed(self.document, error, time.time()))
+
+
+NULL_CHANNEL = EventChannel()
+
+
+class QueueSink:
+    """
+    Передает события в очередь (queue.Queue, multiprocessing.Queue или очередь Manager) -
+    для получения событий из других потоков и процессов.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def __call__(self, event: Event):
+        self.queue.put(event)
+
+
+class LoggingSink:
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO):
+        self.logger = logger or logging.getLogger('source_checker')
+        self.level = level
+
+    def __call__(self, event: Event):
+        level = logging.ERROR if isinstance(event, DocumentFailed) else self.level
+        self.logger.log(level, describe(event))
+
+
+class CallbackSink:
+    """
+    Передает ход проверки в функцию callback(текст, процент) (как find_missing_src).
+    """
+
+    def __init__(self, callback: Callable[[str, int], None]):
+        self.callback = callback
+
+    def __call__(self, event: Event):
+        state = progress(event)
+        if state is not None:
+            self.callback(*state)
+
+
+def drain(queue, *sinks: Sink):
+    """
+    Передает события из очереди получателям, пока в очереди не встретится None.
+    """
+    for event in iter(queue.get, None):
+        for sink in sinks:
+            sink(event)
+
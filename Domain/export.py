@@ -0,0 +1,95 @@
+"""
+Потоковая выгрузка результатов проверки: одна запись на источник.
+Записи документа пишутся и сбрасываются на диск сразу после его проверки,
+поэтому расход памяти не зависит от количества документов.
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+FIELDS = ['file', 'index', 'text', 'name', 'year', 'authors', 'link', 'is_modern', 'has_links', 'links', 'original']
+FORMATS = ('jsonl', 'csv')
+AUTHORS_SEPARATOR = '; '
+
+
+def source_records(file_path, sources: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    """
+    :param sources: результаты SourceData.to_dict
+    """
+    for source in sources:
+        record = dict(source, file=str(file_path))
+        yield {field: record.get(field) for field in FIELDS}
+
+
+class JsonLinesWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write_document(self, file_path, sources: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        for record in source_records(file_path, sources):
+            self.stream.write(json.dumps(record, ensure_ascii=False))
+            self.stream.write('\n')
+            count += 1
+        self.stream.flush()
+        return count
+
+
+class CsvWriter:
+    def __init__(self, stream, header=True):
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, FIELDS)
+        if header:
+            self.writer.writeheader()
+
+    def write_document(self, file_path, sources: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        for record in source_records(file_path, sources):
+            record['authors'] = AUTHORS_SEPARATOR.join(record['authors'] or ())
+            self.writer.writerow(record)
+            count += 1
+        self.stream.flush()
+        return count
+
+
+class Exporter:
+    """
+    Открывает файл выгрузки; формат определяется по расширению (.jsonl или .csv).
+
+        with Exporter('results.jsonl') as exporter:
+            exporter.write_document(file_path, [source.to_dict() for source in sources])
+
+    :param append: дописывать записи в существующий файл
+    """
+
+    def __init__(self, path, format: Optional[str] = None, append: bool = False):
+        self.path = Path(path)
+        self.format = format or self.path.suffix.lstrip('.').lower()
+        if self.format not in FORMATS:
+            raise ValueError('Неизвестный формат выгрузки: {} (поддерживаются {})'
+                             .format(self.format, ', '.join(FORMATS)))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        header = not (append and self.path.exists() and self.path.stat().st_size)
+        # utf-8-sig, чтобы Excel открывал CSV в правильной кодировке
+        encoding = 'utf-8-sig' if self.format == 'csv' and header else 'utf-8'
+        self.stream = self.path.open('a' if append else 'w', encoding=encoding, newline='')
+        if self.format == 'csv':
+            self.writer = CsvWriter(self.stream, header=header)
+        else:
+            self.writer = JsonLinesWriter(self.stream)
+        self.records = 0
+
+    def write_document(self, file_path, sources: Iterable[Dict[str, Any]]) -> int:
+        count = self.writer.write_document(file_path, sources)
+        self.records += count
+        return count
+
+    def close(self):
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,148 @@
+"""
+Поиск авторов с опечатками: 'Иванова И.И.' вместо 'Иванов И.И.', ошибки распознавания сканов.
+
+Слова текста работы (в канонической форме, Domain.normalize) один раз собираются в индекс
+по трехбуквенным сочетаниям (триграммам). Для фамилии автора выбираются слова, у которых
+достаточно общих триграмм, и только они проверяются расстоянием Левенштейна с ограничением,
+поэтому расстояние не вычисляется для каждого абзаца. Упоминанием автора считается слово,
+отличающееся от фамилии не больше чем на tolerance правок, рядом с которым стоит инициал имени.
+
+Допустимое расстояние для короткой фамилии уменьшается (см. max_distance): у фамилии
+из трех букв и короче опечатки не допускаются, иначе с ней совпадало бы почти любое короткое слово.
+"""
+import collections
+import re
+from typing import Dict, Iterator, List, Sequence, Set, Tuple
+
+DEFAULT_TOLERANCE = 0  # 0 - поиск авторов только по точному совпадению
+MAX_TOLERANCE = 3
+
+_WORD_REGEX = re.compile(r'[А-Я][а-я]+')
+
+# сколько символов перед фамилией и после нее просматривается в поисках инициала:
+# 'И.И.Иванов' и 'Иванов И.И.' в канонической форме
+_BEFORE = 5
+_AFTER = 6
+
+
+def max_distance(word: str, tolerance: int) -> int:
+    """
+    Допустимое расстояние для слова: не больше tolerance и меньше трети длины слова.
+    """
+    return max(0, min(tolerance, (len(word) - 1) // 3))
+
+
+def trigrams(word: str) -> Set[str]:
+    """
+    Триграммы слова с границами: 'Иван' -> {'$Ив', 'Ива', 'ван', 'ан$'}.
+    Одна правка затрагивает не больше трех триграмм.
+    """
+    word = '$' + word + '$'
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def distance(a: str, b: str, limit: int) -> int:
+    """
+    Расстояние Левенштейна между a и b, если оно не больше limit, иначе limit + 1.
+    Вычисляется только полоса шириной 2 * limit + 1 вокруг диагонали.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        low = max(1, i - limit)
+        high = min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        char = a[i - 1]
+        row_min = current[0]
+        for j in range(low, high + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != b[j - 1]))
+            current[j] = value if value <= limit else over
+            if current[j] < row_min:
+                row_min = current[j]
+        if row_min > limit:
+            return over
+        previous = current
+    return previous[len(b)]
+
+
+def _has_initial(text: str, start: int, end: int, initial: str) -> bool:
+    mark = initial + '.'
+    return mark in text[max(0, start - _BEFORE):start] or mark in text[end:end + _AFTER]
+
+
+def mentions(text: str, last_name: str, initial: str, tolerance: int) -> bool:
+    """
+    Упомянут ли в тексте (в канонической форме) автор с фамилией last_name и инициалом initial
+    с учетом опечаток. Для одного абзаца; для всего текста работы используется TrigramIndex.
+    """
+    limit = max_distance(last_name, tolerance)
+    for match in _WORD_REGEX.finditer(text):
+        if distance(match.group(), last_name, limit) <= limit \
+                and _has_initial(text, match.start(), match.end(), initial):
+            return True
+    return False
+
+
+class TrigramIndex:
+    """
+    Слова текста работы с их положением и индекс триграмм по ним.
+    Строится один раз для документа и не зависит от допустимого расстояния.
+    Абзацы передаются в канонической форме (Domain.normalize).
+    """
+
+    def __init__(self, paragraphs: Sequence[str]):
+        self._paragraphs = paragraphs
+        self._words: List[str] = []
+        # для каждого слова - (номер абзаца, начало, конец) всех его вхождений
+        self._occurrences: List[List[Tuple[int, int, int]]] = []
+        self._trigrams: Dict[str, List[int]] = collections.defaultdict(list)
+
+        ids: Dict[str, int] = {}
+        for position, paragraph in enumerate(paragraphs):
+            for match in _WORD_REGEX.finditer(paragraph):
+                word = match.group()
+                word_id = ids.get(word)
+                if word_id is None:
+                    word_id = ids[word] = len(self._words)
+                    self._words.append(word)
+                    self._occurrences.append([])
+                    for trigram in trigrams(word):
+                        self._trigrams[trigram].append(word_id)
+                self._occurrences[word_id].append((position, match.start(), match.end()))
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def similar(self, word: str, tolerance: int) -> List[str]:
+        """
+        :return: слова текста, отличающиеся от word не больше чем на max_distance(word, tolerance) правок
+        """
+        return [self._words[word_id] for word_id in self._similar(word, tolerance)]
+
+    def _similar(self, word: str, tolerance: int) -> Iterator[int]:
+        limit = max_distance(word, tolerance)
+        word_trigrams = trigrams(word)
+        # у слова на расстоянии limit общих триграмм не меньше, чем len(word_trigrams) - 3 * limit
+        required = max(1, len(word_trigrams) - 3 * limit)
+        shared = collections.Counter()
+        for trigram in word_trigrams:
+            shared.update(self._trigrams.get(trigram, ()))
+        for word_id, count in shared.items():
+            if count >= required and distance(self._words[word_id], word, limit) <= limit:
+                yield word_id
+
+    def positions(self, last_name: str, initial: str, tolerance: int) -> Set[int]:
+        """
+        :return: номера абзацев, в которых упомянут автор с фамилией last_name и инициалом initial
+        """
+        positions = set()
+        for word_id in self._similar(last_name, tolerance):
+            for position, start, end in self._occurrences[word_id]:
+                if position not in positions and _has_initial(self._paragraphs[position], start, end, initial):
+                    positions.add(position)
+        return positions
@@ -0,0 +1,162 @@
+"""
+Форматы записей списка литературы, описанные в конфигурации (см. formats.json).
+Все форматы компилируются в одно регулярное выражение с именованными группами,
+поэтому каждая запись разбирается за один проход.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from Domain.profiling import NULL_PROFILER
+
+# в собранном PyInstaller приложении файлы данных распаковываются в sys._MEIPASS (см. Checker.spec)
+if getattr(sys, 'frozen', False):
+    DEFAULT_FORMATS = os.path.join(sys._MEIPASS, 'Domain', 'formats.json')
+else:
+    DEFAULT_FORMATS = os.path.join(os.path.dirname(__file__), 'formats.json')
+
+_FRAGMENT_REGEX = re.compile(r'{([A-Z_]+)}')
+_GROUP_REGEX = re.compile(r'\(\?P([<=])(\w+)')
+_NUMBER_PREFIX = r'^(?:(?P<index>\d+)'
+
+
+class GrammarException(Exception):
+    pass
+
+
+class EntryFormat:
+    """
+    Один формат записи: регулярное выражение и правила заполнения полей SourceData.
+    """
+
+    def __init__(self, name: str, pattern: str, fields: Dict[str, Any], requires: Optional[List[str]] = None):
+        self.name = name
+        self.pattern = pattern
+        self.fields = fields
+        self.requires = tuple(requires or ())
+        try:
+            self.regex = re.compile(pattern)
+        except re.error as exception:
+            raise GrammarException('Ошибка в шаблоне формата {}: {}'.format(name, exception))
+
+        groups = set(self.regex.groupindex)
+        for field, value in fields.items():
+            for group in ([value] if isinstance(value, str) else value):
+                if group not in groups:
+                    raise GrammarException('В формате {} нет группы {} для поля {}'.format(name, group, field))
+
+    def applicable(self, paragraph: str) -> bool:
+        return not self.requires or any(text in paragraph for text in self.requires)
+
+    def prefixed_pattern(self, prefix: str) -> str:
+        """
+        Шаблон с уникальными для формата именами групп, чтобы его можно было объединить с другими.
+        """
+        return _GROUP_REGEX.sub(lambda match: '(?P{}{}{}'.format(match.group(1), prefix, match.group(2)),
+                                self.pattern)
+
+    def values(self, groups: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        """
+        :param groups: значения групп формата
+        :return: аргументы для SourceData
+        """
+        fields = self.fields
+        values = dict(text=' '.join(groups[group] or '' for group in fields['text']))
+        values['index'] = int(groups[fields['index']])
+        if 'year' in fields and groups[fields['year']]:
+            values['year'] = int(groups[fields['year']])
+        if 'link' in fields:
+            values['link'] = groups[fields['link']]
+        if 'authors' in fields:
+            values['authors'] = [groups[group] for group in fields['authors'] if groups[group]]
+        if 'name' in fields:
+            values['name'] = groups[fields['name']]
+        return values
+
+
+class Grammar:
+    """
+    Набор форматов, проверяемых по порядку. Объединенные выражения строятся
+    для каждого набора подходящих по requires форматов и кэшируются.
+    """
+
+    def __init__(self, formats: List[EntryFormat]):
+        if not formats:
+            raise GrammarException('Не задано ни одного формата')
+        self.formats = formats
+        self._matchers: Dict[FrozenSet[int], Any] = {}
+
+        # все форматы начинаются с номера записи - записи без номера можно сразу отбросить
+        self.requires_number = all(entry_format.pattern.startswith(_NUMBER_PREFIX) for entry_format in formats)
+
+    @classmethod
+    def from_config(cls, *configs: Dict[str, Any]) -> 'Grammar':
+        fragments = {}
+        formats = []
+        for config in configs:
+            fragments.update(config.get('fragments', {}))
+            for item in config.get('formats', []):
+                pattern = _FRAGMENT_REGEX.sub(
+                    lambda match: fragments.get(match.group(1), match.group(0)), item['pattern'])
+                formats.append(EntryFormat(item['name'], pattern, item['fields'], item.get('requires')))
+        return cls(formats)
+
+    @classmethod
+    def load(cls, *paths) -> 'Grammar':
+        """
+        :param paths: файлы конфигурации; форматы из следующих файлов добавляются после предыдущих
+        """
+        configs = []
+        for path in paths or (DEFAULT_FORMATS,):
+            with open(path, encoding='utf-8') as file:
+                configs.append(json.load(file))
+        return cls.from_config(*configs)
+
+    @property
+    def fingerprint(self) -> str:
+        data = json.dumps([(f.name, f.pattern, f.fields, f.requires) for f in self.formats], ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _matcher(self, applicable: FrozenSet[int]):
+        matcher = self._matchers.get(applicable)
+        if matcher is None:
+            matcher = re.compile('|'.join(
+                '(?P<f{0}>{1})'.format(index, self.formats[index].prefixed_pattern('f{}_'.format(index)))
+                for index in sorted(applicable)
+            ))
+            self._matchers[applicable] = matcher
+        return matcher
+
+    def match(self, paragraph: str, start: int = 0,
+              profiler=NULL_PROFILER) -> Optional[Tuple[EntryFormat, Dict[str, Optional[str]]]]:
+        """
+        :param start: номер формата, с которого начинается проверка
+        :param profiler: Profiler, в который записывается, какие форматы проверялись (format_attempts)
+        :return: (первый подошедший формат, значения его групп) или None
+        """
+        if self.requires_number and not paragraph[:1].isdigit():
+            return None
+
+        applicable = frozenset(index for index in range(start, len(self.formats))
+                               if self.formats[index].applicable(paragraph))
+        if not applicable:
+            return None
+        for index in applicable:
+            profiler.count('format_attempts', self.formats[index].name)
+
+        match = self._matcher(applicable).match(paragraph)
+        if match is None:
+            return None
+
+        index = int(match.lastgroup[1:])
+        prefix = 'f{}_'.format(index)
+        groups = {name[len(prefix):]: value
+                  for name, value in match.groupdict().items()
+                  if name.startswith(prefix)}
+        return self.formats[index], groups
+
+    def index(self, entry_format: EntryFormat) -> int:
+        return self.formats.index(entry_format)
@@ -0,0 +1,202 @@
+"""
+Поиск заголовка списка литературы без участия пользователя.
+Каждый короткий абзац оценивается как возможный заголовок: совпадение с шаблоном,
+ранее подтвержденные пользователем заголовки, положение в работе и доля нумерованных
+записей среди следующих за ним абзацев. Выбирается кандидат с наибольшей оценкой,
+оценка служит мерой уверенности (0..1).
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+MAX_HEADER_LENGTH = 80  # более длинные абзацы заголовком не считаются
+WINDOW = 10  # абзацев после заголовка, по которым считается доля записей
+MIN_CONFIDENCE = 0.5  # ниже этого заголовок уточняется у пользователя (если это возможно)
+
+# веса признаков, в сумме не больше 1
+REGEX_WEIGHT = 0.45
+REMEMBERED_WEIGHT = 0.45
+REMEMBERED_ANY_TEMPLATE_WEIGHT = 0.3
+KEYWORD_WEIGHT = 0.15
+ENTRIES_WEIGHT = 0.35
+POSITION_WEIGHT = 0.1
+
+_HEADER_REGEX = re.compile(
+    r'^(?:(?:(?:[сС]писок|[иИ]спользованн)[а-я]*\s)?(?:использ[а-я]*\s)?(?:(?:[Лл]итератур|[иИ]сточник)[а-я]*\s*и?\s*)+(?:[.:])?)$',
+    re.I
+)
+_KEYWORD_REGEX = re.compile(r'литератур|источник|библиограф', re.I)
+_ENTRY_REGEX = re.compile(r'^\s*(?:\d{1,3}\s*[.)]?\s+\S|\[\d{1,3}\])')
+_NON_WORD_REGEX = re.compile(r'[\W_]+')
+
+
+def check_paragraph_to_source_header(text):
+    """
+    Проверяет евляется ли переданный текст заголовком списка источников.
+    :param text: str
+    :return: bool
+    """
+    return bool(_HEADER_REGEX.match(text))
+
+
+def normalize_header(text: str) -> str:
+    return _NON_WORD_REGEX.sub(' ', text.lower().replace('ё', 'е')).strip()
+
+
+def default_store_path() -> Path:
+    return Path.home() / '.source_checker' / 'headers.json'
+
+
+class HeaderStore:
+    """
+    Заголовки списков литературы, подтвержденные пользователем, с учетом шаблона документа.
+    Хранится в JSON: {шаблон: {заголовок: кол-во подтверждений}}, '' - все шаблоны.
+    """
+
+    ANY_TEMPLATE = ''
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else default_store_path()
+        self._lock = threading.Lock()
+        self._headers: Dict[str, Dict[str, int]] = {}
+        self._fingerprint: Optional[str] = None
+        try:
+            with self.path.open(encoding='utf-8') as file:
+                self._headers = json.load(file)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            # поврежденный файл не должен мешать проверке
+            self._headers = {}
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Хэш подтвержденных заголовков; меняется при каждом новом подтверждении.
+        """
+        with self._lock:
+            if self._fingerprint is None:
+                data = json.dumps(self._headers, sort_keys=True, ensure_ascii=False)
+                self._fingerprint = hashlib.sha256(data.encode('utf-8')).hexdigest()
+            return self._fingerprint
+
+    def count(self, text: str, template: Optional[str] = None) -> int:
+        return self._headers.get(template or self.ANY_TEMPLATE, {}).get(normalize_header(text), 0)
+
+    def remember(self, text: str, template: Optional[str] = None):
+        header = normalize_header(text)
+        if not header:
+            return
+        with self._lock:
+            for key in {template or self.ANY_TEMPLATE, self.ANY_TEMPLATE}:
+                headers = self._headers.setdefault(key, {})
+                headers[header] = headers.get(header, 0) + 1
+            self._fingerprint = None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix('.tmp')
+            with temp_path.open('w', encoding='utf-8') as file:
+                json.dump(self._headers, file, ensure_ascii=False, indent=2)
+            os.replace(str(temp_path), str(self.path))
+
+
+class HeaderMatch(NamedTuple):
+    position: int  # номер абзаца заголовка
+    text: str
+    confidence: float
+    reasons: Sequence[str]  # признаки, давшие оценку: regex, remembered, keyword, entries, position, user
+
+    @property
+    def sources_start(self) -> int:
+        return self.position + 1
+
+    def to_dict(self):
+        return dict(position=self.position, text=self.text, confidence=round(self.confidence, 3),
+                    reasons=list(self.reasons))
+
+
+class HeaderLocator:
+    """
+    :param store: HeaderStore с подтвержденными заголовками или None
+    :param min_confidence: минимальная уверенность, при которой заголовок принимается без вопроса пользователю
+    """
+
+    def __init__(self, store: Optional[HeaderStore] = None, min_confidence: float = MIN_CONFIDENCE):
+        self.store = store
+        self.min_confidence = min_confidence
+
+    @property
+    def fingerprint(self) -> Dict[str, object]:
+        """
+        Параметры, от которых зависит найденный заголовок. Используются как часть ключа кэша.
+        """
+        return dict(min_confidence=self.min_confidence,
+                    store=self.store.fingerprint if self.store is not None else None)
+
+    def _entries_density(self, paragraphs: Sequence[str], position: int) -> float:
+        following = paragraphs[position + 1:position + 1 + WINDOW]
+        if not following:
+            return 0.0
+        return sum(1 for paragraph in following if _ENTRY_REGEX.match(paragraph)) / len(following)
+
+    def score(self, paragraphs: Sequence[str], position: int, template: Optional[str] = None) -> Optional[HeaderMatch]:
+        text = paragraphs[position].strip()
+        if not text or len(text) > MAX_HEADER_LENGTH or _ENTRY_REGEX.match(text):
+            return None
+
+        score = 0.0
+        reasons = []
+        if check_paragraph_to_source_header(text):
+            score += REGEX_WEIGHT
+            reasons.append('regex')
+        elif _KEYWORD_REGEX.search(text):
+            score += KEYWORD_WEIGHT
+            reasons.append('keyword')
+
+        if self.store is not None:
+            if template and self.store.count(text, template):
+                score += REMEMBERED_WEIGHT
+                reasons.append('remembered')
+            elif self.store.count(text):
+                score += REMEMBERED_ANY_TEMPLATE_WEIGHT
+                reasons.append('remembered')
+
+        if not reasons:
+            # без признаков заголовка абзац перед нумерованным списком - не список литературы
+            return None
+
+        density = self._entries_density(paragraphs, position)
+        if density:
+            score += ENTRIES_WEIGHT * density
+            reasons.append('entries')
+        score += POSITION_WEIGHT * position / max(len(paragraphs) - 1, 1)
+        reasons.append('position')
+        return HeaderMatch(position, text, min(score, 1.0), tuple(reasons))
+
+    def candidates(self, paragraphs: Sequence[str], template: Optional[str] = None) -> List[HeaderMatch]:
+        """
+        :return: возможные заголовки по убыванию оценки (при равной оценке - ближе к концу работы)
+        """
+        matches = (self.score(paragraphs, position, template) for position in range(len(paragraphs)))
+        return sorted((match for match in matches if match is not None),
+                      key=lambda match: (match.confidence, match.position), reverse=True)
+
+    def locate(self, paragraphs: Sequence[str], template: Optional[str] = None) -> Optional[HeaderMatch]:
+        candidates = self.candidates(paragraphs, template)
+        return candidates[0] if candidates else None
+
+    def find_exact(self, paragraphs: Sequence[str], text: str) -> Optional[HeaderMatch]:
+        """
+        Заголовок, указанный пользователем: последний абзац, совпадающий с text.
+        """
+        for position in range(len(paragraphs) - 1, -1, -1):
+            if paragraphs[position] == text:
+                return HeaderMatch(position, text, 1.0, ('user',))
+        return None
+
+    def remember(self, text: str, template: Optional[str] = None):
+        if self.store is not None:
+            self.store.remember(text, template)
@@ -0,0 +1,42 @@
+"""
+Каноническая форма текста для поиска ссылок.
+Абзац приводится к ней один раз, после чего авторы и номера источников ищутся
+по одному шаблону на порядок записи, без перебора вариантов пробелов и знаков:
+
+    - пробельные символы любого вида (в т.ч. неразрывные и узкие) сворачиваются в один пробел,
+      невидимые символы (мягкий перенос, пробел нулевой ширины) удаляются;
+    - латинские буквы, похожие на русские, и 'ё' заменяются русскими буквами;
+    - инициалы записываются слитно: 'И. И. Иванов' -> 'И.И.Иванов', 'Иванов, И. И.' -> 'Иванов И.И.'.
+"""
+import re
+
+_HOMOGLYPHS = str.maketrans(
+    'AaBCcEeHKMOoPpTXxyЁё',
+    'АаВСсЕеНКМОоРрТХхуЕе',
+)
+_HOMOGLYPH_REGEX = re.compile('[AaBCcEeHKMOoPpTXxyЁё]')  # translate медленный, применяется только при необходимости
+
+# шаги нормализации после замены букв; применяются по порядку
+_STEPS = (
+    # невидимые символы: мягкий перенос, пробелы нулевой ширины
+    (re.compile('[\u00ad\u200b\u200c\u200d\u2060\ufeff]+'), ''),
+    # пробельные символы любого вида, кроме одиночного обычного пробела
+    (re.compile(r'\s{2,}|[^\S ]'), ' '),
+    # пробел после инициала перед следующим инициалом или фамилией
+    # (шаблоны начинаются с символа, а не с просмотра назад, чтобы поиск шел по символу)
+    (re.compile(r'\.(?<=(?<!\w)[А-Я]\.) (?=[А-Я])'), '.'),
+    # запятая между фамилией и инициалами
+    (re.compile(r',(?<=[а-я],) ?(?=[А-Я]\.)'), ' '),
+)
+
+
+def normalize(text: str) -> str:
+    """
+    Каноническая форма текста для поиска.
+    """
+    if _HOMOGLYPH_REGEX.search(text):
+        text = text.translate(_HOMOGLYPHS)
+    for regex, replacement in _STEPS:
+        text = regex.sub(replacement, text)
+    return text
+
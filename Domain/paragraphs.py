@@ -0,0 +1,126 @@
+"""
+Абзацы работы в одной строке: текст всех абзацев подряд и таблица границ array('I').
+Вместо тысяч отдельных строк и списка ссылок на них документ занимает одну строку
+и 4 байта на абзац, а части документа (текст работы, список литературы) и ссылки источников -
+представления над ней без копирования абзацев.
+Строка абзаца создается при обращении к нему.
+"""
+import collections.abc
+from array import array
+from typing import Iterable, Iterator, Sequence, Tuple, Union
+
+
+class _Paragraphs(collections.abc.Sequence):
+    __slots__ = ()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, str) or not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, list(self))
+
+
+class ParagraphStore(_Paragraphs):
+    __slots__ = ('_text', '_offsets')
+
+    def __init__(self, paragraphs: Iterable[str] = ()):
+        self._text = ''
+        self._offsets = array('I', [0])
+        self.extend(paragraphs)
+
+    def extend(self, paragraphs: Iterable[str]):
+        """
+        Добавляет абзацы в конец документа. Строка документа при этом пересобирается,
+        поэтому абзацы лучше добавлять крупными частями, а не по одному.
+        """
+        parts = [self._text]
+        offsets = self._offsets
+        position = offsets[-1]
+        for paragraph in paragraphs:
+            parts.append(paragraph)
+            position += len(paragraph)
+            offsets.append(position)
+        self._text = ''.join(parts)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return ParagraphView(self, start, max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('номер абзаца вне документа')
+        return self._text[self._offsets[index]:self._offsets[index + 1]]
+
+    def __iter__(self) -> Iterator[str]:
+        return self._iter(0, len(self))
+
+    def _iter(self, start: int, stop: int) -> Iterator[str]:
+        text, offsets = self._text, self._offsets
+        for index in range(start, stop):
+            yield text[offsets[index]:offsets[index + 1]]
+
+
+class ParagraphView(_Paragraphs):
+    """
+    Абзацы store[start:stop] без копирования.
+    """
+    __slots__ = ('store', 'start', 'stop')
+
+    def __init__(self, store: ParagraphStore, start: int, stop: int):
+        self.store = store
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return ParagraphView(self.store, self.start + start, self.start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('номер абзаца вне диапазона')
+        return self.store[self.start + index]
+
+    def __iter__(self) -> Iterator[str]:
+        return self.store._iter(self.start, self.stop)
+
+
+class ParagraphRefs(_Paragraphs):
+    """
+    Абзацы с указанными номерами (например, ссылки на источник) без копирования текста.
+    При сохранении (pickle) превращаются в кортеж строк, чтобы не сохранять весь документ.
+    """
+    __slots__ = ('paragraphs', 'positions')
+
+    def __init__(self, paragraphs: Sequence[str], positions: Tuple[int, ...]):
+        self.paragraphs = paragraphs
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return ParagraphRefs(self.paragraphs, self.positions[index])
+        return self.paragraphs[self.positions[index]]
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self.paragraphs.__getitem__, self.positions)
+
+    def __reduce__(self):
+        return tuple, (tuple(self),)
@@ -0,0 +1,122 @@
+"""
+Замеры времени, количества вызовов и пикового потребления памяти по этапам проверки.
+
+    with Profiler() as profiler:
+        find_missing_src(file_path, profiler=profiler)
+    print(profiler.to_json())
+"""
+import json
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.0
+        self.peak_memory = 0  # байт сверх памяти, занятой на момент начала этапа
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(calls=self.calls, time=self.time, peak_memory=self.peak_memory)
+
+
+class _Frame:
+    def __init__(self, name, memory):
+        self.name = name
+        self.start = time.perf_counter()
+        self.start_memory = memory
+        self.peak = memory
+
+
+class Profiler:
+    """
+    :param trace_memory: если True, то на время работы профилировщика включается tracemalloc
+        (заметно замедляет проверку)
+    """
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, StageStats] = defaultdict(StageStats)
+        self.counters: Dict[str, Counter] = defaultdict(Counter)
+        self._stack: List[_Frame] = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @staticmethod
+    def _peak_memory():
+        return tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+
+    @contextmanager
+    def stage(self, name: str):
+        if self._stack:
+            self._stack[-1].peak = max(self._stack[-1].peak, self._peak_memory())
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        frame = _Frame(name, tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame.start
+            frame.peak = max(frame.peak, self._peak_memory())
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, frame.peak)
+
+            stats = self.stages[name]
+            stats.calls += 1
+            stats.time += elapsed
+            stats.peak_memory = max(stats.peak_memory, frame.peak - frame.start_memory)
+
+    def count(self, name: str, key: str, value: int = 1):
+        self.counters[name][key] += value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            stages={name: stats.to_dict() for name, stats in self.stages.items()},
+            counters={name: dict(counter) for name, counter in self.counters.items()},
+        )
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    def merge(self, data: Dict[str, Any]):
+        """
+        Добавляет результаты другого профилировщика (например, из дочернего процесса), полученные через to_dict.
+        """
+        for name, values in data.get('stages', {}).items():
+            stats = self.stages[name]
+            stats.calls += values['calls']
+            stats.time += values['time']
+            stats.peak_memory = max(stats.peak_memory, values['peak_memory'])
+        for name, counter in data.get('counters', {}).items():
+            self.counters[name].update(counter)
+
+
+class NullProfiler:
+    """
+    Профилировщик по умолчанию: ничего не замеряет.
+    """
+
+    @contextmanager
+    def stage(self, name: str):
+        yield
+
+    def count(self, name: str, key: str, value: int = 1):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,195 @@
+"""
+Отчеты в формате docx без python-docx: разметка WordprocessingML пишется потоком прямо в zip,
+остальные части документа (стили, связи, типы содержимого) заготовлены заранее.
+Время записи пропорционально объему отчета, память не зависит от количества документов,
+поэтому так же формируется общий отчет по группе работ (раздел на каждую работу):
+
+    with ReportWriter('отчет.docx') as report:
+        for result in results:
+            report.document(result['file'], result['missing'], result['outdated'])
+"""
+import re
+import zipfile
+from typing import Iterable, Optional
+from xml.sax.saxutils import escape
+
+from Domain.docx_extract import NSMAP
+
+MISSING_TITLE = 'На следующие источники отсутствуют ссылки'
+OUTDATED_TITLE = 'Устаревшие источники'
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '<Override PartName="/docProps/app.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/>'
+    '</Types>'
+)
+
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties" '
+    'Target="docProps/app.xml"/>'
+    '</Relationships>'
+)
+
+_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+_APP = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+    '<Application>Source Checker</Application>'
+    '</Properties>'
+)
+
+# Times New Roman 14 пт, как в отчетах python-docx; Heading1 - заголовок раздела работы в общем отчете
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<w:styles xmlns:w="{w}">'
+    '<w:docDefaults><w:rPrDefault><w:rPr><w:lang w:val="ru-RU"/></w:rPr></w:rPrDefault>'
+    '<w:pPrDefault/></w:docDefaults>'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/>'
+    '<w:rPr><w:rFonts w:ascii="Times New Roman" w:hAnsi="Times New Roman" w:eastAsia="Times New Roman" '
+    'w:cs="Times New Roman"/><w:sz w:val="28"/><w:szCs w:val="28"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/>'
+    '<w:next w:val="Normal"/><w:qFormat/>'
+    '<w:pPr><w:keepNext/><w:spacing w:before="240" w:after="120"/><w:outlineLvl w:val="0"/></w:pPr>'
+    '<w:rPr><w:b/><w:sz w:val="32"/><w:szCs w:val="32"/></w:rPr></w:style>'
+    '</w:styles>'
+).format(w=NSMAP['w'])
+
+_DOCUMENT_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<w:document xmlns:w="{w}"><w:body>'
+).format(w=NSMAP['w'])
+
+# поля 2 см сверху, справа и снизу и 3 см слева (в twips), лист A4
+_DOCUMENT_END = (
+    '<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+    '<w:pgMar w:top="1134" w:right="1134" w:bottom="1134" w:left="1701" '
+    'w:header="709" w:footer="709" w:gutter="0"/></w:sectPr>'
+    '</w:body></w:document>'
+)
+
+_PARAGRAPH = '<w:p>{properties}<w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+_JUSTIFY = '<w:pPr><w:jc w:val="both"/></w:pPr>'
+_HEADING = '<w:pPr><w:pStyle w:val="Heading1"/></w:pPr>'
+_PAGE_BREAK = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+# символы, недопустимые в XML 1.0
+_INVALID_XML_REGEX = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+FLUSH_SIZE = 64 * 1024  # символов разметки, после которых она сжимается и пишется в файл
+
+
+def _text(text: str) -> str:
+    return escape(_INVALID_XML_REGEX.sub('', str(text)))
+
+
+class ReportWriter:
+    """
+    :param path: путь к файлу отчета или открытый для записи двоичный поток
+    """
+
+    def __init__(self, path):
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self._zip.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        self._zip.writestr('_rels/.rels', _RELS)
+        self._zip.writestr('docProps/app.xml', _APP)
+        self._zip.writestr('word/_rels/document.xml.rels', _DOCUMENT_RELS)
+        self._zip.writestr('word/styles.xml', _STYLES)
+        self._stream = self._zip.open('word/document.xml', 'w')
+        self._buffer = [_DOCUMENT_START]
+        self._size = 0
+        self.documents = 0
+
+    def _write(self, markup: str):
+        self._buffer.append(markup)
+        self._size += len(markup)
+        if self._size >= FLUSH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        self._stream.write(''.join(self._buffer).encode('utf-8'))
+        self._buffer = []
+        self._size = 0
+
+    def paragraph(self, text: str, justify: bool = False):
+        self._write(_PARAGRAPH.format(properties=_JUSTIFY if justify else '', text=_text(text)))
+
+    def heading(self, text: str):
+        self._write(_PARAGRAPH.format(properties=_HEADING, text=_text(text)))
+
+    def page_break(self):
+        self._write(_PAGE_BREAK)
+
+    def lists(self, missing_links: Iterable[str], old_links: Iterable[str]):
+        """
+        Списки источников без ссылок и устаревших источников (как в отчете по одной работе).
+        """
+        missing_links = list(missing_links)
+        if missing_links:
+            self.paragraph(MISSING_TITLE)
+            for line in missing_links:
+                self.paragraph(line, justify=True)
+
+        old_links = list(old_links)
+        if old_links:
+            self.paragraph(OUTDATED_TITLE)
+            for line in old_links:
+                self.paragraph(line, justify=True)
+
+    def document(self, title: str, missing_links: Iterable[str], old_links: Iterable[str],
+                 total: Optional[int] = None, error: Optional[str] = None):
+        """
+        Раздел общего отчета по одной работе; разделы начинаются с новой страницы.
+        :param total: общее кол-во источников работы
+        :param error: ошибка проверки, если работу проверить не удалось
+        """
+        if self.documents:
+            self.page_break()
+        self.documents += 1
+        self.heading(title)
+        if error:
+            self.paragraph('Ошибка проверки: {}'.format(error))
+            return
+        missing_links = list(missing_links)
+        old_links = list(old_links)
+        if total is not None:
+            self.paragraph('Источников: {}, пропущено ссылок: {}, устаревших: {}'.format(
+                total, len(missing_links), len(old_links)))
+        if not missing_links and not old_links:
+            self.paragraph('Замечаний нет')
+        self.lists(missing_links, old_links)
+
+    def close(self):
+        if self._zip is None:
+            return
+        self._write(_DOCUMENT_END)
+        self._flush()
+        self._stream.close()
+        self._zip.close()
+        self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,194 @@
+"""
+Статистика годов издания источников по работам, группам работ и годам.
+Годы и состояния источников хранятся в массивах NumPy (по элементу на источник),
+поэтому распределения, доли устаревших и процентили считаются без циклов по источникам.
+
+    table = YearTable()
+    table.add('work.docx', sources, group='ИВТ-21')
+    table.histogram(min_year=2000)
+    table.per_document(min_year=2000)
+"""
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+NO_YEAR = 0  # год не найден
+
+
+class SourceState(Enum):
+    OK = 1
+    NO_LINKS = 2
+    OUTDATED = 3
+    NO_DATA = 4
+
+
+def _field(source, name):
+    return source[name] if isinstance(source, dict) else getattr(source, name)
+
+
+class YearTable:
+    """
+    Столбцы: номер работы, номер группы, год издания (NO_YEAR, если не найден), есть ли ссылки на источник.
+    Источники принимаются как SourceData или как результат SourceData.to_dict.
+    """
+
+    def __init__(self):
+        self.documents: List[str] = []
+        self.groups: List[str] = []
+        self._group_index: Dict[str, int] = {}
+        self._chunks: List[np.ndarray] = []
+        self._table: Optional[np.ndarray] = None
+
+    _DTYPE = np.dtype([('document', np.int32), ('group', np.int32), ('year', np.int32), ('has_links', np.bool_)])
+
+    @classmethod
+    def from_sources(cls, sources: Iterable, document: str = '') -> 'YearTable':
+        table = cls()
+        table.add(document, sources)
+        return table
+
+    def add(self, document: str, sources: Iterable, group: str = ''):
+        if group not in self._group_index:
+            self._group_index[group] = len(self.groups)
+            self.groups.append(group)
+        sources = list(sources)
+        chunk = np.empty(len(sources), dtype=self._DTYPE)
+        chunk['document'] = len(self.documents)
+        chunk['group'] = self._group_index[group]
+        chunk['year'] = [_field(source, 'year') or NO_YEAR for source in sources]
+        chunk['has_links'] = [bool(_field(source, 'has_links')) for source in sources]
+        self.documents.append(document)
+        self._chunks.append(chunk)
+        self._table = None
+
+    @property
+    def table(self) -> np.ndarray:
+        if self._table is None:
+            self._table = np.concatenate(self._chunks) if self._chunks else np.empty(0, dtype=self._DTYPE)
+            self._chunks = [self._table]
+        return self._table
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def years(self) -> np.ndarray:
+        return self.table['year']
+
+    def states(self, min_year: int) -> np.ndarray:
+        """
+        :return: SourceState.value для каждого источника (как в SourceData.set_limit_year)
+        """
+        table = self.table
+        states = np.where(table['has_links'], SourceState.OK.value, SourceState.NO_LINKS.value)
+        states[(table['year'] != NO_YEAR) & (table['year'] < min_year)] = SourceState.OUTDATED.value
+        states[table['year'] == NO_YEAR] = SourceState.NO_DATA.value
+        return states
+
+    def histogram(self, min_year: int) -> Dict[SourceState, Dict[int, int]]:
+        """
+        Распределение источников с известным годом по годам для каждого состояния.
+        Источники без года (NO_DATA) в распределение не попадают.
+        """
+        known = self.years != NO_YEAR
+        years = self.years[known]
+        states = self.states(min_year)[known]
+        result = {}
+        for state in SourceState:
+            values, counts = np.unique(years[states == state.value], return_counts=True)
+            result[state] = dict(zip(values.tolist(), counts.tolist()))
+        return result
+
+    def _grouped(self, keys: np.ndarray, size: int, min_year: int,
+                 percentiles: Sequence[float]) -> Dict[str, np.ndarray]:
+        states = self.states(min_year)
+        years = self.years
+        known = years != NO_YEAR
+        result = dict(
+            sources=np.bincount(keys, minlength=size),
+            dated=np.bincount(keys, weights=known, minlength=size).astype(np.int64),
+            outdated=np.bincount(keys, weights=states == SourceState.OUTDATED.value, minlength=size).astype(np.int64),
+            missing=np.bincount(keys, weights=~self.table['has_links'], minlength=size).astype(np.int64),
+        )
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result['outdated_ratio'] = result['outdated'] / result['dated']
+
+        # процентили по группам: сортировка по (группа, год) и выбор позиций внутри каждой группы
+        dated_keys = keys[known]
+        order = np.lexsort((years[known], dated_keys))
+        sorted_years = years[known][order].astype(np.float64)
+        starts = np.concatenate(([0], np.cumsum(result['dated'])[:-1]))
+        counts = result['dated']
+        for q in percentiles:
+            position = starts + (counts - 1) * (q / 100)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            values = np.full(size, np.nan)
+            has = counts > 0
+            if len(sorted_years):
+                low_values = sorted_years[np.clip(lower, 0, len(sorted_years) - 1)]
+                high_values = sorted_years[np.clip(upper, 0, len(sorted_years) - 1)]
+                interpolated = low_values + (high_values - low_values) * (position - lower)
+                values[has] = interpolated[has]
+            result['p{:g}'.format(q)] = values
+        return result
+
+    def per_document(self, min_year: int, percentiles: Sequence[float] = (10, 50, 90)) -> Dict[str, np.ndarray]:
+        """
+        :return: столбцы по работам (в порядке self.documents): sources, dated, outdated, missing,
+            outdated_ratio и процентили года издания p10, p50, p90 (NaN, если годов нет)
+        """
+        return self._grouped(self.table['document'], len(self.documents), min_year, percentiles)
+
+    def per_group(self, min_year: int, percentiles: Sequence[float] = (10, 50, 90)) -> Dict[str, np.ndarray]:
+        """
+        То же, что per_document, по группам (в порядке self.groups).
+        """
+        return self._grouped(self.table['group'], len(self.groups), min_year, percentiles)
+
+    def per_year(self, min_year: int) -> Dict[str, np.ndarray]:
+        """
+        :return: year - известные годы по возрастанию, sources и missing - кол-во источников и источников
+            без ссылок этого года, outdated - признак устаревшего года
+        """
+        known = self.years != NO_YEAR
+        years, inverse = np.unique(self.years[known], return_inverse=True)
+        return dict(
+            year=years,
+            sources=np.bincount(inverse, minlength=len(years)),
+            missing=np.bincount(inverse, weights=~self.table['has_links'][known],
+                                minlength=len(years)).astype(np.int64),
+            outdated=years < min_year,
+        )
+
+    def summary(self, min_year: int, percentiles: Sequence[float] = (10, 50, 90)) -> Dict[str, Any]:
+        """
+        Сводка по всем источникам в виде, пригодном для JSON.
+        """
+        years = self.years[self.years != NO_YEAR]
+        states = self.states(min_year)
+        outdated = int(np.count_nonzero(states == SourceState.OUTDATED.value))
+        return dict(
+            dated=int(len(years)),
+            outdated_ratio=outdated / len(years) if len(years) else None,
+            percentiles={'p{:g}'.format(q): float(value)
+                         for q, value in zip(percentiles, np.percentile(years, percentiles))} if len(years) else {},
+            histogram={state.name: {str(year): count for year, count in counts.items()}
+                       for state, counts in self.histogram(min_year).items()},
+        )
+
+    def group_summary(self, min_year: int) -> Dict[str, Dict[str, Any]]:
+        return _rows(self.groups, self.per_group(min_year))
+
+    def document_summary(self, min_year: int) -> Dict[str, Dict[str, Any]]:
+        return _rows(self.documents, self.per_document(min_year))
+
+
+def _rows(names: List[str], columns: Dict[str, np.ndarray]) -> Dict[str, Dict[str, Any]]:
+    def value(item):
+        item = item.item()
+        return None if isinstance(item, float) and item != item else item  # NaN -> None
+
+    return {name: {column: value(values[index]) for column, values in columns.items()}
+            for index, name in enumerate(names)}
@@ -1,14 +1,21 @@
 import traceback
 from datetime import datetime
 
-from PyQt5.QtCore import pyqtSignal, Qt, pyqtSlot
+from PyQt5.QtCore import pyqtSignal, Qt, pyqtSlot, QThreadPool, QTimer
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QCheckBox, QPushButton, QMessageBox, QFileDialog, \
-    QProgressBar, QApplication, QGroupBox, QFormLayout, QSpinBox, QInputDialog
+    QGroupBox, QFormLayout, QSpinBox, QInputDialog
 
-from Domain.antistud_fun import find_missing_src, NoSourcesException
+from Domain.antistud_fun import NoSourcesException
+from Domain.cache import ResultCache
+from Domain.fuzzy import DEFAULT_TOLERANCE, MAX_TOLERANCE
+from Domain.header_locator import HeaderLocator, HeaderStore
 from GUI import Text
+from GUI.Jobs import AnalysisJob, JobWidget
 from GUI.ShowResult import ResultWidget
 
+MAX_JOBS = 2  # Макс. кол-во одновременно проверяемых файлов
+UPDATE_DELAY = 300  # мс без изменения настроек, после которых открытые результаты пересчитываются
+
 
 class FileLoader(QWidget):
     run_signal = pyqtSignal('PyQt_PyObject')
@@ -56,6 +63,16 @@ class FileLoader(QWidget):
         check_authors_label.setToolTip(Text.text[lang]['check_authors_tooltip'])
         self.settings_layout.addRow(check_authors_label, self.check_authors)
 
+        self.fuzzy = QSpinBox()
+        self.fuzzy.setRange(0, MAX_TOLERANCE)
+        self.fuzzy.setValue(DEFAULT_TOLERANCE)
+        self.fuzzy.setToolTip(Text.text[lang]['fuzzy_tooltip'])
+        fuzzy_label = QLabel(Text.text[lang]['fuzzy_label'])
+        fuzzy_label.setToolTip(Text.text[lang]['fuzzy_tooltip'])
+        self.settings_layout.addRow(fuzzy_label, self.fuzzy)
+        self.fuzzy.setEnabled(self.check_authors.isChecked())
+        self.check_authors.toggled.connect(self.fuzzy.setEnabled)
+
         self.search_links = QCheckBox()
         self.search_links.setChecked(False)
         self.search_links.setToolTip("Для каждого источника будут собран спсиок параграфов, в которых имеется ссылка."
@@ -65,14 +82,40 @@ class FileLoader(QWidget):
                                       "\n(Может замедлить процесс анализа)")
         self.settings_layout.addRow(search_links_label, self.search_links)
 
+        self.cache = ResultCache()
+        # заголовки, указанные пользователем, запоминаются и в следующий раз находятся без вопроса
+        self.header_locator = HeaderLocator(HeaderStore())
+        self.clear_cache_btn = QPushButton(Text.text[lang]['clear_cache_btn'])
+        self.clear_cache_btn.setToolTip(Text.text[lang]['clear_cache_tooltip'])
+        self.clear_cache_btn.clicked.connect(self.clear_cache)
+        self.settings_layout.addRow(self.clear_cache_btn)
+
         self.btn = QPushButton(Text.text[lang]['select_file_btn'])
         self.btn.clicked.connect(self.select_file)
         self.layout_.addWidget(self.btn, alignment=Qt.AlignCenter)
 
         self.layout_.addWidget(self.settings)
 
+        self.jobs_layout = QVBoxLayout()
+        self.layout_.addLayout(self.jobs_layout)
+        self.jobs = {}  # AnalysisJob -> JobWidget
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(MAX_JOBS)
+
         self.setLayout(self.layout_)
         self.result_widgets = []
+        self.updates = {}  # ResultWidget -> AnalysisJob пересчета
+
+        # открытые результаты пересчитываются в пуле потоков, когда настройки перестают меняться
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(UPDATE_DELAY)
+        self.update_timer.timeout.connect(self.update_results)
+        self.min_year.valueChanged.connect(self.schedule_update)
+        self.check_authors.toggled.connect(self.schedule_update)
+        self.fuzzy.valueChanged.connect(self.schedule_update)
+        self.search_links.toggled.connect(self.schedule_update)
 
         self.setAcceptDrops(True)
 
@@ -110,59 +153,136 @@ class FileLoader(QWidget):
                 QMessageBox().critical(self, "Ошибка", "Во время чтения прозошла ошибка: " + str(exception))
 
     @pyqtSlot('PyQt_PyObject', name='run')
-    def run(self, filename):
-        layout_ = QVBoxLayout()
-        label = QLabel("Обработка файла: {}".format(filename))
-        layout_.addWidget(label)
+    def run(self, filename, header=None):
+        config = self.config()
+        job = AnalysisJob(filename, header, cache=self.cache, locator=self.header_locator, **config)
+        job_widget = JobWidget(job)
+        self.jobs_layout.addWidget(job_widget)
+        self.jobs[job] = job_widget
 
-        progress_bar = QProgressBar()
-        progress_bar.setRange(0, 100)
-        message = QLabel()
-        layout_.addWidget(message, alignment=Qt.AlignCenter)
+        job.signals.finished.connect(lambda sources: self.job_finished(job, sources, config))
+        job.signals.failed.connect(lambda exception: self.job_failed(job, exception))
+        job.signals.cancelled.connect(lambda: self.remove_job(job))
+        job_widget.cancel_button.clicked.connect(lambda: self.cancel_job(job))
 
-        layout_.addWidget(progress_bar)
-
-        self.layout().addLayout(layout_)
-
-        def progress_bar_update(text='', value=0):
-            progress_bar.setValue(value)
-            message.setText(text)
-            QApplication.instance().processEvents()
+        self.pool.start(job)
 
+    def job_finished(self, job, sources, config):
         try:
-            sources = find_missing_src(filename, progress_bar_update, **self.config())
-
-            result_widget = ResultWidget(sources, filename, **self.config())
+            result_widget = ResultWidget(sources, job.filename, analysis=job.analysis, **config)
+            self.result_widgets.append(result_widget)
+            result_widget.destroyed.connect(lambda: self.forget_result(result_widget))
             if self.auto_save.isChecked():
                 result_widget.save(auto=True)
 
-            self.new_result.emit(result_widget, filename, self.view_type_checkbox.isChecked())
-        except NoSourcesException as e:
-            QMessageBox().critical(self, "Ошибка", "Раздел с источниками не обнаружен"+str(e))
+            self.new_result.emit(result_widget, job.filename, self.view_type_checkbox.isChecked())
         except Exception as exception:
             QMessageBox().critical(self, "Ошибка", "Во время чтения файла произошла ошибка" + str(exception))
-            traceback.print_exc(exception)
-
-
+            traceback.print_exc()
         finally:
-            self.layout().removeItem(layout_)
-            progress_bar.setParent(None)
-            progress_bar.deleteLater()
-            label.setParent(None)
-            label.deleteLater()
-            message.setParent(None)
-            message.deleteLater()
-            layout_.deleteLater()
-            QApplication.instance().processEvents()
+            self.remove_job(job)
+
+    def job_failed(self, job, exception):
+        self.remove_job(job)
+        if isinstance(exception, NoSourcesException):
+            if job.header is None:
+                candidate = exception.candidate
+                header, ok = QInputDialog().getText(
+                    self,
+                    "Заголовок списка литератур не найден",
+                    "Укажите заголовок списка литературы для файла\n{}".format(job.filename),
+                    text=candidate.text if candidate is not None else ''
+                )
+                if ok and header:
+                    self.run(job.filename, header.strip())
+                    return
+            QMessageBox().critical(self, "Ошибка", "Раздел с источниками не обнаружен" + str(exception))
+        else:
+            QMessageBox().critical(self, "Ошибка", "Во время чтения файла произошла ошибка" + str(exception))
+
+    def cancel_job(self, job):
+        # задание еще в очереди - убираем сразу, иначе оно остановится при следующем обновлении прогресса
+        if self.pool.tryTake(job):
+            self.remove_job(job)
+
+    def remove_job(self, job):
+        job_widget = self.jobs.pop(job, None)
+        if job_widget is not None:
+            self.jobs_layout.removeWidget(job_widget)
+            job_widget.setParent(None)
+            job_widget.deleteLater()
+
+    def forget_result(self, result_widget):
+        if result_widget in self.result_widgets:
+            self.result_widgets.remove(result_widget)
+        job = self.updates.pop(result_widget, None)
+        if job is not None:
+            job.cancel()
+            self.pool.tryTake(job)
+
+    def schedule_update(self, *args):
+        self.update_timer.start()
+
+    def update_results(self):
+        config = self.config()
+        for result_widget in list(self.result_widgets):
+            self.update_result(result_widget, config)
+
+    def update_result(self, result_widget, config):
+        job = self.updates.get(result_widget)
+        if job is not None:
+            # проверка не выполняется в двух потоках сразу: текущий пересчет отменяется,
+            # а новый запускается после его остановки (update_done)
+            job.cancel()
+            if self.pool.tryTake(job):
+                self.update_done(result_widget, job)
+            return
+        if not result_widget.needs_update(config):
+            return
+
+        job = AnalysisJob(result_widget.source_file, analysis=result_widget.analysis, **config)
+        self.updates[result_widget] = job
+        result_widget.begin_update()
+        job.signals.finished.connect(lambda sources: self.update_finished(result_widget, job, sources, config))
+        job.signals.failed.connect(lambda exception: self.update_failed(result_widget, job, exception))
+        job.signals.cancelled.connect(lambda: self.update_done(result_widget, job))
+        self.pool.start(job)
+
+    def update_finished(self, result_widget, job, sources, config):
+        if self.updates.get(result_widget) is not job:
+            return
+        try:
+            result_widget.end_update(sources, **config)
+        except Exception as exception:
+            self.update_failed(result_widget, job, exception)
+            traceback.print_exc()
+            return
+        self.update_done(result_widget, job)
+
+    def update_failed(self, result_widget, job, exception):
+        if self.updates.get(result_widget) is not job:
+            return
+        self.forget_result(result_widget)
+        QMessageBox().critical(self, "Ошибка", "Не удалось обновить результат проверки {}: {}"
+                               .format(result_widget.source_file, exception))
+
+    def update_done(self, result_widget, job):
+        if self.updates.get(result_widget) is job:
+            del self.updates[result_widget]
+        # настройки могли измениться, пока шел пересчет
+        if result_widget in self.result_widgets:
+            self.update_result(result_widget, self.config())
+
+    def clear_cache(self):
+        try:
+            self.cache.clear()
+        except Exception as exception:
+            QMessageBox().critical(self, "Ошибка", "Не удалось очистить кэш: " + str(exception))
 
     def config(self):
         return dict(
             min_year=self.min_year.value(),
             check_authors=self.check_authors.isChecked(),
             search_links=self.search_links.isChecked(),
-            declare_text=lambda: QInputDialog().getText(
-                self,
-                "Заголовок списка литератур не найден",
-                "Укажите заголовок списка литературы."
-            )
+            fuzzy=self.fuzzy.value(),
         )
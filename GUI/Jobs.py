@@ -0,0 +1,121 @@
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, Qt
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QLabel, QProgressBar, QPushButton
+
+from Domain.antistud_fun import Analysis, NoSourcesException
+from Domain.events import EventChannel, progress
+
+
+class JobCancelledException(Exception):
+    pass
+
+
+class JobSignals(QObject):
+    progress = pyqtSignal(str, int)
+    finished = pyqtSignal('PyQt_PyObject')  # List[SourceData]; сама проверка доступна в AnalysisJob.analysis
+    failed = pyqtSignal('PyQt_PyObject')  # Exception
+    cancelled = pyqtSignal()
+
+
+class AnalysisJob(QRunnable):
+    """
+    Проверка одного файла в пуле потоков.
+    Результат и ход выполнения передаются в главный поток через сигналы.
+    :param analysis: проверка этого файла, выполненная ранее, - для пересчета с новыми настройками,
+        при котором повторяются только затронутые этапы. Одна проверка не должна выполняться
+        в двух заданиях одновременно.
+    """
+
+    def __init__(self, filename, header=None, analysis: Analysis = None, **config):
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.filename = filename
+        self.header = header
+        cache = config.pop('cache', None)
+        locator = config.pop('locator', None)
+        self.config = config
+        self.analysis = analysis or Analysis(
+            filename,
+            declare_text=(lambda: header) if header is not None else None,
+            cache=cache,
+            locator=locator,
+        )
+        self.signals = JobSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled
+
+    def _on_event(self, event):
+        # события о разборе записей приходят не чаще раза в EventChannel.interval,
+        # поэтому и отмена срабатывает с такой задержкой
+        if self._cancelled:
+            raise JobCancelledException()
+        state = progress(event)
+        if state is not None:
+            self.signals.progress.emit(*state)
+
+    def run(self):
+        if self._cancelled:
+            self.signals.cancelled.emit()
+            return
+        try:
+            events = EventChannel(self._on_event, document=self.filename)
+            sources = self.analysis.run(events, **self.config)
+        except JobCancelledException:
+            self.signals.cancelled.emit()
+        except NoSourcesException as exception:
+            self.signals.failed.emit(exception)
+        except Exception as exception:
+            traceback.print_exc()
+            self.signals.failed.emit(exception)
+        else:
+            self.signals.finished.emit(sources)
+
+
+class JobWidget(QWidget):
+    """
+    Строка списка заданий: имя файла, текущий этап, прогресс и кнопка отмены.
+    """
+
+    def __init__(self, job: AnalysisJob, flags=None, *args, **kwargs):
+        super().__init__(flags, *args, **kwargs)
+        self.job = job
+
+        self.layout_ = QVBoxLayout()
+        self.layout_.setContentsMargins(0, 0, 0, 0)
+
+        self.label = QLabel("Обработка файла: {}".format(job.filename))
+        self.layout_.addWidget(self.label)
+
+        self.message = QLabel("В очереди")
+        self.layout_.addWidget(self.message, alignment=Qt.AlignCenter)
+
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        progress_layout.addWidget(self.progress_bar)
+
+        self.cancel_button = QPushButton("Отмена")
+        self.cancel_button.clicked.connect(self.cancel)
+        progress_layout.addWidget(self.cancel_button)
+        self.layout_.addLayout(progress_layout)
+
+        self.setLayout(self.layout_)
+
+        job.signals.progress.connect(self.update_progress)
+
+    def update_progress(self, text='', value=0):
+        self.progress_bar.setValue(value)
+        self.message.setText(text)
+
+    def cancel(self):
+        self.job.cancel()
+        self.cancel_button.setEnabled(False)
+        self.message.setText("Отмена...")
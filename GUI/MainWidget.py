@@ -1,3 +1,4 @@
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTabWidget
 
 from GUI.FileLoader import FileLoader
@@ -29,10 +30,15 @@ class MainWidget(QWidget):
             if self.tab.currentIndex() == 0:
                 self.tab.setCurrentWidget(result)
         else:
+            # закрытое окно удаляется, чтобы не пересчитывать его при изменении настроек
+            result.setAttribute(Qt.WA_DeleteOnClose)
+            result.destroyed.connect(lambda: self.results.remove(result))
             self.results.append(result)
             result.show()
 
     def tab_close_request(self, closing_tab_index):
         if closing_tab_index == 0:
             return
+        widget = self.tab.widget(closing_tab_index)
         self.tab.removeTab(closing_tab_index)
+        widget.deleteLater()
@@ -3,7 +3,7 @@ from typing import List
 from PyQt5.QtCore import QModelIndex, Qt, QVariant, QAbstractTableModel
 from PyQt5.QtGui import QColor
 
-from Domain.antistud_fun import get_year, SourceData
+from Domain.antistud_fun import SourceData
 
 
 class QSourceModel(QAbstractTableModel):
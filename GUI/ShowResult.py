@@ -1,5 +1,3 @@
-from collections import Counter, defaultdict
-from enum import Enum
 from pathlib import Path
 from typing import List
 
@@ -8,30 +6,102 @@ from PyQt5.QtGui import QColor
 from PyQt5.QtWidgets import QWidget, QListWidget, QVBoxLayout, QHBoxLayout, QPushButton, QApplication, QFileDialog, \
     QMessageBox, QLabel, QTabWidget, QTableView,  QAbstractItemView, QLineEdit, QFormLayout
 
-from Domain import without_none
-from Domain.antistud_fun import SourceData
-from Domain.generate_file import generate
-
-from PyQtPlot.StackedBar import QStackedBarWidget
+from Domain.antistud_fun import SourceData, Analysis
+from Domain.generate_file import generate, report_path
 
 from GUI.QSourceList import QSourceModel
 from GUI.TreeView import TreeWidget
 
 
-class SourceState(Enum):
-    OK = 1
-    NO_LINKS = 2
-    OUTDATED = 3
-    NO_DATA = 4
-
-
 class ResultWidget(QWidget):
-    def __init__(self, sources: List[SourceData], source_file, flags=None, *args, **kwargs):
+    def __init__(self, sources: List[SourceData], source_file, flags=None, *args, analysis: Analysis = None, **kwargs):
         super().__init__(flags, *args)
         self.source_file = source_file
+        self.analysis = analysis
+        self.config = kwargs
+        self.updating = False
+        self._current_tab = 0
 
         self.tab = QTabWidget()
 
+        self.setWindowTitle("Результат проверки {source_file}".format(source_file=source_file))
+
+        self.layout_ = QVBoxLayout()
+
+        self.head_layout = QHBoxLayout()
+
+        self.copy_button = QPushButton("Скопировать список пропущенных\nисточников в буффер")
+        self.copy_button.clicked.connect(self.copy)
+
+        self.save_btn_layout = QVBoxLayout()
+
+        self.save_button = QPushButton("Cформировать отчет в формате docx")
+        self.save_button.clicked.connect(self.save)
+        self.save_btn_layout.addWidget(self.save_button)
+
+        self.saved_file_info = QWidget()
+        self.saved_file_info.setVisible(False)
+
+        saved_path_layout = QFormLayout()
+
+        self.save_path = QLineEdit()
+        self.save_path.setReadOnly(True)
+
+        saved_path_layout.addRow(QLabel('Файл сохранен'), self.save_path)
+
+        self.saved_file_info.setLayout(saved_path_layout)
+        self.save_btn_layout.addWidget(self.saved_file_info)
+
+        self.head_layout.addWidget(self.copy_button, stretch=2)
+        self.head_layout.addLayout(self.save_btn_layout, stretch=6)
+
+        self.file_label = QLabel(source_file)
+        self.total_label = QLabel()
+
+        self.layout_.addWidget(self.file_label)
+        self.layout_.addWidget(self.total_label)
+
+        self.layout_.addLayout(self.head_layout)
+
+        self.layout_.addWidget(self.tab)
+
+        self.setLayout(self.layout_)
+
+        self.show_sources(sources, **kwargs)
+
+    def needs_update(self, config) -> bool:
+        return self.analysis is not None and (self.updating or config != self.config)
+
+    def begin_update(self):
+        """
+        Результат пересчитывается в пуле потоков и меняет источники, которые читают таблицы,
+        поэтому до завершения пересчета таблицы убираются.
+        """
+        self.updating = True
+        self._clear_tabs()
+        self.copy_button.setEnabled(False)
+        self.save_button.setEnabled(False)
+        self.total_label.setText('Обновление результата...')
+
+    def end_update(self, sources: List[SourceData], **config):
+        self.updating = False
+        self.config = config
+        self.copy_button.setEnabled(True)
+        self.save_button.setEnabled(True)
+        self.show_sources(sources, **config)
+
+    def _clear_tabs(self):
+        if self.tab.count():
+            self._current_tab = self.tab.currentIndex()
+        while self.tab.count():
+            widget = self.tab.widget(0)
+            self.tab.removeTab(0)
+            widget.deleteLater()
+
+    def show_sources(self, sources: List[SourceData], **kwargs):
+        self._clear_tabs()
+        current_tab = self._current_tab
+
         for source in sources:
             source.set_limit_year(kwargs.get('min_year' or 0))
 
@@ -47,36 +117,24 @@ class ResultWidget(QWidget):
         self.old_list.addItems(self.old_links)
         self.tab.addTab(self.old_list, "Список устаревших источников")
 
-        data = without_none([source.year for source in sources])
-        if data:
-            analyze = defaultdict(list)
-            for source in sources:
-                if source.is_modern is True and source.has_links:
-                    analyze[SourceState.OK].append(source.year)
-                elif source.is_modern is True and not source.has_links:
-                    analyze[SourceState.NO_LINKS].append(source.year)
-                elif source.is_modern is False:
-                    analyze[SourceState.OUTDATED].append(source.year)
-                else:
-                    analyze[SourceState.NO_DATA].append(source.year)
+        # NumPy и PyQtPlot нужны только для гистограммы: загружаются при показе первого результата
+        from Domain.year_stats import YearTable, SourceState
+        from PyQtPlot.StackedBar import QStackedBarWidget
 
+        histogram = YearTable.from_sources(sources, self.source_file).histogram(kwargs.get('min_year') or 0)
+        data = [year for counts in histogram.values() for year in counts]
+        if data:
             self.histogram = QStackedBarWidget(flags=self)
 
-            normal_sources_years = Counter(without_none(analyze[SourceState.OK]))
-            if len(normal_sources_years):
-                self.histogram.add_plot(normal_sources_years, name='Прошли проверку', color=QColor(50, 200, 50))
-
-            unknown_sources_year = Counter(without_none(analyze[SourceState.NO_DATA]))
-            if len(unknown_sources_year):
-                self.histogram.add_plot(unknown_sources_year, name='Не известна дата', color=QColor(50, 200, 200))
-
-            old_sources_years = Counter(without_none(analyze[SourceState.OUTDATED]))
-            if len(old_sources_years):
-                self.histogram.add_plot(old_sources_years, name='Устарели', color=QColor(200, 200, 50))
-
-            missing_sources_years = Counter(without_none(analyze[SourceState.NO_LINKS]))
-            if len(missing_sources_years):
-                self.histogram.add_plot(missing_sources_years, name='Отсутвуют ссылки', color=QColor(200,50,50))
+            plots = [
+                (SourceState.OK, 'Прошли проверку', QColor(50, 200, 50)),
+                (SourceState.NO_DATA, 'Не известна дата', QColor(50, 200, 200)),
+                (SourceState.OUTDATED, 'Устарели', QColor(200, 200, 50)),
+                (SourceState.NO_LINKS, 'Отсутвуют ссылки', QColor(200, 50, 50)),
+            ]
+            for state, name, color in plots:
+                if histogram[state]:
+                    self.histogram.add_plot(histogram[state], name=name, color=color)
 
             self.histogram.set_tooltip_func(lambda x, y, name: '{name}\nгод: {x}\nисточников: {y}'
                                             .format(x=x, y=y, name=name))
@@ -105,48 +163,9 @@ class ResultWidget(QWidget):
             self.deep_table = TreeWidget(sources)
             self.tab.addTab(self.deep_table, "Просмотр ссылок")
 
-        self.setWindowTitle("Результат проверки {source_file}".format(source_file=source_file))
-
-        self.layout_ = QVBoxLayout()
-
-        self.head_layout = QHBoxLayout()
-
-        self.copy_button = QPushButton("Скопировать список пропущенных\nисточников в буффер")
-        self.copy_button.clicked.connect(self.copy)
-
-        self.save_btn_layout = QVBoxLayout()
-
-        self.save_button = QPushButton("Cформировать отчет в формате docx")
-        self.save_button.clicked.connect(self.save)
-        self.save_btn_layout.addWidget(self.save_button)
-
-        self.saved_file_info = QWidget()
-        self.saved_file_info.setVisible(False)
-
-        saved_path_layout = QFormLayout()
-
-        self.save_path = QLineEdit()
-        self.save_path.setReadOnly(True)
-
-        saved_path_layout.addRow(QLabel('Файл сохранен'), self.save_path)
-
-        self.saved_file_info.setLayout(saved_path_layout)
-        self.save_btn_layout.addWidget(self.saved_file_info)
-
-        self.head_layout.addWidget(self.copy_button, stretch=2)
-        self.head_layout.addLayout(self.save_btn_layout, stretch=6)
-
-        self.file_label = QLabel(source_file)
-        self.total_label = QLabel('Всего пропущено ссылок {} из {}'.format(len(self.missing_links), len(sources)))
-
-        self.layout_.addWidget(self.file_label)
-        self.layout_.addWidget(self.total_label)
-
-        self.layout_.addLayout(self.head_layout)
-
-        self.layout_.addWidget(self.tab)
-
-        self.setLayout(self.layout_)
+        self.total_label.setText('Всего пропущено ссылок {} из {}'.format(len(self.missing_links), len(sources)))
+        if 0 <= current_tab < self.tab.count():
+            self.tab.setCurrentIndex(current_tab)
 
     def copy(self):
         try:
@@ -165,8 +184,7 @@ class ResultWidget(QWidget):
             self.saved_file_info.setVisible(True)
             self.save_path.setText(target_file)
 
-        prepared_name = Path(self.source_file)
-        prepared_name = prepared_name.with_name('[Проверка источников] ' + prepared_name.name).with_suffix('.docx')
+        prepared_name = report_path(self.source_file)
         if not auto:
             try:
                 name, ext = QFileDialog().getSaveFileName(
@@ -9,7 +9,13 @@ text = {
                             "сохранен рядом с проверяемой работой.",
         'auto_save_label': 'Автоматически сохранить отчет',
         'select_file_btn': "Выбрать файл",
-        'check_authors_tooltip': "Проверять ссылки по именам авторов в тексте\n(может замедлить проверку).",
-        'check_authors_label': "Включить проверку по авторам"
+        'check_authors_tooltip': "Проверять ссылки по именам авторов в тексте.",
+        'check_authors_label': "Включить проверку по авторам",
+        'fuzzy_tooltip': "Сколько опечаток в фамилии автора допускается при проверке по авторам "
+                         "('Иванова И.И.' вместо 'Иванов И.И.').\n0 - только точное совпадение.",
+        'fuzzy_label': "Допустимые опечатки в фамилиях",
+        'clear_cache_btn': "Очистить кэш результатов",
+        'clear_cache_tooltip': "Повторная проверка уже проверенных файлов с теми же настройками "
+                               "берет результат из кэша.\nПосле очистки все файлы будут проверены заново."
     }
 }
@@ -1,44 +1,212 @@
-from typing import List
+from typing import List, Optional
 
-from PyQt5.QtWidgets import QTreeWidget
-from PyQt5.QtWidgets import QTreeWidgetItem
+from PyQt5.QtCore import QAbstractItemModel, QModelIndex, Qt, QVariant
+from PyQt5.QtWidgets import QWidget, QTreeView, QPlainTextEdit, QSplitter, QVBoxLayout
 
 from Domain.antistud_fun import SourceData
 
+PREVIEW_LENGTH = 150  # символов абзаца в дереве, полный текст показывается при выборе строки
+FETCH_BATCH = 50  # ссылок, добавляемых в дерево за раз
 
-class TreeWidget(QTreeWidget):
-    def __init__(self, sources:List[SourceData]):
-        super().__init__()
 
-        self.setColumnCount(2)
-        self.setHeaderLabels(['Просмотр', 'Текст'])
-        self.resizeColumnToContents(1)
+def preview(text: str) -> str:
+    text = text or ''
+    if len(text) <= PREVIEW_LENGTH:
+        return text
+    return text[:PREVIEW_LENGTH].rstrip() + '…'
+
+
+class _Node:
+    """
+    Строка дерева. Узлы ссылок создаются только при раскрытии родителя.
+    """
+    __slots__ = ('parent', 'row', 'source', 'link', 'children')
+
+    SOURCE, TEXT, LINKS, LINK = range(4)
+
+    def __init__(self, parent: Optional['_Node'], row: int, source: SourceData, link: Optional[int] = None):
+        self.parent = parent
+        self.row = row
+        self.source = source
+        self.link = link
+        self.children: Optional[List['_Node']] = None
+
+    @property
+    def kind(self):
+        if self.parent is None:
+            return self.SOURCE
+        if self.link is not None:
+            return self.LINK
+        return self.TEXT if self.row == 0 else self.LINKS
+
+    def links(self):
+        return self.source.links or ()
+
+
+class LinkTreeModel(QAbstractItemModel):
+    """
+    Источники и абзацы со ссылками на них. Дочерние строки создаются при раскрытии
+    источника, абзацы со ссылками подгружаются порциями по FETCH_BATCH.
+    """
+    label_col = 0
+    text_col = 1
+
+    def __init__(self, sources: List[SourceData], parent=None):
+        super().__init__(parent)
+        self.sources = sources
+        self._roots = [_Node(None, row, source) for row, source in enumerate(sources)]
+
+    def _node(self, index: QModelIndex) -> Optional[_Node]:
+        return index.internalPointer() if index.isValid() else None
+
+    def _children(self, node: _Node) -> List[_Node]:
+        if node.children is None:
+            kind = node.kind
+            if kind == _Node.SOURCE:
+                node.children = [_Node(node, 0, node.source)]
+                if node.links():
+                    node.children.append(_Node(node, 1, node.source))
+            else:
+                # ссылки добавляются в fetchMore
+                node.children = []
+        return node.children
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        node = self._node(parent)
+        children = self._roots if node is None else self._children(node)
+        return self.createIndex(row, column, children[row])
 
-        for source in sources:
-            source_item = QTreeWidgetItem()
-            source_item.setText(0, str(source.index))
+    def parent(self, index=QModelIndex()):
+        node = self._node(index)
+        if node is None or node.parent is None:
+            return QModelIndex()
+        return self.createIndex(node.parent.row, 0, node.parent)
 
-            self_text = QTreeWidgetItem()
-            self_text.setText(0, 'Источник')
-            self_text.setText(1, str(source.text))
-            source_item.addChild(self_text)
+    def rowCount(self, parent=QModelIndex(), *args, **kwargs):
+        if parent.column() > 0:
+            return 0
+        node = self._node(parent)
+        if node is None:
+            return len(self._roots)
+        if node.kind in (_Node.SOURCE, _Node.LINKS):
+            return len(self._children(node))
+        return 0
 
-            links_item = QTreeWidgetItem()
-            links_item.setText(0, 'Ссылки')
+    def columnCount(self, parent=QModelIndex(), *args, **kwargs):
+        return 2
 
-            if source.has_links:
-                for index, link in enumerate(source.links):
-                    link_item = QTreeWidgetItem()
-                    link_item.setText(0, str(index+1))
-                    link_item.setText(1, link)
-                    links_item.addChild(link_item)
+    def hasChildren(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return False
+        node = self._node(parent)
+        if node is None:
+            return bool(self._roots)
+        if node.kind == _Node.SOURCE:
+            return True
+        if node.kind == _Node.LINKS:
+            return bool(node.links())
+        return False
+
+    def _links_node(self, parent: QModelIndex) -> Optional[_Node]:
+        node = self._node(parent)
+        if node is None or parent.column() > 0 or node.kind != _Node.LINKS:
+            return None
+        return node
+
+    def canFetchMore(self, parent):
+        node = self._links_node(parent)
+        return node is not None and len(self._children(node)) < len(node.links())
+
+    def fetchMore(self, parent):
+        node = self._links_node(parent)
+        if node is None:
+            return
+        children = self._children(node)
+        start = len(children)
+        end = min(start + FETCH_BATCH, len(node.links()))
+        if end <= start:
+            return
+        self.beginInsertRows(parent, start, end - 1)
+        children.extend(_Node(node, row, node.source, row) for row in range(start, end))
+        self.endInsertRows()
+
+    def full_text(self, index: QModelIndex) -> str:
+        node = self._node(index)
+        if node is None:
+            return ''
+        kind = node.kind
+        if kind == _Node.LINK:
+            return node.links()[node.link]
+        if kind in (_Node.SOURCE, _Node.TEXT):
+            return str(node.source.original or node.source.text)
+        return ''
+
+    def data(self, index: QModelIndex, role=None):
+        node = self._node(index)
+        if node is None:
+            return QVariant()
+        kind = node.kind
+        col = index.column()
+
+        if role == Qt.DisplayRole:
+            if col == self.label_col:
+                if kind == _Node.SOURCE:
+                    return str(node.source.index)
+                if kind == _Node.TEXT:
+                    return 'Источник'
+                if kind == _Node.LINKS:
+                    return 'Ссылки ({})'.format(len(node.links()))
+                return str(node.link + 1)
+            if col == self.text_col:
+                if kind == _Node.SOURCE:
+                    return preview(str(node.source))
+                if kind == _Node.TEXT:
+                    return preview(node.source.text)
+                if kind == _Node.LINK:
+                    return preview(node.links()[node.link])
+
+        if role == Qt.ToolTipRole and col == self.text_col and kind == _Node.LINK:
+            return node.links()[node.link]
+
+        return QVariant()
+
+    def headerData(self, p_int, orientation, role=None):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ['Просмотр', 'Текст'][p_int]
+        return QVariant()
+
+
+class TreeWidget(QWidget):
+    """
+    Просмотр ссылок на источники: дерево с сокращенными абзацами и полный текст выбранной строки.
+    """
+
+    def __init__(self, sources: List[SourceData]):
+        super().__init__()
 
-                source_item.addChild(links_item)
+        self.model = LinkTreeModel(sources, self)
 
-            self.addTopLevelItem(source_item)
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setColumnWidth(0, 120)
+        self.tree.selectionModel().currentChanged.connect(self.show_full_text)
 
-        self.setUniformRowHeights(False)
-        self.setWordWrap(True)
+        self.full_text = QPlainTextEdit()
+        self.full_text.setReadOnly(True)
 
+        splitter = QSplitter(Qt.Vertical)
+        splitter.addWidget(self.tree)
+        splitter.addWidget(self.full_text)
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 1)
 
+        layout_ = QVBoxLayout()
+        layout_.setContentsMargins(0, 0, 0, 0)
+        layout_.addWidget(splitter)
+        self.setLayout(layout_)
 
+    def show_full_text(self, current, previous=None):
+        self.full_text.setPlainText(self.model.full_text(current))
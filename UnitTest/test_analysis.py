@@ -0,0 +1,49 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from Benchmark.generator import Generator
+from Domain.antistud_fun import Analysis
+from Domain.profiling import Profiler
+
+
+class TestAnalysisStages(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.TemporaryDirectory()
+        cls.path = Generator(paragraphs=50, sources=10, seed=1).save(os.path.join(cls.dir.name, 'work.docx'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dir.cleanup()
+
+    def setUp(self):
+        self.analysis = Analysis(self.path)
+        self.analysis.run(min_year=2000, check_authors=True, search_links=True)
+
+    def run_profiled(self, **settings):
+        profiler = Profiler(trace_memory=False)
+        sources = self.analysis.run(profiler=profiler, **settings)
+        return sources, profiler.stages
+
+    def test_same_settings(self):
+        _, stages = self.run_profiled(min_year=2000, check_authors=True, search_links=True)
+        self.assertEqual({}, dict(stages))
+
+    def test_min_year_only_reclassifies(self):
+        sources, stages = self.run_profiled(min_year=2015, check_authors=True, search_links=True)
+        self.assertEqual({}, dict(stages))
+        self.assertTrue(all(source.is_modern == (source.year >= 2015) for source in sources if source.year))
+
+    def test_links_without_rereading(self):
+        _, stages = self.run_profiled(min_year=2000, check_authors=False, search_links=False)
+        self.assertIn('find_links', stages)
+        self.assertNotIn('extract', stages)
+        self.assertNotIn('parse_entries', stages)
+
+    def test_extract_streamed(self):
+        profiler = Profiler(trace_memory=False)
+        Analysis(self.path).run(profiler=profiler)
+        self.assertEqual(1, profiler.stages['extract'].calls)
+        self.assertEqual(1, profiler.stages['process.document'].calls)
+        self.assertLessEqual(profiler.stages['extract'].time, profiler.stages['referat'].time)
@@ -0,0 +1,74 @@
+from unittest import TestCase
+
+from Domain.antistud_fun import _Author, Referat, SourceData
+from Domain.author_matcher import AhoCorasick, AuthorIndex, common_positions
+from Domain.normalize import normalize
+
+
+class TestAhoCorasick(TestCase):
+    def setUp(self):
+        self.automaton = AhoCorasick([('he', 1), ('she', 2), ('his', 3), ('hers', 4)])
+
+    def test_overlapping(self):
+        self.assertEqual({1, 2, 4}, self.automaton.find('ushers'))
+
+    def test_nothing(self):
+        self.assertEqual(set(), self.automaton.find('abc'))
+
+
+class TestAuthorIndex(TestCase):
+    def setUp(self):
+        self.ivanov = _Author('Иванов И.И.')
+        self.petrov = _Author('П.П. Петров')
+        self.index = AuthorIndex([self.ivanov, self.petrov], list(map(normalize, [
+            'Как писал Иванов И.И., ...',
+            'По мнению И. И. Иванова и П.П. Петрова ...',
+            'Ничего',
+            'Петров П.П. и Иванов И. И. считают',
+        ])))
+
+    def test_positions(self):
+        self.assertEqual({0, 1, 3}, self.index.positions(self.ivanov))
+        self.assertEqual({1, 3}, self.index.positions(self.petrov))
+
+    def test_common(self):
+        self.assertEqual({1, 3}, common_positions(self.index, [self.ivanov, self.petrov]))
+
+    def test_interned_key(self):
+        self.assertIn(_Author('И.И. Иванов'), self.index)
+
+
+class TestFindLinksByAuthors(TestCase):
+    def test(self):
+        document = Referat([
+            'Как отмечает Иванов И.И., ...',
+            'Список литературы',
+            '1. Иванов И.И. Книга. – М., 2010.',
+        ], declare_text=None)
+        source = SourceData('Книга', 1, 2010, authors=['Иванов И.И.'])
+        self.assertEqual(['Как отмечает Иванов И.И., ...'], source.find_links(document))
+
+
+class TestFindLinksNormalized(TestCase):
+    def test(self):
+        document = Referat([
+            'Как отмечает Сёмин\u00a0С.\u2009С., ...',
+            'Как пишет Cемин, С. С., ...',  # латинская C
+            'Список литературы',
+            '1. Семин С.С. Книга. – М., 2010.',
+        ], declare_text=None)
+        source = SourceData('Книга', 1, 2010, authors=['Семин С.С.'])
+        self.assertEqual(2, len(source.find_links(document)))
+
+
+class TestAuthorInterning(TestCase):
+    def test_same_instance(self):
+        self.assertIs(_Author('Иванов И.И.'), _Author('И. И. Иванов'))
+
+    def test_yo(self):
+        self.assertIs(_Author('Семин С.С.'), _Author('Сёмин С. С.'))
+
+    def test_pickle(self):
+        import pickle
+        author = _Author('Иванов И.И.')
+        self.assertIs(author, pickle.loads(pickle.dumps(author)))
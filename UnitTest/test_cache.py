@@ -0,0 +1,47 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from Domain.antistud_fun import SourceData
+from Domain.cache import ResultCache
+
+
+class TestResultCache(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.document = os.path.join(self.dir.name, 'work.docx')
+        with open(self.document, 'wb') as file:
+            file.write(b'content')
+        self.cache = ResultCache(os.path.join(self.dir.name, 'cache.sqlite3'))
+
+    def tearDown(self):
+        self.cache.close()
+        self.dir.cleanup()
+
+    def test_roundtrip(self):
+        key = self.cache.key(self.document, dict(min_year=2000))
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, [SourceData('Книга', 1, 2010, authors=['Иванов И.И.'])])
+
+        sources = self.cache.get(key)
+        self.assertEqual(1, sources[0].index)
+        self.assertEqual(['Иванов И. И.'], [str(author) for author in sources[0].authors])
+
+    def test_settings_change_key(self):
+        self.assertNotEqual(self.cache.key(self.document, dict(min_year=2000)),
+                            self.cache.key(self.document, dict(min_year=2010)))
+
+    def test_lru_eviction(self):
+        self.cache.max_size = 2500
+        for key in ['a', 'b', 'c']:
+            self.cache.put(key, b'x' * 1000)
+            self.cache.get('a')
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+
+    def test_invalidate(self):
+        key = self.cache.key(self.document, dict(min_year=2000))
+        self.cache.put(key, [])
+        self.cache.invalidate(self.document)
+        self.assertIsNone(self.cache.get(key))
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from Domain.antistud_fun import Referat, SourceData
+from Domain.citations import CitationIndex, iter_citations
+
+
+class TestIterCitations(TestCase):
+    def test_single(self):
+        self.assertEqual([3], list(iter_citations("Как показано в [3].")))
+
+    def test_list(self):
+        self.assertEqual([1, 2, 10], list(iter_citations("См. [1, 2,10]")))
+
+    def test_with_page(self):
+        self.assertEqual([4, 5], list(iter_citations("Цитата [4, 5, С. 12]")))
+
+    def test_not_citation(self):
+        self.assertEqual([], list(iter_citations("Массив a[i] и [С. 12]")))
+
+
+class TestCitationIndex(TestCase):
+    def setUp(self):
+        self.index = CitationIndex([
+            "Введение [1].",
+            "Без ссылок.",
+            "Сравнение [1, 2] и [12, С. 3].",
+        ])
+
+    def test_positions(self):
+        self.assertEqual([0, 2], self.index.positions(1))
+        self.assertEqual([2], self.index.positions(12))
+
+    def test_missing(self):
+        self.assertEqual([], self.index.positions(3))
+        self.assertNotIn(3, self.index)
+
+
+class TestFindLinks(TestCase):
+    def setUp(self):
+        self.document = Referat([
+            "Введение",
+            "Первый абзац [1].",
+            "Второй абзац [1, 2].",
+            "Список литературы",
+            "1. Иванов И.И. Книга. – М., 2010.",
+            "2. Петров П.П. Статья. – М., 2015.",
+            "3. Сидоров С.С. Пособие. – М., 2018.",
+        ], declare_text=None)
+
+    def test_links_in_reverse_order(self):
+        source = SourceData("Книга", 1, 2010)
+        self.assertEqual(["Второй абзац [1, 2].", "Первый абзац [1]."], source.find_links(self.document))
+
+    def test_first_link_only(self):
+        source = SourceData("Книга", 1, 2010)
+        self.assertEqual(["Второй абзац [1, 2]."], source.find_links(self.document, search_links=False))
+
+    def test_no_links(self):
+        source = SourceData("Пособие", 3, 2018)
+        source.find_links(self.document)
+        self.assertFalse(source.has_links)
@@ -0,0 +1,69 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from Domain.antistud_fun import SourceData
+from Domain.corpus import CorpusIndex, normalize_entry
+
+BOOK = 'Иванов И.И. Основы программирования. – М.: Наука, {year}. – 320 с.'
+BOOK_VARIANT = 'Иванов, И. И. Основы программирования [Текст] / И.И. Иванов. - Москва : Наука, {year}. - 320 с.'
+OTHER = 'Петров П.П. Теория вероятностей и математическая статистика. – СПб.: Питер, 2015. – 480 с.'
+
+
+class TestCorpusIndex(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.corpus = CorpusIndex(os.path.join(self.dir.name, 'corpus.sqlite3'))
+
+    def tearDown(self):
+        self.corpus.close()
+        self.dir.cleanup()
+
+    def document(self, name, *texts, year=None):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(texts))
+        sources = [SourceData(text, index, year) for index, text in enumerate(texts, 1)]
+        self.corpus.add_document(path, sources)
+        return path
+
+    def test_normalize(self):
+        self.assertEqual('иванов и и основы', normalize_entry('Иванов, И.И. Основы [Электронный ресурс]. URL: http://x.ru'))
+
+    def test_variants_clustered(self):
+        first = self.document('a.docx', BOOK.format(year=2001), OTHER)
+        second = self.document('b.docx', BOOK_VARIANT.format(year=2001))
+        self.document('c.docx', OTHER)
+
+        self.assertEqual([first, second], self.corpus.citing_documents(BOOK.format(year=2001)))
+        top = self.corpus.clusters()
+        self.assertEqual([2, 2], [cluster.entries for cluster in top])
+
+    def test_editions(self):
+        for name, year in [('a.docx', 2001), ('b.docx', 2001), ('c.docx', 2019)]:
+            self.document(name, BOOK.format(year=year), year=year)
+        cluster, = self.corpus.find_clusters(BOOK.format(year=2001))
+        self.assertEqual({2001: 2, 2019: 1}, self.corpus.cluster(cluster).years)
+        self.assertEqual([cluster], [c.id for c in self.corpus.clusters(min_size=2, before_year=2010)])
+        self.assertEqual([], self.corpus.clusters(min_size=2, before_year=2001))
+
+    def test_readd_and_remove(self):
+        path = self.document('a.docx', BOOK.format(year=2001), OTHER)
+        self.document('b.docx', OTHER)
+        self.assertEqual(3, len(self.corpus))
+        self.assertTrue(self.corpus.is_current(path))
+
+        self.corpus.add_document(path, [SourceData(OTHER, 1, None)])
+        self.assertEqual(2, len(self.corpus))
+        self.assertEqual([], self.corpus.find(BOOK.format(year=2001)))
+
+        self.corpus.remove_document(path)
+        self.assertEqual(1, len(self.corpus.find(OTHER)))
+
+    def test_remove_keeps_buckets_of_copies(self):
+        # корзины записи первой работы должны перейти к такой же записи второй
+        first = self.document('a.docx', BOOK.format(year=2001))
+        second = self.document('b.docx', BOOK.format(year=2001))
+        self.corpus.remove_document(first)
+        third = self.document('c.docx', BOOK_VARIANT.format(year=2001))
+        self.assertEqual([second, third], self.corpus.citing_documents(BOOK.format(year=2001)))
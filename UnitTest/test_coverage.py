@@ -0,0 +1,76 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from Benchmark.generator import Generator
+from Domain.antistud_fun import Analysis, Referat, SourceData
+from Domain.profiling import Profiler
+
+
+class TestCoverage(TestCase):
+    def setUp(self):
+        self.document = Referat([
+            'Введение',
+            'Первый абзац [1].',
+            'Как отмечают Иванов И.И. и Петров П.П., ...',
+            'Второй абзац [1, 2].',
+            'Третий абзац без ссылок.',
+            'Список литературы',
+            '1. Сидоров С.С. Книга. – М., 2010.',
+            '2. Петров П.П. Статья. – М., 2015.',
+            '3. Иванов И.И., Петров П.П. Пособие. – М., 2018.',
+        ], declare_text=None)
+
+    def sources(self):
+        return [
+            SourceData('Книга', 1, 2010, authors=['Сидоров С.С.']),
+            SourceData('Статья', 2, 2015, authors=['Петров П.П.']),
+            SourceData('Пособие', 3, 2018, authors=['Иванов И.И.', 'Петров П.П.']),
+        ]
+
+    def test_stops_when_all_cited(self):
+        sources = self.sources()
+        self.assertEqual(3, self.document.coverage(sources))
+        self.assertEqual([True, True, True], [source.has_links for source in sources])
+
+    def test_first_link(self):
+        sources = self.sources()
+        self.document.coverage(sources)
+        self.assertEqual(('Первый абзац [1].',), sources[0].links)
+        self.assertEqual(('Как отмечают Иванов И.И. и Петров П.П., ...',), sources[1].links)
+
+    def test_without_authors(self):
+        sources = self.sources()
+        self.assertEqual(6, self.document.coverage(sources, check_authors=False))
+        self.assertEqual([True, True, False], [source.has_links for source in sources])
+
+    def test_all_authors_required(self):
+        document = Referat([
+            'По мнению Иванова И.И., ...',
+            'Список литературы',
+            '1. Иванов И.И., Петров П.П. Пособие. – М., 2018.',
+        ], declare_text=None)
+        sources = [SourceData('Пособие', 1, 2018, authors=['Иванов И.И.', 'Петров П.П.'])]
+        document.coverage(sources)
+        self.assertFalse(sources[0].has_links)
+
+
+class TestCoverageMatchesFullSearch(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.TemporaryDirectory()
+        cls.path = Generator(paragraphs=200, sources=30, seed=3).save(os.path.join(cls.dir.name, 'work.docx'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dir.cleanup()
+
+    def test(self):
+        analysis = Analysis(self.path)
+        for check_authors in (True, False):
+            full = [source.has_links for source in analysis.run(check_authors=check_authors, search_links=True)]
+            profiler = Profiler(trace_memory=False)
+            fast = analysis.run(check_authors=check_authors, search_links=False, profiler=profiler)
+            self.assertEqual(full, [source.has_links for source in fast])
+            read = profiler.counters['coverage']['paragraphs_read']
+            self.assertLessEqual(read, profiler.counters['coverage']['paragraphs_total'])
@@ -0,0 +1,87 @@
+import os
+import queue
+import tempfile
+from unittest import TestCase
+
+from Benchmark.generator import Generator
+from Domain.antistud_fun import Analysis, find_missing_src
+from Domain.events import EventChannel, EntryParsed, StageStarted, DocumentFinished, DocumentFailed, \
+    QueueSink, CallbackSink, drain
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEventChannel(TestCase):
+    def setUp(self):
+        self.events = []
+        self.clock = FakeClock()
+        self.channel = EventChannel(self.events.append, document='work.docx', interval=1.0, clock=self.clock)
+
+    def test_throttled_by_time(self):
+        for index in range(10):
+            self.clock.now = index * 0.3
+            self.channel.entry(index, 100)
+        self.assertEqual([0, 4, 8], [event.index for event in self.events])
+
+    def test_last_entry(self):
+        self.channel.entry(0, 3)
+        self.channel.entry(1, 3)
+        self.channel.entry(2, 3)
+        self.assertEqual([0, 2], [event.index for event in self.events])
+        self.assertEqual(100, self.events[-1].percent)
+
+    def test_other_events_not_throttled(self):
+        self.channel.stage('parse')
+        self.channel.stage('links')
+        self.channel.failed('ошибка')
+        self.assertEqual([StageStarted, StageStarted, DocumentFailed], list(map(type, self.events)))
+        self.assertEqual('work.docx', self.events[0].document)
+
+    def test_queue(self):
+        events = queue.Queue()
+        channel = EventChannel(QueueSink(events), document='work.docx')
+        channel.stage('parse')
+        channel.finished(10, 2, 1)
+        events.put(None)
+        received = []
+        drain(events, received.append)
+        self.assertEqual([StageStarted, DocumentFinished], list(map(type, received)))
+
+    def test_callback(self):
+        calls = []
+        channel = EventChannel(CallbackSink(lambda text, value: calls.append((text, value))))
+        channel.entry(0, 2)
+        channel.finished(2, 0, 0)
+        self.assertEqual([('Поиск источников', 50), ('Завершение', 100)], calls)
+
+
+class TestAnalysisEvents(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.TemporaryDirectory()
+        cls.path = Generator(paragraphs=50, sources=200, seed=1).save(os.path.join(cls.dir.name, 'work.docx'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dir.cleanup()
+
+    def test_stream(self):
+        events = []
+        Analysis(self.path).run(EventChannel(events.append, document=self.path, interval=60), min_year=2000)
+        self.assertEqual(['parse', 'links'], [event.stage for event in events if isinstance(event, StageStarted)])
+        # первая и последняя запись: остальные отброшены по времени
+        self.assertEqual(2, sum(1 for event in events if isinstance(event, EntryParsed)))
+        self.assertIsInstance(events[-1], DocumentFinished)
+        self.assertEqual(200, events[-1].sources)
+
+    def test_callback(self):
+        calls = []
+        find_missing_src(self.path, lambda text, value: calls.append((text, value)))
+        self.assertLess(len(calls), 200)
+        self.assertEqual(('Завершение', 100), calls[-1])
@@ -0,0 +1,50 @@
+import csv
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from Domain.antistud_fun import SourceData
+from Domain.export import Exporter
+
+
+class TestExporter(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.sources = [SourceData('Книга', 1, 2010, authors=['Иванов И.И.', 'Петров П.П.']).to_dict(),
+                        SourceData('Статья', 2, None).to_dict()]
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_jsonl(self):
+        path = os.path.join(self.dir.name, 'out.jsonl')
+        with Exporter(path) as exporter:
+            exporter.write_document('a.docx', self.sources)
+            # записи документа доступны сразу, до закрытия файла
+            with open(path, encoding='utf-8') as file:
+                self.assertEqual(2, len(file.readlines()))
+            exporter.write_document('b.docx', self.sources[:1])
+
+        with open(path, encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(['a.docx', 'a.docx', 'b.docx'], [record['file'] for record in records])
+        self.assertEqual(['Иванов И. И.', 'Петров П. П.'], records[0]['authors'])
+        self.assertIsNone(records[1]['year'])
+
+    def test_csv_append(self):
+        path = os.path.join(self.dir.name, 'out.csv')
+        with Exporter(path) as exporter:
+            exporter.write_document('a.docx', self.sources)
+        with Exporter(path, append=True) as exporter:
+            exporter.write_document('b.docx', self.sources[1:])
+
+        with open(path, encoding='utf-8-sig', newline='') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(3, len(rows))
+        self.assertEqual('Иванов И. И.; Петров П. П.', rows[0]['authors'])
+        self.assertEqual('b.docx', rows[2]['file'])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            Exporter(os.path.join(self.dir.name, 'out.xml'))
@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+from Domain.antistud_fun import Referat, SourceData, _Author
+from Domain.fuzzy import TrigramIndex, distance, max_distance, mentions
+from Domain.normalize import normalize
+
+
+class TestDistance(TestCase):
+    def test_exact(self):
+        self.assertEqual(0, distance('Иванов', 'Иванов', 0))
+
+    def test_within_limit(self):
+        self.assertEqual(1, distance('Иванов', 'Иванова', 2))
+        self.assertEqual(2, distance('Смирнов', 'Смрнова', 2))
+
+    def test_over_limit(self):
+        self.assertEqual(2, distance('Иванов', 'Петров', 1))
+        self.assertEqual(1, distance('Иванов', 'Иван', 0))
+
+    def test_short_words(self):
+        self.assertEqual(0, max_distance('Ли', 2))
+        self.assertEqual(1, max_distance('Петров', 2))
+        self.assertEqual(2, max_distance('Константинов', 2))
+
+
+class TestMentions(TestCase):
+    def test_declension(self):
+        self.assertTrue(mentions(normalize('По мнению Иванова И.И., ...'), 'Иванов', 'И', 1))
+        self.assertFalse(mentions(normalize('По мнению Иванова И.И., ...'), 'Иванов', 'И', 0))
+
+    def test_initial_required(self):
+        self.assertFalse(mentions(normalize('По мнению Иванова, ...'), 'Иванов', 'И', 1))
+        self.assertFalse(mentions(normalize('По мнению Иванова П.П., ...'), 'Иванов', 'И', 1))
+
+    def test_initial_before(self):
+        self.assertTrue(mentions(normalize('Как пишет И. И. Ивонов, ...'), 'Иванов', 'И', 1))
+
+    def test_author(self):
+        author = _Author('Иванов И.И.')
+        self.assertFalse(author.find_in_text('Иванова И. И.'))
+        self.assertTrue(author.find_in_text('Иванова И. И.', tolerance=1))
+
+
+class TestTrigramIndex(TestCase):
+    def setUp(self):
+        self.index = TrigramIndex([normalize(paragraph) for paragraph in [
+            'Как отмечает Иванова И.И., ...',
+            'Петров П.П. и Ивнов И.И. считают, ...',
+            'Иванов пишет без инициалов.',
+        ]])
+
+    def test_similar(self):
+        self.assertEqual({'Иванова', 'Ивнов', 'Иванов'}, set(self.index.similar('Иванов', 1)))
+        self.assertEqual(['Иванов'], self.index.similar('Иванов', 0))
+
+    def test_positions(self):
+        self.assertEqual({0, 1}, self.index.positions('Иванов', 'И', 1))
+        self.assertEqual(set(), self.index.positions('Иванов', 'И', 0))
+
+
+class TestFuzzyLinks(TestCase):
+    def setUp(self):
+        self.document = Referat([
+            'Введение',
+            'Как отмечает Иванова И.И., ...',
+            'Список литературы',
+            '1. Иванов И.И. Книга. – М., 2010.',
+        ], declare_text=None)
+
+    def test_find_links(self):
+        source = SourceData('Книга', 2, 2010, authors=['Иванов И.И.'])
+        self.assertEqual((), source.find_links(self.document))
+        self.assertEqual(['Как отмечает Иванова И.И., ...'], source.find_links(self.document, tolerance=1))
+
+    def test_coverage(self):
+        source = SourceData('Книга', 2, 2010, authors=['Иванов И.И.'])
+        self.document.coverage([source])
+        self.assertFalse(source.has_links)
+        self.document.coverage([source], tolerance=1)
+        self.assertEqual(['Как отмечает Иванова И.И., ...'], source.links)
+
+    def test_modes_agree(self):
+        # 'Ивановым' отличается от фамилии на 2 правки и находится только точным шаблоном 'И.И.Иванов',
+        # 'Петрова' - только с опечаткой
+        document = Referat([
+            'Введение',
+            'Как показали И.И.Ивановым и Петрова П.П., ...',
+            'Список литературы',
+            '1. Иванов И.И., Петров П.П. Книга. – М., 2010.',
+        ], declare_text=None)
+        full = SourceData('Книга', 2, 2010, authors=['Иванов И.И.', 'Петров П.П.'])
+        covered = SourceData('Книга', 2, 2010, authors=['Иванов И.И.', 'Петров П.П.'])
+        full.find_links(document, tolerance=1)
+        document.coverage([covered], tolerance=1)
+        self.assertEqual(['Как показали И.И.Ивановым и Петрова П.П., ...'], full.links)
+        self.assertEqual(full.links, covered.links)
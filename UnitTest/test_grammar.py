@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from Domain.antistud_fun import try_build_source
+from Domain.grammar import Grammar, GrammarException
+from Domain.profiling import Profiler
+
+CONFIG = {
+    'fragments': {'NUMBER': r'^(?:(?P<index>\d+)\s*[\.\?\)]?\s*)'},
+    'formats': [
+        {'name': 'word_year', 'pattern': r'{NUMBER}(?P<text>\w+) (?P<year>\w{4})$',
+         'fields': {'text': ['text'], 'index': 'index', 'year': 'year'}},
+        {'name': 'any', 'pattern': r'{NUMBER}(?P<text>.+)', 'fields': {'text': ['text'], 'index': 'index'}},
+    ]
+}
+
+
+class TestDefaultGrammar(TestCase):
+    def test_book(self):
+        source = try_build_source('1. Иванов И.И. Основы программирования. – М.: Наука, 2010. – 200 с.')
+        self.assertEqual(1, source.index)
+        self.assertEqual(2010, source.year)
+
+    def test_link(self):
+        source = try_build_source('2. https://example.com/page Описание сайта')
+        self.assertEqual('Описание сайта', source.text)
+        self.assertEqual('https://example.com/page', source._e_link)
+
+    def test_journal(self):
+        source = try_build_source('3. Петров П.П. Статья, / П.П. Петров // 2015. – № 3. – С. 5-10.')
+        self.assertEqual(2015, source.year)
+        self.assertEqual(['Петров П. П.'], [str(author) for author in source.authors])
+
+    def test_e_resource(self):
+        source = try_build_source('4. Сайт [Электронный ресурс] Режим доступа: https://example.com/page')
+        self.assertEqual('https://example.com/page', source._e_link)
+
+    def test_without_number(self):
+        self.assertIsNone(try_build_source('Список использованной литературы'))
+
+
+class TestCustomGrammar(TestCase):
+    def setUp(self):
+        self.grammar = Grammar.from_config(CONFIG)
+
+    def test_first_format(self):
+        source = try_build_source('1. Книга 2001', grammar=self.grammar)
+        self.assertEqual(2001, source.year)
+
+    def test_fallback_on_bad_value(self):
+        source = try_build_source('2. Книга abcd', grammar=self.grammar)
+        self.assertEqual('Книга abcd', source.text)
+        self.assertIsNone(source.year)
+
+    def test_attempts_per_format(self):
+        profiler = Profiler(trace_memory=False)
+        try_build_source('2. Книга abcd', profiler, grammar=self.grammar)
+        self.assertEqual({'word_year': 1, 'any': 2}, dict(profiler.counters['format_attempts']))
+        self.assertEqual({'word_year': 1}, dict(profiler.counters['format_errors']))
+        self.assertEqual({'any': 1}, dict(profiler.counters['format_matches']))
+
+    def test_missing_group(self):
+        with self.assertRaises(GrammarException):
+            Grammar.from_config({'formats': [{'name': 'bad', 'pattern': r'(?P<index>\d+)',
+                                              'fields': {'text': ['text'], 'index': 'index'}}]})
+
+    def test_fingerprint(self):
+        self.assertNotEqual(self.grammar.fingerprint, Grammar.load().fingerprint)
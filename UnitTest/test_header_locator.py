@@ -0,0 +1,70 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from Domain.antistud_fun import Referat, NoSourcesException, analysis_settings
+from Domain.header_locator import HeaderLocator, HeaderStore
+
+ENTRIES = [
+    '1. Иванов И.И. Основы программирования. – М.: Наука, 2010. – 200 с.',
+    '2. Петров П.П. Алгоритмы. – СПб.: Питер, 1995. – 300 с.',
+    '3. Сидоров С.С. Базы данных. – М.: Мир, 2018. – 150 с.',
+]
+
+
+class TestHeaderLocator(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.store = HeaderStore(os.path.join(self.dir.name, 'headers.json'))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_entries_after_header_win(self):
+        # заголовок в содержании без записей после него проигрывает заголовку перед списком
+        paragraphs = ['Содержание', 'Список литературы', 'Введение', 'Текст работы [1].',
+                      'Список литературы'] + ENTRIES + ['Приложение А']
+        match = HeaderLocator().locate(paragraphs)
+        self.assertEqual(4, match.position)
+        self.assertIn('entries', match.reasons)
+        self.assertGreater(match.confidence, 0.7)
+
+    def test_keyword_header_has_low_confidence(self):
+        paragraphs = ['Введение', 'Текст работы [1].', 'Библиографический список'] + ENTRIES
+        match = HeaderLocator().locate(paragraphs)
+        self.assertEqual(2, match.position)
+        self.assertLess(match.confidence, 0.8)
+
+    def test_remembered_header(self):
+        paragraphs = ['Введение', 'Текст работы [1].', 'Перечень работ'] + ENTRIES
+        self.assertIsNone(HeaderLocator(self.store).locate(paragraphs))
+
+        with self.assertRaises(NoSourcesException):
+            Referat(paragraphs, declare_text=None, locator=HeaderLocator(self.store), template='Курсовая.dotx')
+        document = Referat(paragraphs, declare_text=lambda: 'Перечень работ',
+                           locator=HeaderLocator(self.store), template='Курсовая.dotx')
+        self.assertEqual(ENTRIES, document.sources())
+
+        # запомненный заголовок находится без вопроса, в том числе после перезапуска
+        locator = HeaderLocator(HeaderStore(self.store.path))
+        match = locator.locate(paragraphs, template='Курсовая.dotx')
+        self.assertEqual(2, match.position)
+        self.assertGreaterEqual(match.confidence, locator.min_confidence)
+        self.assertGreater(match.confidence, locator.locate(paragraphs, template='Другой.dotx').confidence)
+
+    def test_unattended(self):
+        paragraphs = ['Введение', 'Обзор литературы показал', 'Текст'] + ENTRIES
+        with self.assertRaises(NoSourcesException) as context:
+            Referat(paragraphs, declare_text=None)
+        self.assertEqual(1, context.exception.candidate.position)
+
+        document = Referat(paragraphs, declare_text=None, locator=HeaderLocator(min_confidence=0))
+        self.assertLess(document.header.confidence, 0.5)
+
+    def test_cache_key(self):
+        # результат, полученный с другим порогом уверенности или до подтверждения заголовка, не подходит
+        strict = analysis_settings(locator=HeaderLocator(self.store))
+        self.assertNotEqual(strict, analysis_settings(locator=HeaderLocator(self.store, min_confidence=0)))
+        self.assertEqual(strict, analysis_settings(locator=HeaderLocator(HeaderStore(self.store.path))))
+        self.store.remember('Перечень работ')
+        self.assertNotEqual(strict, analysis_settings(locator=HeaderLocator(self.store)))
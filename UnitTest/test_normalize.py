@@ -0,0 +1,25 @@
+from unittest import TestCase
+
+from Domain.normalize import normalize
+
+
+class TestNormalize(TestCase):
+    def test_spaces(self):
+        self.assertEqual('1 2 3', normalize('1 \u00a0 2\t\u202f3'))
+
+    def test_invisible(self):
+        self.assertEqual('Иванов', normalize('Ива\u00adнов\u200b'))
+
+    def test_homoglyphs(self):
+        self.assertEqual('Семин', normalize('Cёмин'))
+
+    def test_initials(self):
+        self.assertEqual('И.И.Иванов', normalize('И. И. Иванов'))
+        self.assertEqual('Иванов И.И. пишет', normalize('Иванов, И. И. пишет'))
+
+    def test_sentence(self):
+        self.assertEqual('в 2010 г. Иванов', normalize('в 2010 г.  Иванов'))
+
+    def test_citations(self):
+        self.assertEqual('текст [1, 2]', normalize('текст\u00a0[1,\u00a0\u00a02]'))
+
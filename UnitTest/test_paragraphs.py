@@ -0,0 +1,76 @@
+import pickle
+from unittest import TestCase
+
+from Domain.antistud_fun import Referat, SourceData
+from Domain.paragraphs import ParagraphRefs, ParagraphStore, ParagraphView
+
+PARAGRAPHS = ['Введение', '', 'Текст [1].', 'Список литературы', '1. Иванов И.И. Книга. – М., 2010.']
+
+
+class TestParagraphStore(TestCase):
+    def setUp(self):
+        self.store = ParagraphStore(PARAGRAPHS)
+
+    def test_sequence(self):
+        self.assertEqual(len(PARAGRAPHS), len(self.store))
+        self.assertEqual(PARAGRAPHS, list(self.store))
+        self.assertEqual('', self.store[1])
+        self.assertEqual(PARAGRAPHS[-1], self.store[-1])
+        with self.assertRaises(IndexError):
+            self.store[len(PARAGRAPHS)]
+
+    def test_view(self):
+        view = self.store[1:4]
+        self.assertIsInstance(view, ParagraphView)
+        self.assertEqual(PARAGRAPHS[1:4], view)
+        self.assertEqual(PARAGRAPHS[2:3], view[1:2])
+        self.assertEqual(PARAGRAPHS[3], view[-1])
+        self.assertEqual(0, len(self.store[4:2]))
+        self.assertIn('Текст [1].', view)
+
+    def test_extend(self):
+        store = ParagraphStore()
+        store.extend(PARAGRAPHS[:2])
+        view = store[:]
+        store.extend(PARAGRAPHS[2:])
+        self.assertEqual(PARAGRAPHS, list(store))
+        self.assertEqual(PARAGRAPHS[:2], view)
+
+    def test_refs(self):
+        refs = ParagraphRefs(self.store[2:], (2, 0))
+        self.assertEqual([PARAGRAPHS[4], PARAGRAPHS[2]], refs)
+        self.assertEqual(tuple(refs), pickle.loads(pickle.dumps(refs)))
+
+
+class TestReferatViews(TestCase):
+    def test_views(self):
+        document = Referat(PARAGRAPHS, declare_text=None)
+        self.assertEqual(PARAGRAPHS[:4], document.body())
+        self.assertEqual(PARAGRAPHS[4:], document.sources())
+
+    def test_links(self):
+        document = Referat(PARAGRAPHS, declare_text=None)
+        source = SourceData('Книга', 1, 2010)
+        source.find_links(document)
+        self.assertIsInstance(source.links, ParagraphRefs)
+        self.assertEqual(['Текст [1].'], source.links)
+
+    def test_no_links(self):
+        document = Referat(PARAGRAPHS, declare_text=None)
+        source = SourceData('Книга', 2, 2010)
+        self.assertEqual((), source.find_links(document))
+
+    def test_detach_links(self):
+        document = Referat(PARAGRAPHS, declare_text=None)
+        first, second = SourceData('Книга', 1, 2010), SourceData('Книга', 1, 2011)
+        paragraphs = {}
+        for source in [first, second]:
+            source.find_links(document)
+            source.detach_links(paragraphs)
+        self.assertEqual(('Текст [1].',), first.links)
+        self.assertIs(first.links[0], second.links[0])
+
+    def test_matching_body(self):
+        document = Referat(PARAGRAPHS, declare_text=None)
+        self.assertEqual('Текст [1].', document._matching_paragraph(2))
+        self.assertEqual(PARAGRAPHS[:4], document.matching_body())
@@ -0,0 +1,82 @@
+import json
+import time
+from unittest import TestCase
+
+from Domain.profiling import NULL_PROFILER, Profiler
+
+
+class TestStages(TestCase):
+    def test_nested_time(self):
+        profiler = Profiler(trace_memory=False)
+        with profiler.stage('outer'):
+            with profiler.stage('inner'):
+                time.sleep(0.01)
+            with profiler.stage('inner'):
+                pass
+        self.assertEqual(1, profiler.stages['outer'].calls)
+        self.assertEqual(2, profiler.stages['inner'].calls)
+        self.assertGreaterEqual(profiler.stages['inner'].time, 0.01)
+        self.assertGreaterEqual(profiler.stages['outer'].time, profiler.stages['inner'].time)
+
+    def test_memory_peak(self):
+        with Profiler() as profiler:
+            with profiler.stage('outer'):
+                with profiler.stage('inner'):
+                    data = bytearray(1024 * 1024)
+                    del data
+        # память внутреннего этапа учитывается и во внешнем
+        self.assertGreaterEqual(profiler.stages['inner'].peak_memory, 1024 * 1024)
+        self.assertGreaterEqual(profiler.stages['outer'].peak_memory, profiler.stages['inner'].peak_memory)
+
+    def test_without_memory(self):
+        profiler = Profiler(trace_memory=False)
+        with profiler.stage('stage'):
+            data = bytearray(1024 * 1024)
+            del data
+        self.assertEqual(0, profiler.stages['stage'].peak_memory)
+
+    def test_stage_exception(self):
+        profiler = Profiler(trace_memory=False)
+        with self.assertRaises(ValueError):
+            with profiler.stage('stage'):
+                raise ValueError()
+        self.assertEqual(1, profiler.stages['stage'].calls)
+
+
+class TestCounters(TestCase):
+    def test_count(self):
+        profiler = Profiler(trace_memory=False)
+        profiler.count('format_matches', 'book')
+        profiler.count('format_matches', 'book', 2)
+        profiler.count('format_matches', 'article')
+        self.assertEqual({'book': 3, 'article': 1}, dict(profiler.counters['format_matches']))
+
+    def test_null_profiler(self):
+        with NULL_PROFILER.stage('stage'):
+            NULL_PROFILER.count('name', 'key')
+
+
+class TestMerge(TestCase):
+    def worker(self, sleep, peak):
+        profiler = Profiler(trace_memory=False)
+        with profiler.stage('parse'):
+            time.sleep(sleep)
+        profiler.stages['parse'].peak_memory = peak
+        profiler.count('format_matches', 'book')
+        return profiler.to_dict()
+
+    def test_merge(self):
+        profiler = Profiler(trace_memory=False)
+        for data in [self.worker(0.01, 100), self.worker(0.01, 300)]:
+            profiler.merge(data)
+        stats = profiler.stages['parse']
+        self.assertEqual(2, stats.calls)
+        self.assertGreaterEqual(stats.time, 0.02)
+        self.assertEqual(300, stats.peak_memory)
+        self.assertEqual(2, profiler.counters['format_matches']['book'])
+
+    def test_json_round_trip(self):
+        data = self.worker(0, 100)
+        profiler = Profiler(trace_memory=False)
+        profiler.merge(json.loads(json.dumps(data)))
+        self.assertEqual(data, json.loads(profiler.to_json()))
@@ -0,0 +1,54 @@
+import io
+import os
+import tempfile
+from unittest import TestCase
+
+import docx
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+
+from Domain.docx_extract import iter_paragraphs
+from Domain.generate_file import generate
+from Domain.report_writer import ReportWriter, MISSING_TITLE, OUTDATED_TITLE
+
+
+class TestGenerate(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'report.docx')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_lists(self):
+        generate(['1. Иванов И.И. Книга & <статья>'], ['2. Петров П.П. Пособие'], self.path)
+        document = docx.Document(self.path)
+        self.assertEqual([MISSING_TITLE, '1. Иванов И.И. Книга & <статья>', OUTDATED_TITLE, '2. Петров П.П. Пособие'],
+                         [paragraph.text for paragraph in document.paragraphs])
+        self.assertEqual(WD_PARAGRAPH_ALIGNMENT.JUSTIFY, document.paragraphs[1].alignment)
+        self.assertEqual('Times New Roman', document.styles['Normal'].font.name)
+
+    def test_empty_lists(self):
+        generate([], [], self.path)
+        self.assertEqual([], docx.Document(self.path).paragraphs)
+
+    def test_invalid_characters(self):
+        generate(['Книга\x0b 2010'], [], self.path)
+        self.assertEqual('Книга 2010', docx.Document(self.path).paragraphs[1].text)
+
+
+class TestCombinedReport(TestCase):
+    def test_sections(self):
+        stream = io.BytesIO()
+        with ReportWriter(stream) as report:
+            report.document('Иванов.docx', ['1. Книга'], [], total=3)
+            report.document('Петров.docx', [], [], total=2)
+            report.document('Сидоров.docx', [], [], error='Раздел с источниками не обнаружен')
+        self.assertEqual(3, report.documents)
+
+        document = docx.Document(io.BytesIO(stream.getvalue()))
+        headings = [paragraph.text for paragraph in document.paragraphs if paragraph.style.name == 'Heading 1']
+        self.assertEqual(['Иванов.docx', 'Петров.docx', 'Сидоров.docx'], headings)
+        texts = list(iter_paragraphs(io.BytesIO(stream.getvalue())))
+        self.assertIn('Источников: 3, пропущено ссылок: 1, устаревших: 0', texts)
+        self.assertIn('Замечаний нет', texts)
+        self.assertIn('Ошибка проверки: Раздел с источниками не обнаружен', texts)
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from Benchmark.generator import Generator
+from Console.server import CheckServer
+
+
+class TestCheckServer(TestCase):
+    """
+    Сервер запускается на свободном порту localhost в отдельном потоке, запросы отправляются через urllib.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.TemporaryDirectory()
+        path = Generator(paragraphs=30, sources=5, seed=1).save(os.path.join(cls.dir.name, 'work.docx'))
+        with open(path, 'rb') as file:
+            cls.document = file.read()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dir.cleanup()
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.release.set()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.server = CheckServer(port=0, jobs=1, max_queue=2, executor=self.executor)
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.server.start())
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        started.wait(5)
+        self.url = 'http://127.0.0.1:{}'.format(self.server.port)
+
+    def tearDown(self):
+        self.release.set()
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+        self.executor.shutdown()
+
+    def request(self, method, path, body=None):
+        request = urllib.request.Request(self.url + path, data=body, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, json.loads(response.read()), response.headers
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read()), error.headers
+
+    def wait(self, job_id):
+        for _ in range(100):
+            status, data, _ = self.request('GET', '/jobs/' + job_id)
+            if data['status'] in ('done', 'failed'):
+                return data
+            time.sleep(0.05)
+        self.fail('задание не завершилось')
+
+    def test_submit_and_poll(self):
+        status, data, headers = self.request('POST', '/jobs?min_year=2015&search_links=1', self.document)
+        self.assertEqual(202, status)
+        self.assertEqual('/jobs/' + data['id'], headers['Location'])
+
+        data = self.wait(data['id'])
+        self.assertEqual('done', data['status'])
+        self.assertEqual(5, len(data['result']['sources']))
+        self.assertTrue(all(source['is_modern'] == (source['year'] >= 2015)
+                            for source in data['result']['sources'] if source['year']))
+
+        self.assertEqual(200, self.request('DELETE', '/jobs/' + data['id'])[0])
+        self.assertEqual(404, self.request('GET', '/jobs/' + data['id'])[0])
+
+    def test_invalid_document(self):
+        _, data, _ = self.request('POST', '/jobs', b'not a docx')
+        self.assertEqual('failed', self.wait(data['id'])['status'])
+
+    def test_invalid_fuzzy(self):
+        self.assertEqual(400, self.request('POST', '/jobs?fuzzy=9', self.document)[0])
+
+    def test_backpressure(self):
+        # занимаем единственный поток пула, чтобы задания оставались в очереди
+        self.release.clear()
+        self.executor.submit(self.release.wait)
+        codes = [self.request('POST', '/jobs', self.document)[0] for _ in range(3)]
+        self.assertEqual([202, 202, 503], codes)
+        status, data, headers = self.request('POST', '/jobs', self.document)
+        self.assertIn('Retry-After', headers)
+        self.assertEqual(2, self.request('GET', '/health')[1]['queued'] + self.request('GET', '/health')[1]['running'])
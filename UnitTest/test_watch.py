@@ -0,0 +1,87 @@
+import ctypes
+import errno
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from Benchmark.generator import Generator
+from Console.watch import InotifyWatcher, Service, State
+from Domain.generate_file import report_path
+
+
+class TestWatchService(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.inbox = Path(self.dir.name, 'inbox')
+        (self.inbox / 'group').mkdir(parents=True)
+        self.state_path = Path(self.dir.name, 'state.json')
+        self.work = Path(Generator(paragraphs=30, sources=5, seed=1).save(str(self.inbox / 'group' / 'work.docx')))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def run_once(self):
+        settings = dict(min_year=2000, check_authors=True, search_links=False)
+        service = Service([self.inbox], State(self.state_path), settings, jobs=1, settle=0, polling=True)
+        service.run(once=True)
+        return State(self.state_path)
+
+    def test_reports_and_restart(self):
+        state = self.run_once()
+        self.assertTrue(report_path(self.work).exists())
+        self.assertTrue(state.is_processed(self.work))
+        self.assertIsNone(state.files[str(self.work)]['error'])
+        checked = state.files[str(self.work)]['checked']
+
+        # после перезапуска неизмененный файл и отчет не проверяются
+        os.utime(str(report_path(self.work)), None)
+        state = self.run_once()
+        self.assertEqual([str(self.work)], list(state.files))
+        self.assertEqual(checked, state.files[str(self.work)]['checked'])
+
+        Generator(paragraphs=40, sources=6, seed=2).save(str(self.work))
+        self.assertFalse(State(self.state_path).is_processed(self.work))
+        self.assertTrue(self.run_once().is_processed(self.work))
+
+    def test_corrupt_state(self):
+        self.state_path.write_text('{"' + str(self.work), encoding='utf-8')
+        state = self.run_once()
+        self.assertTrue(state.is_processed(self.work))
+        self.assertFalse(self.state_path.with_suffix('.tmp').exists())
+
+
+class _NoWatches:
+    """
+    Подменяет inotify_add_watch: ошибка error для каждого каталога.
+    """
+
+    def __init__(self, error):
+        self.error = error
+
+    def inotify_add_watch(self, fd, path, mask):
+        ctypes.set_errno(self.error)
+        return -1
+
+
+@unittest.skipUnless(InotifyWatcher.available(), 'нужен inotify')
+class TestInotifyWatcher(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.watcher = InotifyWatcher([Path(self.dir.name)])
+
+    def tearDown(self):
+        self.watcher.close()
+        self.dir.cleanup()
+
+    def test_vanished_directory(self):
+        self.watcher._add_tree(Path(self.dir.name, 'removed'))
+        self.watcher._libc = _NoWatches(errno.ENOENT)
+        self.watcher._add_tree(Path(self.dir.name))
+        self.assertFalse(self.watcher.exhausted)
+
+    def test_watch_limit(self):
+        self.watcher._libc = _NoWatches(errno.ENOSPC)
+        self.watcher._add_tree(Path(self.dir.name))
+        self.assertTrue(self.watcher.exhausted)
@@ -0,0 +1,54 @@
+import math
+from unittest import TestCase
+
+from Domain.antistud_fun import SourceData
+from Domain.year_stats import YearTable, SourceState
+
+
+def source(year, has_links):
+    return dict(year=year, has_links=has_links)
+
+
+class TestYearTable(TestCase):
+    def setUp(self):
+        self.table = YearTable()
+        self.table.add('a.docx', [source(1995, True), source(2010, True), source(2010, False), source(None, True)],
+                       group='2021')
+        self.table.add('b.docx', [source(2018, True), source(1990, False)], group='2022')
+        self.table.add('c.docx', [], group='2022')
+
+    def test_states_match_source_data(self):
+        sources = [SourceData('Книга', 1, year) for year in (1995, 2010, None)]
+        for item, has_links in zip(sources, (True, False, True)):
+            item.set_limit_year(2000)
+            item._links = ('абзац',) if has_links else ()
+        states = YearTable.from_sources(sources).states(2000).tolist()
+        self.assertEqual([SourceState.OUTDATED.value, SourceState.NO_LINKS.value, SourceState.NO_DATA.value], states)
+
+    def test_histogram(self):
+        histogram = self.table.histogram(2000)
+        self.assertEqual({2010: 1, 2018: 1}, histogram[SourceState.OK])
+        self.assertEqual({2010: 1}, histogram[SourceState.NO_LINKS])
+        self.assertEqual({1990: 1, 1995: 1}, histogram[SourceState.OUTDATED])
+        self.assertEqual({}, histogram[SourceState.NO_DATA])
+
+    def test_per_document(self):
+        documents = self.table.per_document(2000)
+        self.assertEqual([4, 2, 0], documents['sources'].tolist())
+        self.assertEqual([1, 1, 0], documents['outdated'].tolist())
+        self.assertAlmostEqual(1 / 3, documents['outdated_ratio'][0])
+        self.assertEqual(2010, documents['p50'][0])
+        self.assertEqual(2004, documents['p50'][1])
+        self.assertTrue(math.isnan(documents['p50'][2]))
+
+    def test_per_group(self):
+        groups = self.table.group_summary(2000)
+        self.assertEqual(['2021', '2022'], list(groups))
+        self.assertEqual(2, groups['2022']['sources'])
+        self.assertEqual(0.5, groups['2022']['outdated_ratio'])
+
+    def test_summary(self):
+        summary = self.table.summary(2000)
+        self.assertEqual(5, summary['dated'])
+        self.assertEqual(0.4, summary['outdated_ratio'])
+        self.assertEqual(2010, summary['percentiles']['p50'])
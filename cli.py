@@ -0,0 +1,20 @@
+import argparse
+import sys
+
+from Console import batch, corpus, server, watch
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Проверка ссылок на источники без графического интерфейса')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+    batch.add_parser(subparsers)
+    corpus.add_parser(subparsers)
+    watch.add_parser(subparsers)
+    server.add_parser(subparsers)
+    return parser
+
+
+if __name__ == '__main__':
+    arguments = build_parser().parse_args()
+    sys.exit(arguments.main(arguments))